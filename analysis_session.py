@@ -0,0 +1,81 @@
+import os
+import shutil
+
+from helper import DataPreprocessor
+from data_analyzer import DataAnalyzer
+from image_buffers import ImageSettings
+from categorical_profiles import profile_columns
+
+
+class AnalysisSession:
+    """
+    Analysis state of one dataset: its column types, analyzer, visualizer and output directory.
+
+    Sessions share nothing with each other, so a long-lived worker process can serve many datasets one
+    after another, or several datasets at once from different threads.
+    """
+
+    def __init__(self, df, name=None, output_dir=None, image_settings=None):
+        """
+        Initialize an AnalysisSession, preprocessing the DataFrame once for both analysis and visualization.
+
+        Parameters:
+        df (pd.DataFrame): Input DataFrame.
+        name (str or None): Dataset name used in report file names.
+        output_dir (str or None): Directory for the session's images. If None, a unique directory is
+                                  created on first use and removed by close().
+        image_settings (ImageSettings or None): Encoding of the charts. If None, charts are kept in memory as
+                                                PNG and never written to the output directory.
+        """
+        self.df = df
+        self.name = name
+        self.preprocessor = DataPreprocessor(df)
+        self.analyzer = DataAnalyzer(df, preprocessor=self.preprocessor)
+        self._output_dir = output_dir
+        self.image_settings = ImageSettings() if image_settings is None else image_settings
+        self._visualization = None
+        self._category_profiles = None
+        self._owns_output_dir = output_dir is None
+
+    @property
+    def visualization(self):
+        """
+        DataVisualization of the session, created on first use so summary-only runs never import matplotlib.
+        """
+        if self._visualization is None:
+            from data_visualization import DataVisualization
+            self._visualization = DataVisualization(self.df, output_dir=self._output_dir,
+                                                    preprocessor=self.preprocessor,
+                                                    image_settings=self.image_settings)
+        return self._visualization
+
+    @property
+    def category_profiles(self):
+        """
+        Top values and cardinality of every categorical column, computed once and shared by the count plots
+        and the summary tables.
+        """
+        if self._category_profiles is None:
+            self._category_profiles = profile_columns(self.df, self.preprocessor.categorical_columns)
+        return self._category_profiles
+
+    @property
+    def output_dir(self):
+        return self.visualization.get_output_dir()
+
+    def close(self):
+        """
+        Remove the session's image directory if the session created it.
+        """
+        if self._visualization is None:
+            return
+        directory = self._visualization.output_dir
+        if self._owns_output_dir and directory is not None and os.path.isdir(directory):
+            shutil.rmtree(directory)
+        self._visualization.output_dir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,321 @@
+import contextlib
+import hashlib
+import importlib.metadata
+import json
+import os
+import pickle
+import shutil
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from image_buffers import ImageBuffer
+
+CACHE_FORMAT_VERSION = 1
+DEFAULT_CACHE_DIRECTORY = ".artifact_cache"
+DEFAULT_MAX_BYTES = 512 * 1024 ** 2
+# Cache hits whose access times are kept in memory before being written to the index
+ACCESS_FLUSH_SIZE = 100
+# Seconds to wait for another process holding the index lock
+INDEX_TIMEOUT = 60
+
+
+def library_versions():
+    """
+    Versions of the libraries that influence rendered images and computed statistics.
+
+    Returns:
+    dict: Library name to version string.
+    """
+    versions = {'cache_format': CACHE_FORMAT_VERSION, 'pandas': pd.__version__, 'numpy': np.__version__}
+    # Read from the installed package metadata so summary-only runs do not import the plotting libraries
+    for library in ('matplotlib', 'seaborn'):
+        try:
+            versions[library] = importlib.metadata.version(library)
+        except importlib.metadata.PackageNotFoundError:
+            versions[library] = None
+    return versions
+
+
+def fingerprint(data):
+    """
+    Hash the content of a Series or DataFrame, including column names and dtypes.
+
+    Parameters:
+    data (pd.Series or pd.DataFrame): Data to hash.
+
+    Returns:
+    str: Hex digest.
+    """
+    digest = hashlib.sha256()
+    if isinstance(data, pd.Series):
+        digest.update(repr((data.name, str(data.dtype))).encode())
+    else:
+        digest.update(repr([(column, str(dtype)) for column, dtype in data.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class ArtifactCache:
+    """
+    Persistent, content-addressed on-disk cache for rendered images and computed statistics.
+
+    Artifacts are stored under a key derived from the hash of the input data, the artifact kind, its
+    parameters and the library versions, so a changed column or library upgrade never returns a stale
+    artifact. The least recently used entries are evicted once the cache exceeds its size or entry limit.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIRECTORY, max_bytes=DEFAULT_MAX_BYTES, max_entries=None):
+        """
+        Initialize the ArtifactCache, creating its directory if needed.
+
+        The index is a SQLite database, so several processes (e.g. batch_runner workers) can share the cache
+        directory: every store, access update and eviction is a transaction on the shared index.
+
+        Parameters:
+        directory (str): Directory holding the cached artifacts and the index.
+        max_bytes (int or None): Maximum total size of the cached artifacts.
+        max_entries (int or None): Maximum number of cached artifacts.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._versions = library_versions()
+        # Access times of cache hits not yet written to the index
+        self._pending_access = {}
+        os.makedirs(directory, exist_ok=True)
+        self._index_path = os.path.join(directory, "index.sqlite")
+        self._connection = sqlite3.connect(self._index_path, timeout=INDEX_TIMEOUT, isolation_level=None,
+                                           check_same_thread=False)
+        self._connection.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, file TEXT NOT NULL, "
+                                 "size INTEGER NOT NULL, last_access REAL NOT NULL)")
+        self._import_json_index()
+
+    def _import_json_index(self):
+        """
+        Move the entries of an index.json written by earlier versions into the SQLite index.
+        """
+        json_path = os.path.join(self.directory, "index.json")
+        try:
+            with open(json_path) as index_file:
+                index = json.load(index_file)
+        except (OSError, ValueError):
+            return
+        with self._transaction() as connection:
+            connection.executemany("INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?)",
+                                   [(key, entry['file'], entry['size'], entry['last_access'])
+                                    for key, entry in index.items()
+                                    if os.path.exists(os.path.join(self.directory, entry['file']))])
+        os.remove(json_path)
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """
+        Run a block of index statements as one write transaction, locking the index against other processes.
+        """
+        connection = self._connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def _flush_access(self, connection):
+        if self._pending_access:
+            connection.executemany("UPDATE entries SET last_access = MAX(last_access, ?) WHERE key = ?",
+                                   [(last_access, key) for key, last_access in self._pending_access.items()])
+            self._pending_access.clear()
+
+    def flush(self):
+        """
+        Write the access times of recent cache hits to the index, for least recently used eviction.
+        """
+        with self._lock, self._transaction() as connection:
+            self._flush_access(connection)
+
+    def close(self):
+        """
+        Flush the pending access times and close the index.
+        """
+        self.flush()
+        with self._lock:
+            self._connection.close()
+
+    def make_key(self, kind, data_fingerprint, **params):
+        """
+        Build the cache key of an artifact.
+
+        Parameters:
+        kind (str): Artifact kind, e.g. the plot type.
+        data_fingerprint (str): Fingerprint of the input data, see fingerprint().
+        **params: Parameters that influence the artifact.
+
+        Returns:
+        str: Hex digest used as the cache key.
+        """
+        payload = json.dumps({'kind': kind, 'data': data_fingerprint, 'params': params,
+                              'versions': self._versions}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _lookup(self, key):
+        with self._lock:
+            row = self._connection.execute("SELECT file FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None or not os.path.exists(os.path.join(self.directory, row[0])):
+                self.misses += 1
+                return None
+            self.hits += 1
+            # Access times are written in batches, with the next store or flush
+            self._pending_access[key] = time.time()
+            if len(self._pending_access) >= ACCESS_FLUSH_SIZE:
+                with self._transaction() as connection:
+                    self._flush_access(connection)
+            return os.path.join(self.directory, row[0])
+
+    def _fits(self, size):
+        """
+        Whether an artifact of this size can be cached at all without breaking the size limit.
+        """
+        return (self.max_bytes is None or size <= self.max_bytes) and self.max_entries != 0
+
+    def _write(self, file_name, write):
+        """
+        Write an artifact file under a temporary name and move it into place, so processes sharing the cache
+        never read a partly written file.
+        """
+        path = os.path.join(self.directory, file_name)
+        temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporary_path, "wb") as artifact_file:
+                write(artifact_file)
+            os.replace(temporary_path, path)
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+        return path
+
+    def _store(self, key, file_name):
+        path = os.path.join(self.directory, file_name)
+        with self._lock, self._transaction() as connection:
+            self._flush_access(connection)
+            connection.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                               (key, file_name, os.path.getsize(path), time.time()))
+            self._evict(connection, keep=key)
+        return path
+
+    def _evict(self, connection, keep=None):
+        """
+        Remove least recently used entries, stored by any process, until the size and entry limits hold.
+
+        Parameters:
+        connection (sqlite3.Connection): Index connection inside a write transaction.
+        keep (str or None): Key never evicted, e.g. the one just stored, whose path is handed to the caller.
+        """
+        entries = connection.execute("SELECT key, file, size FROM entries ORDER BY last_access").fetchall()
+        total_bytes = sum(size for _, _, size in entries)
+        entries = [entry for entry in entries if entry[0] != keep]
+        count = len(entries) + (keep is not None)
+        evicted = []
+        while entries and ((self.max_bytes is not None and total_bytes > self.max_bytes) or
+                           (self.max_entries is not None and count > self.max_entries)):
+            key, file_name, size = entries.pop(0)
+            total_bytes -= size
+            count -= 1
+            evicted.append((key,))
+            try:
+                os.remove(os.path.join(self.directory, file_name))
+            except OSError:
+                pass
+        connection.executemany("DELETE FROM entries WHERE key = ?", evicted)
+
+    def get_image(self, key):
+        """
+        Look up a cached image.
+
+        Parameters:
+        key (str): Cache key from make_key.
+
+        Returns:
+        str or None: Path of the cached image, or None on a miss.
+        """
+        return self._lookup(key)
+
+    def put_image(self, key, image):
+        """
+        Copy a rendered image into the cache.
+
+        Parameters:
+        key (str): Cache key from make_key.
+        image (str or ImageBuffer): Path of the rendered image, or the in-memory image.
+
+        Returns:
+        str or ImageBuffer: Path of the cached copy, or the image itself if it is too large to cache.
+        """
+        if isinstance(image, ImageBuffer):
+            if not self._fits(len(image)):
+                return image
+            file_name = f"{key}.{'jpg' if image.format == 'jpeg' else image.format}"
+            self._write(file_name, lambda image_file: image_file.write(image.data))
+        else:
+            if not self._fits(os.path.getsize(image)):
+                return image
+            file_name = key + os.path.splitext(image)[1]
+            with open(image, "rb") as source:
+                self._write(file_name, lambda image_file: shutil.copyfileobj(source, image_file))
+        return self._store(key, file_name)
+
+    def get_object(self, key):
+        """
+        Look up a cached computed object, such as a statistics table.
+
+        Parameters:
+        key (str): Cache key from make_key.
+
+        Returns:
+        object or None: The cached object, or None on a miss or an unreadable entry.
+        """
+        path = self._lookup(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as object_file:
+                return pickle.load(object_file)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return None
+
+    def put_object(self, key, obj):
+        """
+        Store a computed object in the cache.
+
+        Parameters:
+        key (str): Cache key from make_key.
+        obj (object): Picklable object.
+
+        Returns:
+        object: The stored object.
+        """
+        data = pickle.dumps(obj)
+        if self._fits(len(data)):
+            file_name = key + ".pkl"
+            self._write(file_name, lambda object_file: object_file.write(data))
+            self._store(key, file_name)
+        return obj
+
+    def stats(self):
+        """
+        Hit/miss counters and current size of the cache.
+
+        Returns:
+        dict: 'hits', 'misses', 'entries' and 'bytes'.
+        """
+        with self._lock:
+            entries, total_bytes = self._connection.execute("SELECT COUNT(*), TOTAL(size) FROM entries").fetchone()
+            return {'hits': self.hits, 'misses': self.misses, 'entries': entries, 'bytes': int(total_bytes)}
@@ -0,0 +1,259 @@
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+import traceback
+from collections import deque
+from multiprocessing.connection import wait
+
+# Reports run in this order within a dataset: the summary report encodes and scales the DataFrame in place
+REPORT_TYPES = ('pdf_visu', 'pdf_summary')
+DEFAULT_TIMEOUT = 30 * 60
+DEFAULT_RETRIES = 1
+
+
+def _normalize_entry(entry):
+    """
+    Validate a manifest entry and fill in its defaults.
+
+    Parameters:
+    entry (dict or str): Manifest entry, or just a file path.
+
+    Returns:
+    dict: Entry with 'path', 'name' and 'reports' (in REPORT_TYPES order).
+    """
+    if isinstance(entry, str):
+        entry = {'path': entry}
+    reports = entry.get('reports', list(REPORT_TYPES))
+    if isinstance(reports, str):
+        reports = list(REPORT_TYPES) if reports == 'both' else [reports]
+    unknown = [report for report in reports if report not in REPORT_TYPES]
+    if unknown:
+        raise ValueError(f"Unknown report types {unknown} for '{entry['path']}'.")
+    name = entry.get('name') or os.path.splitext(os.path.basename(entry['path']))[0]
+    return {'path': entry['path'], 'name': name,
+            'reports': [report for report in REPORT_TYPES if report in reports]}
+
+
+def load_manifest(manifest_path):
+    """
+    Read a batch manifest.
+
+    The manifest is a JSON list whose items are either file paths or objects with a 'path', an optional
+    'name' (defaults to the file name) and optional 'reports' ('pdf_visu', 'pdf_summary' or both, the default).
+
+    Parameters:
+    manifest_path (str): Path of the JSON manifest.
+
+    Returns:
+    list of dict: Normalized manifest entries.
+    """
+    with open(manifest_path) as manifest_file:
+        entries = json.load(manifest_file)
+    return [_normalize_entry(entry) for entry in entries]
+
+
+def manifest_from_files(file_paths, report_types=REPORT_TYPES):
+    """
+    Build a batch manifest running the same reports on every file, e.g. from read_example_files().
+
+    Parameters:
+    file_paths (list of str): Dataset file paths.
+    report_types (list of str): Reports to generate for each file.
+
+    Returns:
+    list of dict: Normalized manifest entries.
+    """
+    return [_normalize_entry({'path': file_path, 'reports': list(report_types)}) for file_path in file_paths]
+
+
+def _exit_on_terminate(signum, frame):
+    # Unwind normally so the analysis session removes its image directory
+    sys.exit(128 + signum)
+
+
+def _run_dataset(connection, entry, reports, cache_directory):
+    """
+    Worker process: load one dataset once and generate the requested reports from it.
+
+    Progress is sent to the scheduler as ('started', report) before each report and as
+    ('done', report, None) or ('failed', report, message) after it.
+    """
+    from artifact_cache import ArtifactCache
+    from analysis_session import AnalysisSession
+    from data_downloader import read_file_to_dataframe
+    from runner import run_example_pdf_summary, run_example_pdf_visu
+
+    signal.signal(signal.SIGTERM, _exit_on_terminate)
+    try:
+        loaded = read_file_to_dataframe(entry['path'])
+        if loaded is None:
+            raise ValueError(f"Could not read '{entry['path']}'.")
+    except Exception:
+        message = traceback.format_exc(limit=3)
+        for report in reports:
+            connection.send(('failed', report, message))
+        connection.close()
+        return
+
+    df = loaded[0]
+    name = entry['name']
+    cache = ArtifactCache(cache_directory) if cache_directory is not None else None
+    with AnalysisSession(df, name) as session:
+        for report in reports:
+            connection.send(('started', report))
+            try:
+                if report == 'pdf_visu':
+                    run_example_pdf_visu(df, name, n_jobs=1, cache=cache, session=session)
+                else:
+                    run_example_pdf_summary(df, name, cache=cache, session=session)
+                connection.send(('done', report, None))
+            except Exception:
+                connection.send(('failed', report, traceback.format_exc(limit=3)))
+    if cache is not None:
+        cache.close()
+    connection.close()
+
+
+class _RunningTask:
+    """
+    Bookkeeping of one worker process in run_batch.
+    """
+
+    def __init__(self, entry, reports, cache_directory, context):
+        receiver, sender = context.Pipe(duplex=False)
+        self.entry = entry
+        self.remaining = list(reports)
+        self.retry = []
+        self.current = None
+        # Start of the current report, or of the dataset load before the first one, so a load that hangs
+        # times out as well
+        self.started_at = time.monotonic()
+        self.connection = receiver
+        self.process = context.Process(target=_run_dataset, args=(sender, entry, reports, cache_directory))
+        self.process.start()
+        sender.close()
+
+    def deadline(self, timeout):
+        if timeout is None:
+            return None
+        return self.started_at + timeout
+
+
+def run_batch(manifest, max_workers=None, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+              cache_directory=None):
+    """
+    Generate the reports of many datasets with a bounded pool of worker processes.
+
+    Each dataset is loaded once per worker and shared between its 'pdf_visu' and 'pdf_summary' reports.
+    A report that raises, crashes its worker or runs longer than the timeout is retried in a fresh
+    worker until it has used up its retries. Loading the dataset is bounded by the same timeout and counts
+    as an attempt of every report of the dataset when it fails. Reports of the same dataset that had not started yet are
+    rescheduled along with it.
+
+    Parameters:
+    manifest (list of dict): Entries from load_manifest or manifest_from_files.
+    max_workers (int or None): Maximum number of concurrent worker processes. None uses all CPUs.
+    timeout (float or None): Maximum number of seconds per report, and for loading the dataset.
+    retries (int): Number of times a failed report is retried.
+    cache_directory (str or None): Directory of the ArtifactCache shared by the workers, or None for no cache.
+
+    Returns:
+    list of dict: One result per (dataset, report) with 'name', 'path', 'report', 'status' ('done',
+                  'failed' or 'timeout'), 'attempts', 'seconds' and 'error'.
+    """
+    context = multiprocessing.get_context()
+    max_workers = max_workers or os.cpu_count() or 1
+    entries = [_normalize_entry(entry) for entry in manifest]
+
+    results = {}
+    for index, entry in enumerate(entries):
+        for report in entry['reports']:
+            results[(index, report)] = {'name': entry['name'], 'path': entry['path'], 'report': report,
+                                        'status': 'pending', 'attempts': 0, 'seconds': 0.0, 'error': None}
+    total = len(results)
+    finished = 0
+    pending = deque((index, entry['reports']) for index, entry in enumerate(entries) if entry['reports'])
+    running = {}
+
+    def finish(index, report, status, error=None):
+        nonlocal finished
+        result = results[(index, report)]
+        result['status'], result['error'] = status, error
+        if status != 'done' and result['attempts'] <= retries:
+            print(f"{result['name']} {report}: {status}, retrying ({result['attempts']}/{retries + 1} attempts).")
+            return True
+        finished += 1
+        print(f"[{finished}/{total}] {result['name']} {report}: {status} after {result['seconds']:.1f}s.")
+        return False
+
+    def handle_message(index, task, message):
+        event, report = message[0], message[1]
+        result = results[(index, report)]
+        if event == 'started':
+            task.current, task.started_at = report, time.monotonic()
+            result['attempts'] += 1
+            return
+        if task.current == report:
+            result['seconds'] = time.monotonic() - task.started_at
+        else:
+            # The dataset could not be loaded, which counts as an attempt of every report
+            result['attempts'] += 1
+        task.remaining.remove(report)
+        task.current, task.started_at = None, time.monotonic()
+        if finish(index, report, event, message[2]):
+            task.retry.append(report)
+
+    while pending or running:
+        while pending and len(running) < max_workers:
+            index, reports = pending.popleft()
+            running[index] = _RunningTask(entries[index], reports, cache_directory, context)
+
+        deadlines = [task.deadline(timeout) for task in running.values()]
+        deadlines = [deadline for deadline in deadlines if deadline is not None]
+        wait_seconds = max(min(deadlines) - time.monotonic(), 0) if deadlines else None
+        wait([task.connection for task in running.values()] +
+             [task.process.sentinel for task in running.values()], timeout=wait_seconds)
+
+        for index, task in list(running.items()):
+            try:
+                while task.connection.poll():
+                    handle_message(index, task, task.connection.recv())
+            except EOFError:
+                pass
+
+            deadline = task.deadline(timeout)
+            timed_out = deadline is not None and time.monotonic() >= deadline
+            if timed_out:
+                task.process.terminate()
+            elif task.process.is_alive():
+                continue
+
+            task.process.join()
+            task.connection.close()
+            del running[index]
+            if task.current is not None:
+                report = task.current
+                results[(index, report)]['seconds'] = time.monotonic() - task.started_at
+                task.remaining.remove(report)
+                error = None if timed_out else f"Worker exited with code {task.process.exitcode}."
+                if finish(index, report, 'timeout' if timed_out else 'failed', error):
+                    task.retry.append(report)
+            else:
+                # The worker stopped while loading the dataset, which counts as an attempt of every report
+                for report in list(task.remaining):
+                    result = results[(index, report)]
+                    result['attempts'] += 1
+                    result['seconds'] = time.monotonic() - task.started_at
+                    task.remaining.remove(report)
+                    error = "Loading the dataset timed out." if timed_out else \
+                        f"Worker exited with code {task.process.exitcode} while loading the dataset."
+                    if finish(index, report, 'timeout' if timed_out else 'failed', error):
+                        task.retry.append(report)
+            rescheduled = task.retry + task.remaining
+            if rescheduled:
+                pending.append((index, [report for report in REPORT_TYPES if report in rescheduled]))
+
+    return list(results.values())
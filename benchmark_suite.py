@@ -0,0 +1,346 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import current_rss_bytes
+
+# Shape of every synthetic dataset: rows, column counts per type, share of missing values, distinct values per
+# categorical column and share of numerical values replaced by outliers
+DATASETS = {
+    'small': {'rows': 10_000, 'numeric': 6, 'categorical': 3, 'dates': 1, 'null_rate': 0.02,
+              'cardinality': 20, 'outlier_rate': 0.01},
+    'medium': {'rows': 200_000, 'numeric': 10, 'categorical': 5, 'dates': 2, 'null_rate': 0.05,
+               'cardinality': 200, 'outlier_rate': 0.01},
+    'wide': {'rows': 20_000, 'numeric': 30, 'categorical': 10, 'dates': 2, 'null_rate': 0.05,
+             'cardinality': 50, 'outlier_rate': 0.02},
+    'high_cardinality': {'rows': 100_000, 'numeric': 4, 'categorical': 4, 'dates': 1, 'null_rate': 0.01,
+                         'cardinality': 50_000, 'outlier_rate': 0.01},
+}
+
+# A stage regresses when it is slower (or uses more memory) than the baseline by this fraction...
+DEFAULT_TOLERANCE = 0.25
+# ...and by more than these absolute amounts, so noise on very short stages is not reported
+MIN_REGRESSION_SECONDS = 0.05
+MIN_REGRESSION_RSS_MB = 20
+RSS_SAMPLE_INTERVAL = 0.005
+
+
+def make_synthetic_dataframe(rows, numeric=5, categorical=3, dates=1, null_rate=0.0, cardinality=20,
+                             outlier_rate=0.0, seed=0):
+    """
+    Generate a deterministic DataFrame of controlled shape.
+
+    Numerical columns are normally distributed with a share of values replaced by far outliers. Categorical
+    columns hold string labels with a skewed frequency distribution. Date columns hold 'YYYY-MM-DD' strings,
+    as read from a CSV file, so the datetime detection of DataPreprocessor is exercised.
+
+    Parameters:
+    rows (int): Number of rows.
+    numeric (int): Number of numerical columns.
+    categorical (int): Number of categorical columns.
+    dates (int): Number of date columns.
+    null_rate (float): Share of missing values in every column.
+    cardinality (int): Number of distinct values of every categorical column.
+    outlier_rate (float): Share of numerical values replaced by outliers.
+    seed (int): Random seed; the same arguments always produce the same DataFrame.
+
+    Returns:
+    pd.DataFrame: The synthetic data.
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for i in range(numeric):
+        values = rng.normal(loc=rng.uniform(-100, 100), scale=rng.uniform(1, 20), size=rows)
+        outliers = rng.random(rows) < outlier_rate
+        values[outliers] += np.sign(rng.standard_normal(outliers.sum())) * values.std() * rng.uniform(10, 20)
+        values[rng.random(rows) < null_rate] = np.nan
+        columns[f'num_{i}'] = values
+    for i in range(categorical):
+        # Squaring uniform draws makes low codes more frequent, like real category distributions
+        codes = (cardinality * rng.random(rows) ** 2).astype(np.int64)
+        labels = np.array([f'cat{i}_{code}' for code in range(cardinality)], dtype=object)[codes]
+        labels[rng.random(rows) < null_rate] = None
+        columns[f'cat_{i}'] = labels
+    for i in range(dates):
+        days = pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.integers(0, 3650, size=rows), unit='D')
+        labels = days.strftime('%Y-%m-%d').to_numpy(dtype=object)
+        labels[rng.random(rows) < null_rate] = None
+        columns[f'date_{i}'] = labels
+    return pd.DataFrame(columns)
+
+
+class PeakMemory:
+    """
+    Context manager sampling the resident set size in a background thread to find the peak of a code block.
+    """
+
+    def __init__(self, interval=RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        rss = current_rss_bytes()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self._sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+    @property
+    def peak_mb(self):
+        return None if self.peak is None else self.peak / 1024 ** 2
+
+
+def _time_stage(stages, name, function, *args, **kwargs):
+    """
+    Run one stage, recording its wall time and peak RSS in stages, and return its result.
+    """
+    with PeakMemory() as memory:
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        seconds = time.perf_counter() - start
+    stages[name] = {'seconds': seconds, 'peak_rss_mb': memory.peak_mb}
+    return result
+
+
+def _plot_columns(plot, df, columns, settings):
+    return [plot(df, column, save=True, settings=settings) for column in columns]
+
+
+def run_stages(file_path, report_path):
+    """
+    Run every stage of the analysis pipeline once on a file, timing each stage separately.
+
+    Parameters:
+    file_path (str): Data file to read.
+    report_path (str): Path of the PDF report written by the last stage.
+
+    Returns:
+    dict: {'seconds', 'peak_rss_mb'} per stage name, in pipeline order.
+    """
+    from data_analyzer import DataAnalyzer
+    from data_downloader import read_file_to_dataframe
+    from data_visualization import DataVisualization
+    from helper import DataPreprocessor
+    from image_buffers import ImageSettings
+    from report_generator import ReportGenerator
+
+    stages = {}
+    df, _ = _time_stage(stages, 'read_file_to_dataframe', read_file_to_dataframe, file_path)
+    preprocessor = _time_stage(stages, 'DataPreprocessor', DataPreprocessor, df)
+    analyzer = DataAnalyzer(df, preprocessor=preprocessor)
+    duplicate_percentage, null_percentage = _time_stage(stages, 'duplicates_nulls_percentage',
+                                                        analyzer.duplicates_nulls_percentage, df)
+    outliers_info = _time_stage(stages, 'remove_outliers', analyzer.remove_outliers, df)
+
+    # Plots are drawn before encoding, which replaces the columns in place
+    settings = ImageSettings(in_memory=True)
+    numerical, categorical = preprocessor.numerical_columns, preprocessor.categorical_columns
+    images = []
+    for name, plot, columns in [('plot_boxplot', DataVisualization.plot_boxplot, numerical),
+                                ('plot_density', DataVisualization.plot_density, numerical),
+                                ('plot_skewness_kurtosis', DataVisualization.plot_skewness_kurtosis, numerical),
+                                ('plot_categorical_count', DataVisualization.plot_categorical_count, categorical)]:
+        images.extend(_time_stage(stages, name, _plot_columns, plot, df, columns, settings))
+    if len(numerical) > 1:
+        images.append(_time_stage(stages, 'plot_correlation_matrix', DataVisualization.plot_correlation_matrix, df,
+                                  numerical, save=True, settings=settings))
+
+    _time_stage(stages, 'encode_scale_features', analyzer.encode_scale_features, df)
+
+    # Without streaming, the whole layout happens in generate_pdf
+    report = ReportGenerator(report_path, stream=False)
+    report.add_title("Benchmark Report")
+    report.add_table(["Metric", "Percentage"], [("Duplicate Percentage", f"{duplicate_percentage}%")])
+    report.add_table(["Column Name", "Percentage"],
+                     [[column, f"{percentage:.2f}%"] for column, percentage in null_percentage.items()])
+    report.add_table(["Column Name", "Number of Outliers"],
+                     [(info['Name'], info['Number_Of_Outliers']) for info in outliers_info or []])
+    for image in images:
+        if image is not None:
+            report.add_image(image)
+    _time_stage(stages, 'generate_pdf', report.generate_pdf)
+    return stages
+
+
+def benchmark_dataset(name, repeat=3, file_format='csv', seed=0):
+    """
+    Generate a synthetic dataset, write it to a temporary file and run the pipeline stages on it.
+
+    Parameters:
+    name (str): Dataset name, a key of DATASETS.
+    repeat (int): Number of pipeline runs. The median time and the largest peak RSS of every stage are reported.
+    file_format (str): Format of the data file, 'csv' or 'parquet'.
+    seed (int): Random seed of the data.
+
+    Returns:
+    dict: 'dataset', its 'shape', the file 'format' and {'seconds', 'runs_seconds', 'peak_rss_mb'} per stage.
+    """
+    from columnar_io import write_dataframe
+
+    shape = DATASETS[name]
+    runs = []
+    with tempfile.TemporaryDirectory(prefix='benchmark_') as directory:
+        previous_directory = os.getcwd()
+        # DataPreprocessor creates a Report directory in the working directory
+        os.chdir(directory)
+        try:
+            file_path = os.path.join(directory, f'{name}.{file_format}')
+            df = make_synthetic_dataframe(seed=seed, **shape)
+            if file_format == 'csv':
+                df.to_csv(file_path, index=False)
+            else:
+                write_dataframe(df, file_path, file_format)
+            del df
+            with contextlib.redirect_stdout(io.StringIO()):
+                for run in range(repeat):
+                    runs.append(run_stages(file_path, os.path.join(directory, f'report_{run}.pdf')))
+        finally:
+            os.chdir(previous_directory)
+
+    stages = {}
+    for stage in runs[0]:
+        seconds = [run[stage]['seconds'] for run in runs]
+        peaks = [run[stage]['peak_rss_mb'] for run in runs if run[stage]['peak_rss_mb'] is not None]
+        stages[stage] = {'seconds': statistics.median(seconds), 'runs_seconds': seconds,
+                         'peak_rss_mb': max(peaks) if peaks else None}
+    return {'dataset': name, 'shape': shape, 'format': file_format, 'stages': stages,
+            'total_seconds': sum(stage['seconds'] for stage in stages.values())}
+
+
+def run_in_subprocess(name, repeat=3, file_format='csv', seed=0, python=sys.executable):
+    """
+    Benchmark a dataset in a fresh interpreter, so peak memory is not inflated by earlier datasets.
+
+    Parameters:
+    name (str): Dataset name, a key of DATASETS.
+    repeat (int): Number of pipeline runs.
+    file_format (str): Format of the data file, 'csv' or 'parquet'.
+    seed (int): Random seed of the data.
+    python (str): Interpreter to run.
+
+    Returns:
+    dict: Result of benchmark_dataset.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    environment = dict(os.environ, MPLBACKEND='Agg',
+                       PYTHONPATH=os.pathsep.join(filter(None, [directory, os.environ.get('PYTHONPATH')])))
+    command = [python, os.path.abspath(__file__), '--worker', name, '--repeat', str(repeat),
+               '--format', file_format, '--seed', str(seed)]
+    completed = subprocess.run(command, env=environment, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Benchmark of '{name}' failed:\n{completed.stderr[-2000:]}")
+    return json.loads(completed.stdout)
+
+
+def compare_to_baseline(results, baseline, tolerance=DEFAULT_TOLERANCE, min_seconds=MIN_REGRESSION_SECONDS,
+                        min_rss_mb=MIN_REGRESSION_RSS_MB):
+    """
+    Find the stages that got slower or use more memory than in a stored baseline.
+
+    Parameters:
+    results (list of dict): Benchmark results, one per dataset.
+    baseline (list of dict): Earlier results of the same datasets.
+    tolerance (float): Allowed relative increase.
+    min_seconds (float): Smallest time increase reported as a regression.
+    min_rss_mb (float): Smallest peak memory increase reported as a regression.
+
+    Returns:
+    list of dict: 'dataset', 'stage', 'metric', 'baseline' and 'current' value of every regression.
+    """
+    baseline = {(result['dataset'], result['format']): result for result in baseline}
+    regressions = []
+    for result in results:
+        previous = baseline.get((result['dataset'], result['format']))
+        if previous is None:
+            continue
+        for stage, current in result['stages'].items():
+            reference = previous['stages'].get(stage)
+            if reference is None:
+                continue
+            for metric, minimum in (('seconds', min_seconds), ('peak_rss_mb', min_rss_mb)):
+                old, new = reference.get(metric), current.get(metric)
+                if old is None or new is None:
+                    continue
+                if new > old * (1 + tolerance) and new - old > minimum:
+                    regressions.append({'dataset': result['dataset'], 'stage': stage, 'metric': metric,
+                                        'baseline': old, 'current': new})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time every analysis stage on synthetic datasets of "
+                                                 "controlled shape and compare with a stored baseline.")
+    parser.add_argument("--dataset", nargs="+", choices=sorted(DATASETS), default=['small', 'medium'])
+    parser.add_argument("--repeat", type=int, default=3, help="Pipeline runs per dataset.")
+    parser.add_argument("--format", choices=['csv', 'parquet'], default='csv', help="Format of the data file.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the synthetic data.")
+    parser.add_argument("--output", default=None, help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", default=None, help="JSON results to compare against.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed relative increase before a stage is flagged.")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker is not None:
+        print(json.dumps(benchmark_dataset(args.worker, args.repeat, args.format, args.seed)))
+        return 0
+
+    results = [run_in_subprocess(name, args.repeat, args.format, args.seed) for name in args.dataset]
+    regressions = []
+    if args.baseline is not None:
+        with open(args.baseline) as baseline_file:
+            regressions = compare_to_baseline(results, json.load(baseline_file), args.tolerance)
+    if args.output is not None:
+        with open(args.output, 'w') as output_file:
+            json.dump(results, output_file, indent=2)
+
+    if args.json:
+        print(json.dumps({'results': results, 'regressions': regressions}, indent=2))
+    else:
+        for result in results:
+            shape = result['shape']
+            print(f"{result['dataset']}: {shape['rows']} rows x {shape['numeric']} numerical, "
+                  f"{shape['categorical']} categorical, {shape['dates']} date columns "
+                  f"({result['format']}), total {result['total_seconds']:.2f} s")
+            for stage, measurement in result['stages'].items():
+                peak = measurement['peak_rss_mb']
+                print(f"  {stage:<28} {measurement['seconds']:8.3f} s"
+                      + ("" if peak is None else f"  {peak:8.1f} MB peak"))
+        for regression in regressions:
+            unit = "s" if regression['metric'] == 'seconds' else "MB"
+            print(f"REGRESSION {regression['dataset']} {regression['stage']} {regression['metric']}: "
+                  f"{regression['baseline']:.3f} {unit} -> {regression['current']:.3f} {unit}")
+        if args.baseline is not None and not regressions:
+            print("OK: no regressions against the baseline.")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,315 @@
+import numpy as np
+import pandas as pd
+
+from row_fingerprints import DEFAULT_HLL_PRECISION, HyperLogLog
+
+DEFAULT_TOP_K = 10
+# Number of heavy-hitter candidates kept per column when counting categories in streaming mode
+DEFAULT_CATEGORY_CAPACITY = 1000
+# A column is flagged as high-cardinality above this many distinct values...
+HIGH_CARDINALITY_DISTINCT = 1000
+# ...or when most of its values are distinct, as in ID-like columns
+HIGH_CARDINALITY_RATIO = 0.5
+HIGH_CARDINALITY_MIN_COUNT = 100
+
+
+def value_hashes(values):
+    """
+    64-bit hash of every value, consistent across chunks whatever their dtype.
+
+    Parameters:
+    values (array-like): Category values.
+
+    Returns:
+    np.ndarray: uint64 hash of every value.
+    """
+    return pd.util.hash_array(np.asarray(values, dtype=object).astype(str).astype(object))
+
+
+class CategoryProfile:
+    """
+    Most frequent values and cardinality of one categorical column.
+
+    Attributes:
+    column (str): Column name.
+    count (int): Number of non-null values.
+    distinct (int): Number of distinct non-null values, estimated if not exact.
+    top (pd.Series): Counts of the most frequent values, in descending order.
+    exact (bool): Whether the counts are exact or sketch estimates.
+    """
+
+    def __init__(self, column, count, distinct, top, exact=True):
+        self.column = column
+        self.count = int(count)
+        self.distinct = int(distinct)
+        self.top = top
+        self.exact = exact
+
+    @property
+    def high_cardinality(self):
+        """
+        Whether the column has too many distinct values for value counts to be informative.
+        """
+        if self.distinct > HIGH_CARDINALITY_DISTINCT:
+            return True
+        return self.count >= HIGH_CARDINALITY_MIN_COUNT and self.distinct > HIGH_CARDINALITY_RATIO * self.count
+
+    @property
+    def other_count(self):
+        """
+        Number of values outside the top values.
+        """
+        return max(self.count - int(self.top.sum()), 0)
+
+    def to_record(self):
+        """
+        Summary of the profile for report tables.
+
+        Returns:
+        dict: Name, Distinct, Top, Top_Count and High_Cardinality.
+        """
+        return {'Name': self.column,
+                'Distinct': self.distinct,
+                'Top': self.top.index[0] if len(self.top) else None,
+                'Top_Count': int(self.top.iloc[0]) if len(self.top) else 0,
+                'High_Cardinality': self.high_cardinality}
+
+
+def profile_column(series, k=DEFAULT_TOP_K):
+    """
+    Exact top-k values and distinct count of a column in one hashing pass.
+
+    The column is factorized once and counted with a bincount; only the k largest counts are sorted, so
+    the cost does not grow with sorting millions of distinct values.
+
+    Parameters:
+    series (pd.Series): Categorical column.
+    k (int): Number of most frequent values to keep.
+
+    Returns:
+    CategoryProfile: Exact profile of the column.
+    """
+    codes, uniques = pd.factorize(series, sort=False)
+    codes = codes[codes >= 0]
+    counts = np.bincount(codes, minlength=len(uniques))
+    k = min(k, len(counts))
+    top = np.argpartition(-counts, k - 1)[:k] if k else np.array([], dtype=int)
+    top = top[np.argsort(-counts[top], kind='stable')]
+    top_counts = pd.Series(counts[top], index=pd.Index(np.asarray(uniques)[top], name=series.name), dtype='int64')
+    return CategoryProfile(series.name, len(codes), int(np.count_nonzero(counts)), top_counts)
+
+
+def profile_columns(df, columns, k=DEFAULT_TOP_K):
+    """
+    Exact profiles of several categorical columns.
+
+    Parameters:
+    df (pd.DataFrame): Input DataFrame.
+    columns (list): Categorical column names.
+    k (int): Number of most frequent values to keep per column.
+
+    Returns:
+    dict: CategoryProfile per column name.
+    """
+    return {column: profile_column(df[column], k) for column in columns}
+
+
+class MisraGries:
+    """
+    Misra-Gries heavy-hitter summary with a bounded number of counters.
+
+    Every value occurring more than total / (capacity + 1) times is kept, and kept counts underestimate
+    the true counts by at most that much. Summaries of separate chunks can be merged with the same bound.
+    """
+
+    def __init__(self, capacity=DEFAULT_CATEGORY_CAPACITY):
+        """
+        Initialize an empty summary.
+
+        Parameters:
+        capacity (int): Maximum number of counters.
+        """
+        self.capacity = capacity
+        self.counters = pd.Series(dtype='int64')
+
+    def update(self, counts):
+        """
+        Add weighted values, e.g. the value counts of a chunk.
+
+        Parameters:
+        counts (pd.Series): Counts indexed by value.
+
+        Returns:
+        MisraGries: The updated summary.
+        """
+        combined = self.counters.add(counts, fill_value=0).astype('int64')
+        if len(combined) > self.capacity:
+            # Subtracting the (capacity + 1)-th largest count keeps at most capacity counters
+            threshold = np.partition(combined.to_numpy(), len(combined) - self.capacity - 1)[
+                len(combined) - self.capacity - 1]
+            combined = combined - threshold
+            combined = combined[combined > 0]
+        self.counters = combined
+        return self
+
+    def merge(self, other):
+        """
+        Merge another summary into this one.
+
+        Parameters:
+        other (MisraGries): Summary to merge.
+
+        Returns:
+        MisraGries: The merged summary.
+        """
+        return self.update(other.counters)
+
+
+class CountMinSketch:
+    """
+    Count-Min sketch of value frequencies in a fixed depth x width table.
+
+    Estimates never undercount and overcount by at most about e / width of the total with high probability.
+    Sketches of the same shape are merged by adding their tables.
+    """
+
+    def __init__(self, width=2048, depth=4):
+        """
+        Initialize an empty sketch.
+
+        Parameters:
+        width (int): Counters per row.
+        depth (int): Number of rows, each with its own hash.
+        """
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+
+    def _indices(self, hashes):
+        # Rows use h1 + i * h2 over the two halves of the 64-bit hash
+        low = (hashes & np.uint64(0xFFFFFFFF)).astype(np.int64)
+        high = (hashes >> np.uint64(32)).astype(np.int64) | 1
+        return (low[None, :] + np.arange(self.depth)[:, None] * high[None, :]) % self.width
+
+    def update(self, hashes, counts):
+        """
+        Add counts of hashed values.
+
+        Parameters:
+        hashes (np.ndarray): uint64 value hashes, e.g. from value_hashes.
+        counts (np.ndarray): Count of every value.
+
+        Returns:
+        CountMinSketch: The updated sketch.
+        """
+        indices = self._indices(hashes)
+        for row in range(self.depth):
+            np.add.at(self.table[row], indices[row], counts)
+        return self
+
+    def estimate(self, hashes):
+        """
+        Estimate the counts of hashed values.
+
+        Parameters:
+        hashes (np.ndarray): uint64 value hashes.
+
+        Returns:
+        np.ndarray: Estimated count of every value.
+        """
+        indices = self._indices(hashes)
+        return self.table[np.arange(self.depth)[:, None], indices].min(axis=0)
+
+    def merge(self, other):
+        """
+        Merge another sketch of the same shape into this one.
+
+        Parameters:
+        other (CountMinSketch): Sketch to merge.
+
+        Returns:
+        CountMinSketch: The merged sketch.
+        """
+        if other.table.shape != self.table.shape:
+            raise ValueError("Cannot merge Count-Min sketches of different shape.")
+        self.table += other.table
+        return self
+
+
+class StreamingCategoryProfile:
+    """
+    Bounded-memory, mergeable profile of a categorical column read in chunks.
+
+    Heavy-hitter candidates come from a Misra-Gries summary, their counts from a Count-Min sketch and the
+    number of distinct values from a HyperLogLog sketch, so memory does not grow with the cardinality.
+    """
+
+    def __init__(self, capacity=DEFAULT_CATEGORY_CAPACITY, width=2048, depth=4, precision=DEFAULT_HLL_PRECISION):
+        """
+        Initialize an empty profile.
+
+        Parameters:
+        capacity (int): Number of heavy-hitter candidates.
+        width (int): Count-Min sketch width.
+        depth (int): Count-Min sketch depth.
+        precision (int): HyperLogLog precision.
+        """
+        self.count = 0
+        self.heavy_hitters = MisraGries(capacity)
+        self.frequencies = CountMinSketch(width, depth)
+        self.distinct = HyperLogLog(precision)
+
+    def update(self, series):
+        """
+        Add the values of a chunk of the column.
+
+        Parameters:
+        series (pd.Series): Column values.
+
+        Returns:
+        StreamingCategoryProfile: The updated profile.
+        """
+        counts = series.value_counts()
+        counts = counts[counts > 0]  # categorical dtypes also count unused categories
+        counts.index = counts.index.astype(object)
+        hashes = value_hashes(counts.index)
+        self.count += int(counts.sum())
+        self.heavy_hitters.update(counts)
+        self.frequencies.update(hashes, counts.to_numpy())
+        self.distinct.update(hashes)
+        return self
+
+    def merge(self, other):
+        """
+        Merge the profile of other rows of the same column into this one.
+
+        Parameters:
+        other (StreamingCategoryProfile): Profile to merge.
+
+        Returns:
+        StreamingCategoryProfile: The merged profile.
+        """
+        self.count += other.count
+        self.heavy_hitters.merge(other.heavy_hitters)
+        self.frequencies.merge(other.frequencies)
+        self.distinct.merge(other.distinct)
+        return self
+
+    def profile(self, column, k=DEFAULT_TOP_K):
+        """
+        Estimated top-k values and cardinality.
+
+        Parameters:
+        column (str): Column name.
+        k (int): Number of most frequent values to return.
+
+        Returns:
+        CategoryProfile: Estimated profile of the column.
+        """
+        candidates = self.heavy_hitters.counters.index
+        estimates = pd.Series(self.frequencies.estimate(value_hashes(candidates)) if len(candidates) else [],
+                              index=candidates, dtype='int64')
+        top = estimates.sort_values(ascending=False, kind='stable').head(k)
+        top.index.name = column
+        distinct = min(self.distinct.count(), self.count)
+        return CategoryProfile(column, self.count, distinct, top, exact=False)
@@ -1,5 +1,10 @@
+import argparse
+
 from runner import *
 from data_downloader import *
+from artifact_cache import ArtifactCache, DEFAULT_CACHE_DIRECTORY
+from instrumentation import instrument_from_environment
+from batch_runner import DEFAULT_RETRIES, DEFAULT_TIMEOUT, load_manifest, manifest_from_files, run_batch
 
 
 def greet_user():
@@ -42,7 +47,58 @@ def get_report_types():
         return []
 
 
-if __name__ == '__main__':
+def parse_arguments():
+    """
+    Parse the command-line arguments.
+
+    Returns:
+    argparse.Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Data Analysis CLI. Runs interactively unless --batch is given.")
+    parser.add_argument("--batch", nargs="?", const="", metavar="MANIFEST",
+                        help="Generate reports non-interactively for every dataset in a JSON manifest, or for "
+                             "every downloaded example CSV if no manifest is given.")
+    parser.add_argument("--reports", nargs="+", default=["pdf_visu", "pdf_summary"],
+                        choices=["pdf_visu", "pdf_summary"], help="Reports for the example CSVs in batch mode.")
+    parser.add_argument("--workers", type=int, default=None, help="Maximum number of concurrent worker processes.")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Maximum seconds per report.")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES, help="Retries per failed report.")
+    return parser.parse_args()
+
+
+def run_batch_mode(args):
+    """
+    Generate the reports of a batch manifest and print a summary of the results.
+
+    Parameters:
+    args (argparse.Namespace): Parsed command-line arguments.
+
+    Returns:
+    int: Process exit code, 0 if every report was generated.
+    """
+    if args.batch:
+        manifest = load_manifest(args.batch)
+    else:
+        manifest = manifest_from_files(read_example_files(), args.reports)
+
+    results = run_batch(manifest, max_workers=args.workers, timeout=args.timeout, retries=args.retries,
+                        cache_directory=DEFAULT_CACHE_DIRECTORY)
+    failed = [result for result in results if result['status'] != 'done']
+    print(f"{len(results) - len(failed)} of {len(results)} reports generated successfully.")
+    for result in failed:
+        print(f"{result['name']} {result['report']}: {result['status']}")
+        if result['error']:
+            print(result['error'])
+    return 1 if failed else 0
+
+
+def run_interactive():
+    """
+    Prompt for a dataset and report types and generate the reports.
+
+    Returns:
+    int: Process exit code.
+    """
     greet_user()
     custom_data_path = get_custom_data_path()
     if custom_data_path is None:
@@ -54,14 +110,29 @@ if __name__ == '__main__':
 
     if not report_types:
         print("No valid report types selected. Exiting.")
-        exit()
+        return 0
 
+    cache = ArtifactCache()
     for report_type in report_types:
         if report_type == "pdf_visu":
-            run_example_pdf_visu(df, name)
+            run_example_pdf_visu(df, name, cache=cache)
         elif report_type == "pdf_summary":
-            run_example_pdf_summary(df, name)
+            run_example_pdf_summary(df, name, cache=cache)
 
     print("Reports generated successfully.")
+    print(f"Artifact cache: {cache.stats()}")
+    cache.close()
 
     remove_directories()
+    return 0
+
+
+if __name__ == '__main__':
+    arguments = parse_arguments()
+    # EDA_TRACE=<path> writes a Chrome trace and run summary, EDA_PROFILE=<path> a cProfile profile
+    with instrument_from_environment():
+        if arguments.batch is not None:
+            exit_code = run_batch_mode(arguments)
+        else:
+            exit_code = run_interactive()
+    exit(exit_code)
@@ -0,0 +1,175 @@
+import operator
+
+import pandas as pd
+
+# Source type -> pyarrow.dataset format name
+COLUMNAR_FORMATS = {'parquet': 'parquet', 'feather': 'feather', 'arrow': 'ipc'}
+DEFAULT_COMPRESSION = 'zstd'
+
+_FILTER_OPERATORS = {
+    '==': operator.eq, '=': operator.eq, '!=': operator.ne,
+    '<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge,
+}
+
+
+def filters_to_expression(filters):
+    """
+    Convert filters to a pyarrow compute expression.
+
+    Parameters:
+    filters (list of tuple or pyarrow.compute.Expression or None): Either an expression, or a list of
+        (column, operator, value) tuples that must all hold. Supported operators are ==, !=, <, <=, >, >=,
+        'in' and 'not in'.
+
+    Returns:
+    pyarrow.compute.Expression or None: The combined expression.
+    """
+    import pyarrow.compute as pc
+
+    if filters is None or isinstance(filters, pc.Expression):
+        return filters
+
+    expression = None
+    for column, op, value in filters:
+        field = pc.field(column)
+        if op == 'in':
+            condition = field.isin(list(value))
+        elif op == 'not in':
+            condition = ~field.isin(list(value))
+        elif op in _FILTER_OPERATORS:
+            condition = _FILTER_OPERATORS[op](field, value)
+        else:
+            raise ValueError(f"Unsupported filter operator '{op}'.")
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def apply_filters(df, filters):
+    """
+    Apply a list of (column, operator, value) filters to an in-memory DataFrame.
+
+    Parameters:
+    df (pd.DataFrame): Input DataFrame.
+    filters (list of tuple or None): Filters that must all hold, as in filters_to_expression.
+
+    Returns:
+    pd.DataFrame: The rows matching every filter.
+    """
+    if not filters:
+        return df
+    mask = pd.Series(True, index=df.index)
+    for column, op, value in filters:
+        if op == 'in':
+            mask &= df[column].isin(list(value))
+        elif op == 'not in':
+            mask &= ~df[column].isin(list(value))
+        elif op in _FILTER_OPERATORS:
+            mask &= _FILTER_OPERATORS[op](df[column], value)
+        else:
+            raise ValueError(f"Unsupported filter operator '{op}'.")
+    return df[mask].reset_index(drop=True)
+
+
+def _dataset(file_path, source_type):
+    import pyarrow.dataset as ds
+    return ds.dataset(file_path, format=COLUMNAR_FORMATS[source_type])
+
+
+def read_columnar_schema(file_path, source_type):
+    """
+    Read the column names and types of a columnar file without reading its data.
+
+    Parameters:
+    file_path (str): Path of the Parquet, Feather or Arrow IPC file.
+    source_type (str): 'parquet', 'feather' or 'arrow'.
+
+    Returns:
+    dict: Column name to Arrow type string.
+    """
+    schema = _dataset(file_path, source_type).schema
+    return {field.name: str(field.type) for field in schema}
+
+
+def read_columnar(file_path, source_type, columns=None, filters=None):
+    """
+    Read a columnar file into a DataFrame, reading only the requested columns and matching rows.
+
+    Column projection avoids decoding unused columns, and for Parquet the filters are checked against
+    row group statistics first so row groups that cannot match are skipped entirely.
+
+    Parameters:
+    file_path (str): Path of the Parquet, Feather or Arrow IPC file.
+    source_type (str): 'parquet', 'feather' or 'arrow'.
+    columns (list or None): Columns to read. If None, all columns are read.
+    filters (list of tuple or pyarrow.compute.Expression or None): Row filters, see filters_to_expression.
+
+    Returns:
+    pd.DataFrame: The selected data.
+    """
+    table = _dataset(file_path, source_type).to_table(columns=columns, filter=filters_to_expression(filters))
+    return table.to_pandas()
+
+
+def columnar_chunk_reader(file_path, source_type, columns=None, filters=None):
+    """
+    Build a get_chunk function that streams record batches of a columnar file.
+
+    Parameters:
+    file_path (str): Path of the Parquet, Feather or Arrow IPC file.
+    source_type (str): 'parquet', 'feather' or 'arrow'.
+    columns (list or None): Columns to read. If None, all columns are read.
+    filters (list of tuple or pyarrow.compute.Expression or None): Row filters, see filters_to_expression.
+
+    Returns:
+    callable: Function returning a DataFrame with the next n rows, or None once the file is exhausted.
+    """
+    import pyarrow as pa
+
+    batches = _dataset(file_path, source_type).to_batches(columns=columns, filter=filters_to_expression(filters))
+    pending = []
+
+    def get_chunk(n):
+        rows = sum(len(batch) for batch in pending)
+        for batch in batches:
+            pending.append(batch)
+            rows += len(batch)
+            if rows >= n:
+                break
+        if rows == 0:
+            return None
+        table = pa.Table.from_batches(pending)
+        pending.clear()
+        if len(table) > n:
+            pending.extend(table.slice(n).to_batches())
+            table = table.slice(0, n)
+        return table.to_pandas()
+
+    return get_chunk
+
+
+def write_dataframe(df, file_path, source_type, compression=DEFAULT_COMPRESSION):
+    """
+    Write a DataFrame to a CSV or compressed columnar file.
+
+    Parameters:
+    df (pd.DataFrame): DataFrame to write.
+    file_path (str): Output path.
+    source_type (str): 'csv', 'parquet', 'feather' or 'arrow'.
+    compression (str or None): Codec for columnar formats, e.g. 'zstd', 'lz4' or 'snappy' (Parquet only).
+
+    Returns:
+    str: The output path.
+    """
+    if source_type == 'csv':
+        df.to_csv(file_path, index=False)
+    elif source_type == 'parquet':
+        df.to_parquet(file_path, index=False, compression=compression)
+    elif source_type in ('feather', 'arrow'):
+        import pyarrow as pa
+        import pyarrow.feather as feather
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        feather.write_feather(table, file_path, compression=compression or 'uncompressed')
+    else:
+        raise ValueError(f"Cannot write source type '{source_type}'.")
+    return file_path
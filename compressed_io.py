@@ -0,0 +1,125 @@
+import fnmatch
+import os
+import zipfile
+
+# File extension of every supported compression, read straight from the compressed bytes without extracting
+COMPRESSION_EXTENSIONS = {
+    '.gz': 'gzip',
+    '.gzip': 'gzip',
+    '.bz2': 'bz2',
+    '.xz': 'xz',
+    '.zst': 'zstd',
+    '.zstd': 'zstd',
+    '.zip': 'zip',
+}
+
+
+def compression_type(file_path):
+    """
+    Detect the compression of a file from its extension.
+
+    Parameters:
+    file_path (str): Path of the file.
+
+    Returns:
+    str or None: 'gzip', 'bz2', 'xz', 'zstd', 'zip', or None for uncompressed files.
+    """
+    return COMPRESSION_EXTENSIONS.get(os.path.splitext(file_path.lower())[1])
+
+
+def archive_members(file_path):
+    """
+    List the files of a zip archive, in archive order.
+
+    Parameters:
+    file_path (str): Path of the zip archive.
+
+    Returns:
+    list of str: Member names, directories excluded.
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        return [member.filename for member in archive.infolist() if not member.is_dir()]
+
+
+def select_member(file_path, pattern=None, is_readable=None):
+    """
+    Choose the member of a zip archive to read.
+
+    Parameters:
+    file_path (str): Path of the zip archive.
+    pattern (str or None): Glob pattern matched against the member names and their base names,
+                           e.g. '*international*.csv'. If None, the first readable member is chosen.
+    is_readable (callable or None): Function telling whether a member name has a readable file type.
+
+    Returns:
+    str: Member name.
+    """
+    members = archive_members(file_path)
+    if pattern is not None:
+        candidates = [member for member in members if fnmatch.fnmatch(member, pattern) or
+                      fnmatch.fnmatch(os.path.basename(member), pattern)]
+    else:
+        candidates = [member for member in members if is_readable is None or is_readable(member)]
+    if not candidates:
+        raise FileNotFoundError(f"No member of '{file_path}' matches {pattern or 'a readable file type'}. "
+                                f"Members: {members[:20]}")
+    return candidates[0]
+
+
+def inner_name(file_path, member=None):
+    """
+    Name of the data inside a compressed file, whose extension tells its file type.
+
+    Parameters:
+    file_path (str): Path of the compressed file.
+    member (str or None): Member of a zip archive.
+
+    Returns:
+    str: The member name for zip archives, the path without its compression extension otherwise.
+    """
+    if compression_type(file_path) == 'zip':
+        return member
+    return os.path.splitext(file_path)[0]
+
+
+def open_compressed(file_path, member=None):
+    """
+    Open a compressed file, or one member of a zip archive, as a stream of decompressed bytes.
+
+    Nothing is extracted to disk; data is decompressed as it is read. Zstandard needs the optional
+    zstandard package.
+
+    Parameters:
+    file_path (str): Path of the compressed file.
+    member (str or None): Member to read from a zip archive.
+
+    Returns:
+    file object: Binary stream of the decompressed data.
+    """
+    compression = compression_type(file_path)
+    if compression == 'zip':
+        archive = zipfile.ZipFile(file_path)
+        try:
+            stream = archive.open(member)
+        except Exception:
+            archive.close()
+            raise
+        # The member stream keeps its own handle on the archive file
+        archive.close()
+        return stream
+    if compression == 'gzip':
+        import gzip
+        return gzip.open(file_path, 'rb')
+    if compression == 'bz2':
+        import bz2
+        return bz2.open(file_path, 'rb')
+    if compression == 'xz':
+        import lzma
+        return lzma.open(file_path, 'rb')
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("Reading .zst files requires the optional zstandard package.") from None
+        return zstandard.ZstdDecompressor().stream_reader(open(file_path, 'rb'), closefd=True)
+    raise ValueError(f"'{file_path}' is not a compressed file.")
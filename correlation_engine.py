@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+
+CORRELATION_METHODS = ('pearson', 'spearman')
+DEFAULT_BLOCK_SIZE = 256
+
+
+def _as_float_matrix(df, columns=None):
+    data = df if columns is None else df[columns]
+    return data.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+
+
+def _complete_correlation(values, block_size):
+    """
+    Correlation of columns without missing values: standardize once, then one matrix product per block pair.
+    """
+    centered = values - values.mean(axis=0)
+    norms = np.sqrt(np.einsum('ij,ij->j', centered, centered))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        standardized = centered / norms
+    columns = values.shape[1]
+    corr = np.empty((columns, columns))
+    for start in range(0, columns, block_size):
+        block = standardized[:, start:start + block_size]
+        # Only blocks on and right of the diagonal are computed, the rest is mirrored
+        corr[start:start + block_size, start:] = block.T @ standardized[:, start:]
+        corr[start:, start:start + block_size] = corr[start:start + block_size, start:].T
+    return corr
+
+
+def _pairwise_correlation(values, block_size, min_periods):
+    """
+    Correlation of columns with missing values over the rows where both columns are present, from masked
+    sums computed with matrix products per block pair.
+    """
+    present = ~np.isnan(values)
+    mask = present.astype(float)
+    # Centering by the column means keeps the sums of squares numerically stable
+    centered = np.where(present, values - np.nanmean(values, axis=0), 0.0)
+    squared = centered * centered
+    columns = values.shape[1]
+    corr = np.empty((columns, columns))
+    for start in range(0, columns, block_size):
+        stop = min(start + block_size, columns)
+        x, x2, m = centered[:, start:stop], squared[:, start:stop], mask[:, start:stop]
+        y, y2, n = centered[:, start:], squared[:, start:], mask[:, start:]
+        count = m.T @ n
+        sum_x, sum_y = x.T @ n, m.T @ y
+        with np.errstate(divide='ignore', invalid='ignore'):
+            covariance = x.T @ y - sum_x * sum_y / count
+            variance_x = x2.T @ n - sum_x * sum_x / count
+            variance_y = m.T @ y2 - sum_y * sum_y / count
+            block = covariance / np.sqrt(variance_x * variance_y)
+        block[count < min_periods] = np.nan
+        corr[start:stop, start:] = block
+        corr[start:, start:stop] = block.T
+    return corr
+
+
+def correlation_matrix(df, columns=None, method='pearson', sample_rows=None, random_state=0,
+                       block_size=DEFAULT_BLOCK_SIZE, min_periods=2):
+    """
+    Compute the correlation matrix of numerical columns with blocked matrix products.
+
+    Without missing values, the columns are standardized once and every block of the matrix is a single
+    matrix product. With missing values, each pair of columns is correlated over the rows where both are
+    present, like DataFrame.corr, using masked sums. Spearman correlation is the Pearson correlation of the
+    column ranks; with missing values the ranks are taken per column rather than per pair of columns.
+
+    Parameters:
+    df (pd.DataFrame): Input DataFrame.
+    columns (list or None): Columns to correlate. If None, all columns are used.
+    method (str): 'pearson' or 'spearman'.
+    sample_rows (int or None): Correlate a uniform random sample of this many rows. If None, all rows are used.
+    random_state (int): Seed of the row sample.
+    block_size (int): Number of columns per block, bounding the size of the intermediate matrices.
+    min_periods (int): Minimum number of rows where both columns are present for a correlation to be computed.
+
+    Returns:
+    pd.DataFrame: Correlation matrix with NaN for constant columns and pairs with too few rows.
+    """
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"Unknown correlation method '{method}'. Use one of {list(CORRELATION_METHODS)}.")
+    data = df if columns is None else df[columns]
+    if sample_rows is not None and len(data) > sample_rows:
+        data = data.sample(n=sample_rows, random_state=random_state)
+    if method == 'spearman':
+        data = data.apply(pd.to_numeric, errors='coerce').rank()
+    values = _as_float_matrix(data)
+
+    if np.isnan(values).any():
+        corr = _pairwise_correlation(values, block_size, min_periods)
+    elif len(values) < min_periods:
+        corr = np.full((values.shape[1], values.shape[1]), np.nan)
+    else:
+        corr = _complete_correlation(values, block_size)
+    corr = np.clip(corr, -1.0, 1.0)
+    diagonal = np.diag_indices_from(corr)
+    corr[diagonal] = np.where(np.isnan(corr[diagonal]), np.nan, 1.0)
+    return pd.DataFrame(corr, index=data.columns, columns=data.columns)
+
+
+def top_correlated_pairs(corr, k=10, absolute=True):
+    """
+    Select the most strongly correlated pairs of distinct columns.
+
+    Parameters:
+    corr (pd.DataFrame): Correlation matrix, e.g. from correlation_matrix.
+    k (int): Number of pairs to return.
+    absolute (bool): Rank by absolute correlation, so strong negative correlations are included.
+
+    Returns:
+    pd.DataFrame: Columns 'Column 1', 'Column 2' and 'Correlation', strongest pair first.
+    """
+    values = corr.to_numpy()
+    rows, cols = np.triu_indices(len(values), k=1)
+    pair_values = values[rows, cols]
+    valid = ~np.isnan(pair_values)
+    rows, cols, pair_values = rows[valid], cols[valid], pair_values[valid]
+    strength = np.abs(pair_values) if absolute else pair_values
+    k = min(k, len(strength))
+    top = np.argpartition(-strength, k - 1)[:k] if k else np.array([], dtype=int)
+    top = top[np.argsort(-strength[top], kind='stable')]
+    return pd.DataFrame({'Column 1': corr.index[rows[top]], 'Column 2': corr.columns[cols[top]],
+                         'Correlation': pair_values[top]})
+
+
+def cluster_order(corr):
+    """
+    Order columns so that strongly correlated columns are adjacent, by average-linkage hierarchical
+    clustering on 1 - |correlation|.
+
+    Parameters:
+    corr (pd.DataFrame): Correlation matrix.
+
+    Returns:
+    list: Column names in cluster order.
+    """
+    from scipy.cluster.hierarchy import leaves_list, linkage
+    from scipy.spatial.distance import squareform
+
+    if len(corr) < 3:
+        return list(corr.columns)
+    distance = 1 - np.abs(np.nan_to_num(corr.to_numpy(), nan=0.0))
+    np.fill_diagonal(distance, 0)
+    distance = np.clip((distance + distance.T) / 2, 0, None)
+    order = leaves_list(linkage(squareform(distance, checks=False), method='average'))
+    return list(corr.columns[order])
@@ -1,147 +1,222 @@
+import logging
+
+import numpy as np
 import pandas as pd
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from datasist.structdata import detect_outliers
 from helper import *
 from data_downloader import download_example
+from statistics_engine import DataFrameStatistics
+from row_fingerprints import RowFingerprintIndex
+from outliers import detect_outliers_frame
+from correlation_engine import correlation_matrix, top_correlated_pairs
+from feature_transformer import EncodeScaleTransformer
+from instrumentation import count, traced
+
+logger = logging.getLogger(__name__)
+
 
 class DataAnalyzer:
-    _instance = None
+    def __init__(self, df, preprocessor=None):
+        """
+        Initialize DataAnalyzer instance.
+
+        Every instance keeps the column lists of its own DataFrame, so several datasets can be analyzed
+        in one process, also from different threads.
+
+        Parameters:
+        df (pd.DataFrame): Input DataFrame.
+        preprocessor (DataPreprocessor or None): Already fitted preprocessor for df, to avoid preprocessing twice.
+        """
+        self.preprocessor = DataPreprocessor(df) if preprocessor is None else preprocessor
+        pd.set_option('display.max_rows', None)
+
+        self.numerical_columns = self.preprocessor.numerical_columns
+        self.categorical_columns = self.preprocessor.categorical_columns
+        self.datetime_columns = self.preprocessor.datetime_columns
 
-    def __new__(cls, df):
+    @traced('statistics.summary', 'statistic')
+    def compute_statistics(self, df, quantile_capacity=None, value_counts=True):
         """
-        Create a new instance of DataAnalyzer if it doesn't exist.
+        Compute counts, nulls, moments, quantiles and value counts for every column in one pass.
 
         Parameters:
         df (pd.DataFrame): Input DataFrame.
+        quantile_capacity (int or None): Capacity of the quantile sketches. None (the default for in-memory
+                                         DataFrames) keeps every value for exact quantiles.
+        value_counts (bool): Count the values of the categorical columns. Disable when category profiles
+                             are already available.
 
         Returns:
-        DataAnalyzer instance.
+        DataFrameStatistics: Mergeable statistics of the DataFrame.
         """
-        if cls._instance is None:
-            cls._instance = super(DataAnalyzer, cls).__new__(cls)
-        return cls._instance
+        categorical_columns = self.categorical_columns if value_counts else []
+        return DataFrameStatistics.from_dataframe(df, self.numerical_columns, categorical_columns,
+                                                  quantile_capacity=quantile_capacity)
 
-    def __init__(self, df):
+    @staticmethod
+    def row_fingerprints(df):
         """
-        Initialize DataAnalyzer instance.
+        Hash every row of the DataFrame once, to share between duplicate counts and deduplication.
 
         Parameters:
         df (pd.DataFrame): Input DataFrame.
-        """
-        if hasattr(self, 'initialized'):
-            return
-        self.preprocessor = DataPreprocessor(df)  # Pass the DataFrame
-        pd.set_option('display.max_rows', None)
 
-        self.numerical_columns = self.preprocessor.numerical_columns
-        self.categorical_columns = self.preprocessor.categorical_columns
-        self.datetime_columns = self.preprocessor.datetime_columns
+        Returns:
+        RowFingerprintIndex: Per-row 64-bit fingerprints.
+        """
+        return RowFingerprintIndex(df)
 
     @staticmethod
-    def duplicates_nulls_percentage(df):
+    @traced('statistics.duplicates_nulls', 'statistic')
+    def duplicates_nulls_percentage(df, statistics=None, fingerprints=None):
         """
         Calculate the percentage of duplicates and null values in the DataFrame.
 
         Parameters:
         df (pd.DataFrame): Input DataFrame.
+        statistics (DataFrameStatistics or None): Precomputed statistics to take the null counts from.
+        fingerprints (RowFingerprintIndex or None): Precomputed row fingerprints of df.
 
         Returns:
         tuple: A tuple containing duplicate percentage and null percentage.
         """
         try:
-            duplicate_percentage = (df.duplicated().mean() * 100).round(2)
-            null_percentage = (df.isnull().mean() * 100).round(2)
+            fingerprints = RowFingerprintIndex(df) if fingerprints is None else fingerprints
+            duplicate_percentage = fingerprints.duplicate_percentage()
+            if statistics is None:
+                null_percentage = (df.isnull().mean() * 100).round(2)
+            else:
+                null_percentage = statistics.null_percentage()
             return duplicate_percentage, null_percentage
         except Exception as e:
-            print("Error occurred while calculating duplicate and null percentages.")
-            print(f"Error message: {str(e)}")
+            logger.error("Error occurred while calculating duplicate and null percentages. Error message: %s", e)
+            count('errors')
             return None, None
 
     @staticmethod
-    def remove_duplicates_and_nulls_from_dataframe(df):
+    @traced('statistics.deduplicate', 'statistic')
+    def remove_duplicates_and_nulls_from_dataframe(df, fingerprints=None):
         """
-        Remove duplicates and null values from the DataFrame in place.
+        Remove duplicates and null values from the DataFrame in place, in a single drop.
 
         Parameters:
         df (pd.DataFrame): Input DataFrame.
+        fingerprints (RowFingerprintIndex or None): Precomputed row fingerprints of df, updated to match
+                                                    the remaining rows.
 
         Returns:
         None
         """
         try:
-            df.drop_duplicates(inplace=True)
-            df.dropna(inplace=True)
-            df.reset_index(drop=True, inplace=True)
+            fingerprints = RowFingerprintIndex(df) if fingerprints is None else fingerprints
+            fingerprints.drop_duplicates(df, drop_nulls=True)
         except Exception as e:
-            print("Error occurred while removing duplicates and null values.")
-            print(f"Error message: {str(e)}")
+            logger.error("Error occurred while removing duplicates and null values. Error message: %s", e)
+            count('errors')
 
-    def remove_outliers(self, df, cols=None):
+    @traced('statistics.outliers', 'statistic')
+    def remove_outliers(self, df, cols=None, method='iqr', threshold=None, approximate=False):
         """
         Detect and remove outliers from the DataFrame.
 
         Parameters:
         df (pd.DataFrame): Input DataFrame.
         cols (list or None): List of column names to analyze. If None, use all numerical columns.
+        method (str): Outlier method, 'iqr', 'zscore' or 'mad'.
+        threshold (float or None): Method threshold. If None, the method's default is used.
+        approximate (bool): Use approximate quantiles for data too large for exact sorting.
 
         Returns:
         list: A list of dictionaries containing outlier information.
         """
         try:
             idx = self.numerical_columns if cols is None else cols
-            dic = []
-            for column_name in idx:
-                outliers_indices = detect_outliers(df, 0, [column_name])
-                dic.append({'Name': column_name,
-                            'Percentage': len(outliers_indices) / len(df[column_name]),
-                            'Number_Of_Outliers': len(outliers_indices)
-                            })
-
-            # Replace detect_outliers with your outlier detection function
-            # df.drop(outliers_indices, inplace=True, axis=0)
-            return dic
+            report = detect_outliers_frame(df, idx, method=method, threshold=threshold, approximate=approximate)
+
+            # Use detect_outliers_frame(..., return_mask=True).mask to drop the outlier rows
+            # df.drop(df.index[report.mask.any(axis=1)], inplace=True, axis=0)
+            records = report.to_records()
+            for info in records:
+                count('outliers', info['Number_Of_Outliers'], info['Name'])
+            return records
         except Exception as e:
-            print("Error occurred while removing outliers.")
-            print(f"Error message: {str(e)}")
+            logger.error("Error occurred while removing outliers. Error message: %s", e)
+            count('errors')
             return 0
 
+    @traced('statistics.correlations', 'statistic')
+    def strongest_correlations(self, df, k=10, method='pearson', sample_rows=None):
+        """
+        Find the most strongly correlated pairs of numerical columns.
+
+        Parameters:
+        df (pd.DataFrame): Input DataFrame.
+        k (int): Number of pairs to return.
+        method (str): 'pearson' or 'spearman'.
+        sample_rows (int or None): Correlate a random sample of at most this many rows. If None, all rows are used.
+
+        Returns:
+        pd.DataFrame: Columns 'Column 1', 'Column 2' and 'Correlation', strongest absolute correlation first.
+        """
+        try:
+            corr = correlation_matrix(df, self.numerical_columns, method=method, sample_rows=sample_rows)
+            return top_correlated_pairs(corr, k)
+        except Exception as e:
+            logger.error("Error occurred while computing correlations. Error message: %s", e)
+            count('errors')
+            return None
+
     @staticmethod
-    def dataframe_summary_to_dict(df):
+    def dataframe_summary_to_dict(df, statistics=None):
         """
         Generate a summary dictionary from the DataFrame's statistics.
 
         Parameters:
         df (pd.DataFrame): Input DataFrame.
+        statistics (DataFrameStatistics or None): Precomputed statistics. If None, they are computed from df.
 
         Returns:
         dict: A dictionary containing summary statistics.
         """
-        summary = df.describe(include='all').to_dict()
-        return summary
-
-    def encode_scale_features(self, df):
+        if statistics is None:
+            statistics = DataFrameStatistics.from_dataframe(df, quantile_capacity=None)
+        summary = statistics.to_dict()
+        # Datetime columns, summarized as by describe(include='all')
+        for column in df.select_dtypes(include=DATETIME_DTYPES).columns:
+            values = df[column].dropna()
+            counts = values.value_counts()
+            summary[column] = {'count': len(values), 'unique': len(counts),
+                               'top': counts.index[0] if len(counts) else np.nan,
+                               'freq': counts.iloc[0] if len(counts) else np.nan,
+                               'first': values.min() if len(values) else np.nan,
+                               'last': values.max() if len(values) else np.nan}
+        return {column: summary[column] for column in df.columns if column in summary}
+
+    @traced('encode_scale', 'statistic')
+    def encode_scale_features(self, df, transformer=None, n_jobs=-1):
         """
-        Encode and scale features in the DataFrame.
+        Encode and scale features in the DataFrame in place.
 
         Parameters:
         df (pd.DataFrame): Input DataFrame.
+        transformer (EncodeScaleTransformer or None): Already fitted transformer, e.g. loaded from a previous
+                                                      run, to give new data the same scaling and codes. If None,
+                                                      a new transformer is fitted on df.
+        n_jobs (int): Number of threads encoding categorical columns. -1 uses all CPUs.
 
         Returns:
-        None
+        EncodeScaleTransformer or None: The fitted transformer, or None if encoding failed.
         """
         try:
-            numerical_features = self.numerical_columns
-            categorical_features = self.categorical_columns
-
-            scaler = StandardScaler()
-            label_encoder = LabelEncoder()
-
-            df[numerical_features] = scaler.fit_transform(df[numerical_features])
-
-            for cat_feature in categorical_features:
-                df[cat_feature] = label_encoder.fit_transform(df[cat_feature])
-
-            df[categorical_features] = df[categorical_features].astype("category")
+            if transformer is None:
+                transformer = EncodeScaleTransformer(self.numerical_columns, self.categorical_columns, n_jobs=n_jobs)
+                transformer.fit(df)
+            transformer.transform(df, inplace=True)
+            for column, classes in transformer.classes_.items():
+                count('categories', len(classes), column)
+
+            df[transformer.categorical_columns] = df[transformer.categorical_columns].astype("category")
+            return transformer
         except Exception as e:
-            print("Error occurred while encoding features.")
-            print(f"Error message: {str(e)}")
+            logger.error("Error occurred while encoding features. Error message: %s", e)
+            count('errors')
+            return None
@@ -1,46 +1,67 @@
+import contextlib
+import io
+import itertools
 import os
-import kaggle
+import numpy as np
 import pandas as pd
-import sqlite3
-import os
 from helper import create_directory
+from memory_optimizer import optimize_dataframe_memory
+from columnar_io import COLUMNAR_FORMATS, apply_filters, columnar_chunk_reader, read_columnar
+from instrumentation import count, traced
+from compressed_io import compression_type, inner_name, open_compressed, select_member
+from sql_source import SqlSource
+from dataset_acquisition import MANIFEST_FILE_NAME, AcquisitionManifest, KaggleSource, acquire_datasets
+
+DEFAULT_CHUNK_SIZE = 100_000
+PROBE_CHUNK_SIZE = 1_000
+SOURCE_TYPE_EXTENSIONS = {
+    'csv': ('.csv',),
+    'excel': ('.xlsx', '.xlsm', '.xls'),
+    'db': ('.db', '.sqlite', '.sqlite3'),
+    'parquet': ('.parquet', '.pq'),
+    'feather': ('.feather',),
+    'arrow': ('.arrow', '.ipc'),
+}
+# Source types read from a decompressing stream; the others need random access to an uncompressed file
+STREAMABLE_SOURCE_TYPES = ('csv', 'excel')
 
 
 def download_dataset(pattern="international", dataset_name="parulpandey/us-international-air-traffic-data",
-                     destination_directory="./Data"):
+                     destination_directory="./Data", refresh=False, extract=True):
     """
     Download a dataset from Kaggle.
 
+    The archive is extracted in process and recorded in the acquisition manifest of the destination directory,
+    so the dataset is neither downloaded nor unpacked again while its files are intact.
+
     Parameters:
-    pattern (str): A pattern to check for existing files.
+    pattern (str): A pattern to recognize files downloaded before the manifest existed.
     dataset_name (str): The name of the Kaggle dataset.
     destination_directory (str): The directory to save the downloaded dataset.
+    refresh (bool): Ask Kaggle whether the dataset changed even if its files are present.
+    extract (bool): Extract the archive. If False, the zip is kept and read directly with
+                    read_file_to_dataframe(path, member=...), which needs no scratch space for the uncompressed data.
 
     Returns:
-    None
+    list of str: Paths of the dataset files.
     """
     create_directory(destination_directory)
-    files_with_pattern = [file for file in os.listdir(destination_directory) if pattern in file.lower()]
-
-    if files_with_pattern:
-        print(f"File with '{pattern}' in its name already exists.")
-    else:
-        try:
-            # Download the dataset using Kaggle API
-            kaggle.api.dataset_download_files(dataset_name, path=destination_directory, unzip=True)
-            print("Dataset downloaded successfully.")
-
-            # Get the name of the downloaded zip file
-            zip_file_name = [file for file in os.listdir(destination_directory) if file.endswith('.zip')][0]
-
-            # Unzip the downloaded file
-            os.system(f'unzip {os.path.join(destination_directory, zip_file_name)} -d {destination_directory}')
-
-            # Remove the zipped file
-            os.remove(os.path.join(destination_directory, zip_file_name))
-            print("Zipped file removed.")
-        except Exception as e:
-            print(f"Error occurred while downloading and processing the dataset: {e}")
+    manifest = AcquisitionManifest(os.path.join(destination_directory, MANIFEST_FILE_NAME))
+    outputs = manifest.source_outputs(dataset_name, destination_directory)
+    if not refresh:
+        if outputs is not None:
+            print(f"Dataset '{dataset_name}' is already downloaded.")
+            return outputs
+        files_with_pattern = [file for file in os.listdir(destination_directory) if pattern in file.lower()]
+        if files_with_pattern:
+            print(f"File with '{pattern}' in its name already exists.")
+            return [os.path.join(destination_directory, file) for file in files_with_pattern]
+
+    results = acquire_datasets([KaggleSource(dataset_name)], destination_directory, extract=extract)
+    outputs = [output for result in results for output in result['outputs']]
+    if all(result['status'] != 'failed' for result in results):
+        print("Dataset downloaded successfully.")
+    return outputs
 
 
 def extract_source_type(string):
@@ -53,6 +74,11 @@ def extract_source_type(string):
     Returns:
     str or None: The detected source type or None if not recognized.
     """
+    extension = os.path.splitext(string.lower())[1]
+    for source_type, extensions in SOURCE_TYPE_EXTENSIONS.items():
+        if extension in extensions:
+            return source_type
+
     source_type_patterns = {
         'csv': r'\b(csv)\b',
         'excel': r'\b(excel|xlsx)\b',
@@ -67,39 +93,287 @@ def extract_source_type(string):
     return None
 
 
-def read_file_to_dataframe(file_path):
+def resolve_compressed_source(file_path, member=None):
+    """
+    Find the data inside a compressed file and its source type.
+
+    Parameters:
+    file_path (str): Path of the file.
+    member (str or None): Glob pattern choosing the member of a zip archive. If None, the first CSV or Excel
+                          member is read.
+
+    Returns:
+    tuple: Compression (None for uncompressed files), the chosen zip member (or None) and the source type.
+    """
+    compression = compression_type(file_path)
+    if compression is None:
+        return None, None, extract_source_type(file_path)
+    if compression == 'zip':
+        member = select_member(file_path, member,
+                               lambda name: extract_source_type(name) in STREAMABLE_SOURCE_TYPES)
+    return compression, member, extract_source_type(inner_name(file_path, member))
+
+
+def _open_source(file_path, compression, member):
+    """
+    Context manager giving the path of an uncompressed file, or a decompressing stream of a compressed one.
+    """
+    if compression is None:
+        return contextlib.nullcontext(file_path)
+    return open_compressed(file_path, member)
+
+
+def _columns_with_filters(columns, filters):
+    """
+    Columns to read so the filters can be applied: the selected columns plus the filtered ones, which are
+    dropped once the rows are filtered.
+    """
+    if columns is None or not filters:
+        return columns
+    return list(dict.fromkeys(list(columns) + [column for column, _, _ in filters]))
+
+
+@traced('load')
+def read_file_to_dataframe(file_path, optimize_memory=False, columns=None, filters=None, member=None, table=None):
     """
     Read a file into a pandas DataFrame based on its source type.
 
     Parameters:
     file_path (str): The path of the file to be read.
+    optimize_memory (bool): Downcast numerical columns and convert string columns to category or
+                            pyarrow-backed strings after loading, printing the bytes saved.
+    columns (list or None): Columns to read. If None, all columns are read.
+    filters (list of tuple or None): (column, operator, value) row filters. They are pushed down to the reader
+                                     for Parquet, Feather and Arrow files and applied after loading otherwise.
+    member (str or None): For zip archives, a glob pattern choosing the member to read, e.g. '*.csv'. CSV and
+                          Excel data in .zip, .gz, .bz2, .xz and .zst files is decompressed as it is parsed,
+                          without extracting it to disk.
+    table (str or None): Table of a SQLite database to read. If None, the first table is read. Column
+                         selection and filters are pushed down into the SQL query.
 
     Returns:
     pandas.DataFrame or None: The DataFrame containing the file's data or None if an error occurred.
     """
-    # Extract the source type from the file path
-    source_type = extract_source_type(file_path)
+    # Extract the source type from the file path, or from the archive member
+    compression, member, source_type = resolve_compressed_source(file_path, member)
 
     if source_type is None:
         print("Unknown file format. Cannot read the file.")
         return None
+    if compression is not None and source_type not in STREAMABLE_SOURCE_TYPES:
+        print(f"Cannot read {source_type} data from a compressed file. Extract it first.")
+        return None
 
     # Read the file into a data frame based on the source type
-    if source_type == 'csv':
-        df = pd.read_csv(file_path)
-    elif source_type == 'excel':
-        df = pd.read_excel(file_path)
+    if source_type in STREAMABLE_SOURCE_TYPES:
+        with _open_source(file_path, compression, member) as source:
+            usecols = _columns_with_filters(columns, filters)
+            if source_type == 'csv':
+                df = pd.read_csv(source, usecols=usecols)
+            else:
+                df = pd.read_excel(source, usecols=usecols)
     elif source_type == 'db':
-        # Replace the database connection details below with your database connection
-        conn = sqlite3.connect(file_path)
-        query = "SELECT * FROM your_table_name;"
-        df = pd.read_sql_query(query, conn)
-        conn.close()
+        df = SqlSource(file_path).read(table, columns=columns, filters=filters)
+    elif source_type in COLUMNAR_FORMATS:
+        df = read_columnar(file_path, source_type, columns=columns, filters=filters)
     else:
         print("Unknown source type. Cannot read the file.")
         return None
 
-    return df, os.path.basename(file_path)
+    if source_type not in COLUMNAR_FORMATS and source_type != 'db':
+        df = apply_filters(df, filters)
+        if columns is not None and filters:
+            df = df[list(columns)]
+
+    if optimize_memory:
+        report = optimize_dataframe_memory(df)
+        saved = sum(column_report['bytes_saved'] for column_report in report.values())
+        print(f"Memory optimization saved {saved / 1024 ** 2:.2f} MB across {len(report)} columns.")
+
+    count('rows_loaded', len(df))
+    return df, os.path.basename(member if compression == 'zip' else file_path)
+
+
+def _iter_sized_chunks(get_chunk, chunk_size=None, max_chunk_bytes=None):
+    """
+    Pull DataFrame chunks from a reader until it is exhausted, sizing each chunk by rows or bytes.
+
+    Parameters:
+    get_chunk (callable): Function taking a row count and returning a DataFrame with at most that many rows,
+                          or None/an empty DataFrame once the source is exhausted.
+    chunk_size (int or None): Maximum number of rows per chunk.
+    max_chunk_bytes (int or None): Memory budget per chunk. The rows per chunk are re-estimated from the
+                                   deep memory usage of the previous chunk.
+
+    Yields:
+    pandas.DataFrame: The next chunk of rows.
+    """
+    if chunk_size is None and max_chunk_bytes is None:
+        chunk_size = DEFAULT_CHUNK_SIZE
+
+    rows = chunk_size
+    if max_chunk_bytes is not None:
+        rows = PROBE_CHUNK_SIZE if chunk_size is None else min(chunk_size, PROBE_CHUNK_SIZE)
+
+    while True:
+        chunk = get_chunk(rows)
+        if chunk is None or chunk.empty:
+            return
+        yield chunk
+
+        if max_chunk_bytes is not None:
+            bytes_per_row = max(chunk.memory_usage(index=True, deep=True).sum() / len(chunk), 1)
+            rows = max(1, int(max_chunk_bytes // bytes_per_row))
+            if chunk_size is not None:
+                rows = min(rows, chunk_size)
+
+
+def _filter_chunks(chunks, filters, columns=None):
+    """
+    Apply row filters to a stream of chunks read without pushdown, skipping chunks left empty.
+
+    Parameters:
+    chunks (iterable of pandas.DataFrame): Stream of chunks.
+    filters (list of tuple or None): (column, operator, value) filters, as in columnar_io.apply_filters.
+    columns (list or None): Columns to keep after filtering. If None, all columns are kept.
+
+    Yields:
+    pandas.DataFrame: The next non-empty filtered chunk.
+    """
+    if not filters and columns is None:
+        yield from chunks
+        return
+    for chunk in chunks:
+        chunk = apply_filters(chunk, filters)
+        if columns is not None:
+            chunk = chunk[list(columns)]
+        if not chunk.empty:
+            yield chunk
+
+
+def _records_chunk_reader(rows_iterator, columns):
+    """
+    Wrap an iterator of row tuples into a get_chunk function for _iter_sized_chunks.
+
+    Parameters:
+    rows_iterator (iterator): Iterator yielding row tuples.
+    columns (list): Column names for the rows.
+
+    Returns:
+    callable: Function returning a DataFrame of the next n rows.
+    """
+    def get_chunk(n):
+        records = list(itertools.islice(rows_iterator, n))
+        if not records:
+            return None
+        return pd.DataFrame.from_records(records, columns=columns)
+
+    return get_chunk
+
+
+def read_file_in_chunks(file_path, chunk_size=None, max_chunk_bytes=None, query=None, columns=None,
+                        filters=None, member=None, table=None):
+    """
+    Stream a file as bounded-size pandas DataFrame chunks based on its source type.
+
+    Only one chunk is held in memory at a time, so peak memory depends on the chunk size rather
+    than on the size of the file.
+
+    Parameters:
+    file_path (str): The path of the file to be read.
+    chunk_size (int or None): Maximum number of rows per chunk. Defaults to DEFAULT_CHUNK_SIZE when no
+                              byte budget is given either.
+    max_chunk_bytes (int or None): Approximate in-memory size budget per chunk in bytes.
+    query (str or None): SQL query used for database sources. If None, the table is read with the columns and
+                         filters pushed down into SQL.
+    columns (list or None): Columns to read. If None, all columns are read.
+    filters (list of tuple or None): (column, operator, value) row filters pushed down into Parquet, Feather
+                                     and Arrow scans and into SQL queries, and applied to every CSV and Excel
+                                     chunk as it is read.
+    member (str or None): For zip archives, a glob pattern choosing the member to read. Compressed CSV and
+                          Excel data is decompressed chunk by chunk as it is read.
+    table (str or None): Table of a SQLite database to read when no query is given. If None, the first table
+                         is read.
+
+    Yields:
+    pandas.DataFrame: The next chunk of the file.
+    """
+    compression, member, source_type = resolve_compressed_source(file_path, member)
+
+    if compression is not None and source_type is not None and source_type not in STREAMABLE_SOURCE_TYPES:
+        print(f"Cannot read {source_type} data from a compressed file in chunks. Extract it first.")
+    elif source_type == 'csv':
+        with _open_source(file_path, compression, member) as source, \
+                pd.read_csv(source, iterator=True, usecols=_columns_with_filters(columns, filters)) as reader:
+            def get_chunk(n):
+                try:
+                    return reader.get_chunk(n)
+                except StopIteration:
+                    return None
+
+            yield from _filter_chunks(_iter_sized_chunks(get_chunk, chunk_size, max_chunk_bytes), filters,
+                                      columns if filters else None)
+    elif source_type == 'excel':
+        from openpyxl import load_workbook
+
+        with _open_source(file_path, compression, member) as source:
+            # openpyxl needs random access, so a compressed workbook is decompressed into memory
+            workbook = load_workbook(source if compression is None else io.BytesIO(source.read()),
+                                     read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            yield from _filter_chunks(_iter_sized_chunks(_records_chunk_reader(rows, list(header)), chunk_size,
+                                                         max_chunk_bytes), filters, columns)
+        finally:
+            workbook.close()
+    elif source_type == 'db':
+        # Rows are fetched arraysize at a time on a pooled connection
+        source = SqlSource(file_path)
+        if query is None:
+            yield from source.read_chunks(table, columns, filters, chunk_size, max_chunk_bytes)
+        else:
+            yield from source.query_chunks(query, chunk_size=chunk_size, max_chunk_bytes=max_chunk_bytes)
+    elif source_type in COLUMNAR_FORMATS:
+        get_chunk = columnar_chunk_reader(file_path, source_type, columns=columns, filters=filters)
+        yield from _iter_sized_chunks(get_chunk, chunk_size, max_chunk_bytes)
+    else:
+        print("Unknown file format. Cannot read the file.")
+
+
+def sample_chunks(chunks, n_rows, random_state=None):
+    """
+    Draw a uniform random sample of rows from a stream of DataFrame chunks.
+
+    Every row gets a random key and only the n_rows rows with the smallest keys are kept, so the
+    memory used is bounded by n_rows plus one chunk.
+
+    Parameters:
+    chunks (iterable of pandas.DataFrame): Stream of chunks, e.g. from read_file_in_chunks.
+    n_rows (int): Number of rows to keep.
+    random_state (int or None): Seed for the random number generator.
+
+    Returns:
+    pandas.DataFrame or None: The sampled rows in stream order, or None if the stream was empty.
+    """
+    rng = np.random.default_rng(random_state)
+    key_column = "__sample_key__"
+    sample = None
+    offset = 0
+
+    for chunk in chunks:
+        chunk = chunk.set_axis(pd.RangeIndex(offset, offset + len(chunk)))
+        offset += len(chunk)
+        chunk[key_column] = rng.random(len(chunk))
+        sample = chunk if sample is None else pd.concat([sample, chunk])
+        if len(sample) > n_rows:
+            sample = sample.nsmallest(n_rows, key_column)
+
+    if sample is None:
+        return None
+    return sample.drop(columns=key_column).sort_index().reset_index(drop=True)
 
 
 def download_example():
@@ -1,81 +1,275 @@
+import functools
 import os
+import tempfile
+import threading
 
 import matplotlib.pyplot as plt
+import numpy as np
 import seaborn as sns
 from helper import *
+from statistics_engine import NumericMoments
+from artifact_cache import fingerprint
+from image_buffers import encode_figure
+from categorical_profiles import profile_column, profile_columns
+from correlation_engine import cluster_order, correlation_matrix
+from facet_plots import DEFAULT_FACET_COLUMNS, DEFAULT_PLOTS_PER_PAGE, FacetPage
+from instrumentation import traced
 import datetime
 
+# Default output directory for callers that do not scope their images to a DataVisualization instance
 directory_name = None
+_directory_lock = threading.Lock()
+# pyplot keeps global figure state, so figures are built and saved one thread at a time
+_pyplot_lock = threading.RLock()
 
+# Correlation matrices up to this many columns are annotated with their values, larger ones are clustered
+ANNOTATED_CORRELATION_COLUMNS = 15
+# Column names are shown on clustered correlation matrices up to this many columns
+LABELLED_CORRELATION_COLUMNS = 80
+# The correlation matrix plot is computed from a random sample of at most this many rows
+CORRELATION_SAMPLE_ROWS = 200_000
 
-def make_dir():
+
+def make_dir(set_global=True):
     """
-    Create a directory with a formatted timestamp.
+    Create a uniquely named directory with a formatted timestamp.
+
+    Parameters:
+    set_global (bool): Whether to make it the module-level default output directory.
+
+    Returns:
+    str: The directory name.
     """
     global directory_name
     current_datetime = datetime.datetime.now()
     formatted_datetime = current_datetime.strftime('%Y-%m-%d_%H-%M-%S')
-    directory_name = f'directory_{formatted_datetime}'
-    os.makedirs(directory_name)
-    current_time = datetime.datetime.now().time()
-    formatted_time = current_time.strftime('%H-%M-%S')
+    name = os.path.basename(tempfile.mkdtemp(prefix=f'directory_{formatted_datetime}_', dir='.'))
+    if set_global:
+        directory_name = name
+    return name
 
 
-def save_img(title: str, fig, fig_ax=None):
+def save_img(title: str, fig, fig_ax=None, directory=None, settings=None):
     """
-    Save the given figure and optionally axis to an image file.
-    """
-    if directory_name is None:
-        make_dir()
+    Save the given figure and optionally axis to an image file or an in-memory image.
+
+    Parameters:
+    title (str): Plot title, used as the file name.
+    fig: Figure to save.
+    fig_ax: Optional (figure, axis) pair to return instead of saving.
+    directory (str or None): Output directory. If None, the module-level directory is used.
+    settings (ImageSettings or None): Image encoding. If None, a JPEG file is written to the directory.
 
-    if fig_ax is None:
-        title = title.lower().replace(" ", "_")
-        img_path = f"{directory_name}/{title}.jpg"
+    Returns:
+    str or ImageBuffer or tuple: Image path, in-memory image, or fig_ax if given.
+    """
+    if fig_ax is not None:
+        return fig_ax
+    if settings is not None and settings.in_memory:
+        return encode_figure(fig, settings, title)
+
+    if directory is None:
+        with _directory_lock:
+            if directory_name is None:
+                make_dir()
+            directory = directory_name
+
+    title = title.lower().replace(" ", "_")
+    if settings is None:
+        img_path = f"{directory}/{title}.jpg"
         fig.savefig(img_path)
-        return img_path
     else:
-        return fig_ax
+        img_path = f"{directory}/{title}.{settings.extension}"
+        fig.savefig(img_path, format=settings.format, dpi=settings.dpi)
+    return img_path
+
+
+def _with_pyplot_lock(plot_function):
+    """
+    Run a plotting function while holding the pyplot lock, so sessions in different threads do not interleave.
+    """
+    @functools.wraps(plot_function)
+    def wrapper(*args, **kwargs):
+        with _pyplot_lock:
+            return plot_function(*args, **kwargs)
+
+    return wrapper
+
+
+def histogram_summary(values, bins=10):
+    """
+    Reduce a column to binned counts.
+
+    Parameters:
+    values (np.ndarray): Column values without NaN.
+    bins (int): Number of equal-width bins.
+
+    Returns:
+    tuple: Counts and bin edges as returned by np.histogram.
+    """
+    return np.histogram(values, bins=bins)
+
+
+def kde_summary(values, grid_size=512, cut=3):
+    """
+    Evaluate a Gaussian kernel density estimate of a column on a fixed grid using linear binning.
+
+    The values are spread onto `grid_size` grid points once and the kernel is applied to the binned
+    counts, so the cost after binning does not depend on the number of rows. The bandwidth follows
+    Scott's rule, like seaborn.kdeplot.
+
+    Parameters:
+    values (np.ndarray): Column values without NaN.
+    grid_size (int): Number of grid points.
+    cut (float): Number of bandwidths the grid extends past the data range.
+
+    Returns:
+    tuple: Grid points and density values, or (None, None) if the data has no spread.
+    """
+    n = len(values)
+    if n < 2:
+        return None, None
+    bandwidth = np.std(values, ddof=1) * n ** (-1 / 5)
+    if not np.isfinite(bandwidth) or bandwidth == 0:
+        return None, None
+
+    grid = np.linspace(values.min() - cut * bandwidth, values.max() + cut * bandwidth, grid_size)
+    step = grid[1] - grid[0]
+    position = (values - grid[0]) / step
+    lower = np.clip(np.floor(position).astype(int), 0, grid_size - 2)
+    fraction = position - lower
+    binned = (np.bincount(lower, weights=1 - fraction, minlength=grid_size)
+              + np.bincount(lower + 1, weights=fraction, minlength=grid_size))
+
+    half_width = min(grid_size - 1, int(np.ceil(4 * bandwidth / step)))
+    offsets = np.arange(-half_width, half_width + 1) * step
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+    # The full convolution is centred on the grid: keep its middle grid_size points, since mode='same' returns
+    # the length of the longer input, which is the kernel when it is wider than the grid
+    density = np.convolve(binned, kernel, mode='full')[half_width:half_width + grid_size] / n
+    return grid, density
+
+
+def box_summary(values, whis=1.5, max_outliers=200):
+    """
+    Reduce a column to five-number box statistics and a bounded sample of outliers.
+
+    Parameters:
+    values (np.ndarray): Column values without NaN.
+    whis (float): Whisker reach in multiples of the interquartile range, as in matplotlib.
+    max_outliers (int): Maximum number of outlier points kept. The most extreme values are always kept.
+
+    Returns:
+    dict: Statistics in the format expected by matplotlib.axes.Axes.bxp.
+    """
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - whis * iqr) & (values <= q3 + whis * iqr)]
+    fliers = np.sort(values[(values < q1 - whis * iqr) | (values > q3 + whis * iqr)])
+    if len(fliers) > max_outliers:
+        fliers = fliers[np.unique(np.linspace(0, len(fliers) - 1, max_outliers).round().astype(int))]
+    return {'med': median, 'q1': q1, 'q3': q3,
+            'whislo': inside.min() if len(inside) else q1,
+            'whishi': inside.max() if len(inside) else q3,
+            'fliers': fliers}
+
+
+def summarize_numerical_column(series, bins=10, grid_size=512, max_outliers=200):
+    """
+    Reduce a numerical column to the compact summaries used by the pre-aggregated plots.
+
+    Parameters:
+    series (pd.Series): Numerical column.
+    bins (int): Number of histogram bins.
+    grid_size (int): Number of KDE grid points.
+    max_outliers (int): Maximum number of box plot outlier points.
+
+    Returns:
+    dict or None: Histogram, KDE, box statistics, skewness and kurtosis, or None if the column has no values.
+    """
+    values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return None
+    moments = NumericMoments.from_array(values[:, None])
+    counts, edges = histogram_summary(values, bins)
+    grid, density = kde_summary(values, grid_size)
+    return {'count': len(values),
+            'histogram': (counts, edges),
+            'kde': (grid, density),
+            'box': box_summary(values, max_outliers=max_outliers),
+            'skewness': moments.skewness()[0],
+            'kurtosis': moments.kurtosis()[0]}
+
+
+def _finish_plot(fig, ax, save, fig_ax, directory=None, settings=None):
+    """
+    Save, return or show a finished plot the way the DataVisualization plot methods do.
+    """
+    ret = None
+    if save:
+        ret = save_img(ax.get_title(), fig, directory=directory, settings=settings)
+    elif fig_ax:
+        ret = save_img(ax.get_title(), fig, (fig, ax), directory=directory)
+    else:
+        plt.show()
+    plt.close(fig)
+    return ret
 
 
 class DataVisualization:
     """
     Class for generating various data visualizations from a DataFrame.
     """
-    _instance = None
 
-    def __new__(cls, df):
+    def __init__(self, df, output_dir=None, preprocessor=None, image_settings=None):
         """
-        Create a new instance of DataVisualization if it doesn't exist.
+        Initialize the DataVisualization instance with a DataFrame.
+
+        Every instance keeps its own column lists and output directory, so several datasets can be
+        visualized in one process, also from different threads.
 
         Parameters:
         df (pd.DataFrame): Input DataFrame.
-
-        Returns:
-        DataVisualization instance.
+        output_dir (str or None): Directory for saved images. If None, a unique directory is created on first save.
+        preprocessor (DataPreprocessor or None): Already fitted preprocessor for df, to avoid preprocessing twice.
+        image_settings (ImageSettings or None): Encoding of saved plots. If None, JPEG files are written to the
+                                                output directory.
         """
-        if cls._instance is None:
-            cls._instance = super(DataVisualization, cls).__new__(cls)
-            cls._instance.preprocessor = DataPreprocessor(df)  # Instantiate DataPreprocessor
+        self.preprocessor = DataPreprocessor(df) if preprocessor is None else preprocessor
+        self.image_settings = image_settings
 
-            cls._instance.numerical_columns = cls._instance.preprocessor.numerical_columns
-            cls._instance.categorical_columns = cls._instance.preprocessor.categorical_columns
-            cls._instance.datetime_columns = cls._instance.preprocessor.datetime_columns
+        self.numerical_columns = self.preprocessor.numerical_columns
+        self.categorical_columns = self.preprocessor.categorical_columns
+        self.datetime_columns = self.preprocessor.datetime_columns
+        self.output_dir = output_dir
 
-            cls._instance.initialized = True
-        return cls._instance
+    def _save_directory(self, save):
+        """
+        Output directory for saved plots, or None when nothing is written to disk.
+        """
+        if not save or (self.image_settings is not None and self.image_settings.in_memory):
+            return None
+        return self.get_output_dir()
+
+    def _cache_params(self):
+        return {} if self.image_settings is None else self.image_settings.cache_params()
 
-    def __init__(self, df):
+    def get_output_dir(self):
         """
-        Initialize the DataVisualization instance with a DataFrame.
+        Return the instance's output directory, creating it on first use.
 
-        Parameters:
-        df (pd.DataFrame): Input DataFrame.
+        Returns:
+        str: The output directory.
         """
-        if hasattr(self, 'initialized'):
-            return
+        if self.output_dir is None:
+            self.output_dir = make_dir(set_global=False)
+        return self.output_dir
 
     @staticmethod
-    def plot_boxplot(df, column, save=False, fig_ax=False):
+    @_with_pyplot_lock
+    @traced('plot.boxplot', 'plot')
+    def plot_boxplot(df, column, save=False, fig_ax=False, directory=None, settings=None):
         """
         Plot a box plot for the given column in the DataFrame.
 
@@ -84,9 +278,11 @@ class DataVisualization:
         column (str): Column name.
         save (bool): Whether to save the plot as an image.
         fig_ax: Optional axis to save for further customization.
+        directory (str or None): Directory to save the image to. If None, the module-level directory is used.
+        settings (ImageSettings or None): Image encoding. If None, a JPEG file is written to the directory.
 
         Returns:
-        str or Axes: Image path if saved, else axis object.
+        str or ImageBuffer or Axes: Image path (or in-memory image) if saved, else axis object.
         """
         fig, ax = plt.subplots(figsize=(8, 5))
         sns.boxplot(data=df, y=column, ax=ax)
@@ -95,9 +291,9 @@ class DataVisualization:
         plt.tight_layout()
         ret = None
         if save:
-            ret = save_img(ax.get_title(), fig)
+            ret = save_img(ax.get_title(), fig, directory=directory, settings=settings)
         elif fig_ax:
-            ret = save_img(ax.get_title(), (fig, ax))
+            ret = save_img(ax.get_title(), fig, (fig, ax), directory=directory)
         else:
             plt.show()
             plt.close(fig)
@@ -106,7 +302,9 @@ class DataVisualization:
         return ret
 
     @staticmethod
-    def plot_density(df, column, save=False, fig_ax=False):
+    @_with_pyplot_lock
+    @traced('plot.density', 'plot')
+    def plot_density(df, column, save=False, fig_ax=False, directory=None, settings=None):
         """
         Plot a density plot for the given column in the DataFrame.
 
@@ -115,18 +313,20 @@ class DataVisualization:
         column (str): Column name.
         save (bool): Whether to save the plot as an image.
         fig_ax: Optional axis to save for further customization.
+        directory (str or None): Directory to save the image to. If None, the module-level directory is used.
+        settings (ImageSettings or None): Image encoding. If None, a JPEG file is written to the directory.
 
         Returns:
-        str or Axes: Image path if saved, else axis object.
+        str or ImageBuffer or Axes: Image path (or in-memory image) if saved, else axis object.
         """
         fig, ax = plt.subplots(figsize=(8, 5))
         sns.kdeplot(df[column], fill=True, ax=ax)
         ax.set_title(f'Density Plot of {column}')
         ret = None
         if save:
-            ret = save_img(ax.get_title(), fig)
+            ret = save_img(ax.get_title(), fig, directory=directory, settings=settings)
         elif fig_ax:
-            ret = save_img(ax.get_title(), (fig, ax))
+            ret = save_img(ax.get_title(), fig, (fig, ax), directory=directory)
         else:
             plt.show()
             plt.close(fig)
@@ -135,8 +335,9 @@ class DataVisualization:
         return ret
 
     @staticmethod
-    def plot_skewness_kurtosis(df, column, save=False, fig_ax=False
-                               ):
+    @_with_pyplot_lock
+    @traced('plot.skewness_kurtosis', 'plot')
+    def plot_skewness_kurtosis(df, column, save=False, fig_ax=False, directory=None, settings=None):
         """
         Plot a histogram with skewness and kurtosis information for the given column in the DataFrame.
 
@@ -145,9 +346,11 @@ class DataVisualization:
         column (str): Column name.
         save (bool): Whether to save the plot as an image.
         fig_ax: Optional axis to save for further customization.
+        directory (str or None): Directory to save the image to. If None, the module-level directory is used.
+        settings (ImageSettings or None): Image encoding. If None, a JPEG file is written to the directory.
 
         Returns:
-        str or Axes: Image path if saved, else axis object.
+        str or ImageBuffer or Axes: Image path (or in-memory image) if saved, else axis object.
         """
         skewness = df[column].skew()
         kurt = df[column].kurtosis()
@@ -158,9 +361,9 @@ class DataVisualization:
 
         ret = None
         if save:
-            ret = save_img(ax.get_title(), fig)
+            ret = save_img(ax.get_title(), fig, directory=directory, settings=settings)
         elif fig_ax:
-            ret = save_img(ax.get_title(), (fig, ax))
+            ret = save_img(ax.get_title(), fig, (fig, ax), directory=directory)
         else:
             plt.show()
             plt.close(fig)
@@ -169,8 +372,8 @@ class DataVisualization:
         return ret
 
     @staticmethod
-    def plot_categorical_count(df, column, save=False, fig_ax=False
-                               ):
+    @_with_pyplot_lock
+    def plot_categorical_count(df, column, save=False, fig_ax=False, directory=None, settings=None):
         """
         Plot a count plot for the given categorical column in the DataFrame.
 
@@ -179,36 +382,138 @@ class DataVisualization:
         column (str): Column name.
         save (bool): Whether to save the plot as an image.
         fig_ax: Optional axis to save for further customization.
+        directory (str or None): Directory to save the image to. If None, the module-level directory is used.
+        settings (ImageSettings or None): Image encoding. If None, a JPEG file is written to the directory.
 
         Returns:
-        str or Axes: Image path if saved, else axis object.
+        str or ImageBuffer or Axes: Image path (or in-memory image) if saved, else axis object.
         """
-        fig, ax = plt.subplots(figsize=(8, 5))
+        return DataVisualization.plot_categorical_count_from_profile(profile_column(df[column]), column, save, fig_ax,
+                                                                    directory, settings)
 
-        # Get the top 10 categories by count
-        top_categories = df[column].value_counts().head(10).index
+    @staticmethod
+    @_with_pyplot_lock
+    @traced('plot.categorical_count', 'plot')
+    def plot_categorical_count_from_profile(profile, column, save=False, fig_ax=False, directory=None, settings=None):
+        """
+        Plot the top 10 value counts of a categorical column from its precomputed profile.
 
-        # Filter the DataFrame to include only the top 10 categories
-        df_filtered = df[df[column].isin(top_categories)]
+        Parameters:
+        profile (CategoryProfile): Profile returned by categorical_profiles.profile_column.
+        column (str): Column name.
+        save (bool): Whether to save the plot as an image.
+        fig_ax: Optional axis to save for further customization.
+        directory (str or None): Directory to save the image to. If None, the module-level directory is used.
+        settings (ImageSettings or None): Image encoding. If None, a JPEG file is written to the directory.
 
-        sns.countplot(data=df_filtered, x=column, ax=ax)
-        ax.set_title(f'Count Plot of {column} (Top 10)')
-        plt.xticks(rotation=45)
+        Returns:
+        str or ImageBuffer or Axes: Image path (or in-memory image) if saved, else axis object.
+        """
+        fig, ax = plt.subplots(figsize=(8, 5))
 
-        ret = None
-        if save:
-            ret = save_img(ax.get_title(), fig)
-        elif fig_ax:
-            ret = save_img(ax.get_title(), (fig, ax))
+        top = profile.top.head(10)
+        positions = np.arange(len(top))
+        ax.bar(positions, top.to_numpy(), color=sns.color_palette(n_colors=max(len(top), 1)))
+        ax.set_xticks(positions)
+        ax.set_xticklabels([str(value) for value in top.index], rotation=45, ha='right')
+        if profile.high_cardinality:
+            ax.set_xlabel(f"{column} (high cardinality: {profile.distinct:,} distinct values)")
         else:
-            plt.show()
-            plt.close(fig)
+            ax.set_xlabel(column)
+        ax.set_ylabel('count')
+        ax.set_title(f'Count Plot of {column} (Top 10)')
+        plt.tight_layout()
+        return _finish_plot(fig, ax, save, fig_ax, directory, settings)
 
-        plt.close(fig)
-        return ret
+    @staticmethod
+    @_with_pyplot_lock
+    @traced('plot.boxplot', 'plot')
+    def plot_boxplot_from_summary(summary, column, save=False, fig_ax=False, directory=None, settings=None):
+        """
+        Plot a box plot for a column from its precomputed summary.
+
+        Parameters:
+        summary (dict): Summary returned by summarize_numerical_column.
+        column (str): Column name.
+        save (bool): Whether to save the plot as an image.
+        fig_ax: Optional axis to save for further customization.
+        directory (str or None): Directory to save the image to. If None, the module-level directory is used.
+        settings (ImageSettings or None): Image encoding. If None, a JPEG file is written to the directory.
+
+        Returns:
+        str or ImageBuffer or Axes: Image path (or in-memory image) if saved, else axis object.
+        """
+        fig, ax = plt.subplots(figsize=(8, 5))
+        ax.bxp([summary['box']], widths=0.5, patch_artist=True,
+               boxprops={'facecolor': sns.color_palette()[0]}, medianprops={'color': 'black'})
+        ax.set_xticks([])
+        ax.set_title(f'Box Plot of {column}')
+        ax.set_ylabel(column)
+        plt.tight_layout()
+        return _finish_plot(fig, ax, save, fig_ax, directory, settings)
+
+    @staticmethod
+    @_with_pyplot_lock
+    @traced('plot.density', 'plot')
+    def plot_density_from_summary(summary, column, save=False, fig_ax=False, directory=None, settings=None):
+        """
+        Plot a density plot for a column from its precomputed KDE grid.
+
+        Parameters:
+        summary (dict): Summary returned by summarize_numerical_column.
+        column (str): Column name.
+        save (bool): Whether to save the plot as an image.
+        fig_ax: Optional axis to save for further customization.
+        directory (str or None): Directory to save the image to. If None, the module-level directory is used.
+        settings (ImageSettings or None): Image encoding. If None, a JPEG file is written to the directory.
+
+        Returns:
+        str or ImageBuffer or Axes: Image path (or in-memory image) if saved, else axis object.
+        """
+        fig, ax = plt.subplots(figsize=(8, 5))
+        grid, density = summary['kde']
+        if grid is not None:
+            ax.fill_between(grid, density, alpha=0.25)
+            ax.plot(grid, density)
+        ax.set_xlabel(column)
+        ax.set_ylabel('Density')
+        ax.set_title(f'Density Plot of {column}')
+        return _finish_plot(fig, ax, save, fig_ax, directory, settings)
+
+    @staticmethod
+    @_with_pyplot_lock
+    @traced('plot.skewness_kurtosis', 'plot')
+    def plot_skewness_kurtosis_from_summary(summary, column, save=False, fig_ax=False, directory=None,
+                                            settings=None):
+        """
+        Plot a histogram with a KDE line, skewness and kurtosis for a column from its precomputed summary.
 
-    def plot_categorical_columns(self, df, save=False, fig_ax=False
-                         ):
+        Parameters:
+        summary (dict): Summary returned by summarize_numerical_column.
+        column (str): Column name.
+        save (bool): Whether to save the plot as an image.
+        fig_ax: Optional axis to save for further customization.
+        directory (str or None): Directory to save the image to. If None, the module-level directory is used.
+        settings (ImageSettings or None): Image encoding. If None, a JPEG file is written to the directory.
+
+        Returns:
+        str or ImageBuffer or Axes: Image path (or in-memory image) if saved, else axis object.
+        """
+        fig, ax = plt.subplots(figsize=(8, 5))
+        counts, edges = summary['histogram']
+        widths = np.diff(edges)
+        ax.bar(edges[:-1], counts, width=widths, align='edge', alpha=0.75, edgecolor='white')
+        grid, density = summary['kde']
+        if grid is not None:
+            # Scale the density to counts per bin like seaborn.histplot(kde=True)
+            ax.plot(grid, density * summary['count'] * widths[0])
+        ax.set_xlabel(column)
+        ax.set_ylabel('Count')
+        ax.set_title(f"Histogram of {column}\nSkewness: {summary['skewness']:.2f}, "
+                     f"Kurtosis: {summary['kurtosis']:.2f}")
+        return _finish_plot(fig, ax, save, fig_ax, directory, settings)
+
+    def plot_categorical_columns(self, df, save=False, fig_ax=False, pool=None, cache=None, profiles=None):
         """
         Generate and save count plots for all categorical columns.
 
@@ -216,46 +521,96 @@ class DataVisualization:
         df (pd.DataFrame): Input DataFrame.
         save (bool): Whether to save the plots as images.
         fig_ax: Optional axis to save for further customization.
+        pool (RenderingPool or None): Process pool used to render the saved plots in parallel.
+        cache (ArtifactCache or None): Cache to reuse previously rendered plots of unchanged columns from.
+        profiles (dict or None): Precomputed CategoryProfile per column, e.g. AnalysisSession.category_profiles.
+                                 If None, the plotted columns are profiled here.
 
         Returns:
-        list: List of image paths if saved, else an empty list.
+        list: List of image paths (or in-memory images) if saved, else an empty list.
         """
+        if not (save and cache is not None):
+            return self._plot_categorical(df, self.categorical_columns, save, fig_ax, pool, profiles)
+
+        keys = {column: cache.make_key('count_plot', fingerprint(df[column]), **self._cache_params())
+                for column in self.categorical_columns}
+        cached = {column: cache.get_image(keys[column]) for column in self.categorical_columns}
+        missing = [column for column in self.categorical_columns if cached[column] is None]
+        for column, path in zip(missing, self._plot_categorical(df, missing, save, fig_ax, pool, profiles)):
+            cached[column] = cache.put_image(keys[column], path)
+        return [cached[column] for column in self.categorical_columns]
+
+    def _plot_categorical(self, df, columns, save, fig_ax, pool, profiles=None):
+        directory = self._save_directory(save)
+        profiles = profile_columns(df, columns) if profiles is None else profiles
+        if save and pool is not None:
+            imgs_dir, _ = pool.render_categorical(df, columns, directory, settings=self.image_settings,
+                                                  profiles=profiles)
+            return imgs_dir
 
         imgs_dir = []
-        for column in self.categorical_columns:
-            x = self.plot_categorical_count(df, column, save, fig_ax)
+        for column in columns:
+            x = self.plot_categorical_count_from_profile(profiles[column], column, save, fig_ax, directory,
+                                                         self.image_settings)
             imgs_dir.append(x)
 
         return imgs_dir
 
     @staticmethod
-    def plot_correlation_matrix(df, columns=None, save=False, fig_ax=False
-                                ):
+    @_with_pyplot_lock
+    @traced('plot.correlation_matrix', 'plot')
+    def plot_correlation_matrix(df, columns=None, save=False, fig_ax=False, directory=None, settings=None,
+                                method='pearson', sample_rows=CORRELATION_SAMPLE_ROWS):
         """
         Generate and save a correlation matrix plot for the given columns.
 
+        Small matrices are drawn as an annotated heatmap. Larger ones are reordered by hierarchical clustering,
+        so correlated columns form visible blocks, and drawn as a single image without per-cell text.
+
         Parameters:
         df (pd.DataFrame): Input DataFrame.
         columns (list or None): Columns for which to generate the correlation matrix.
         save (bool): Whether to save the plot as an image.
         fig_ax: Optional axis to save for further customization.
+        directory (str or None): Directory to save the image to. If None, the module-level directory is used.
+        settings (ImageSettings or None): Image encoding. If None, a JPEG file is written to the directory.
+        method (str): 'pearson' or 'spearman'.
+        sample_rows (int or None): Correlate a random sample of at most this many rows. If None, all rows are used.
 
         Returns:
-        str or Axes: Image path if saved, else axis object.
+        str or ImageBuffer or Axes: Image path (or in-memory image) if saved, else axis object.
         """
-        if columns is not None:
-            df = df[columns]
-        fig, ax = plt.subplots(figsize=(8, 5))
+        corr_matrix = correlation_matrix(df, columns, method=method, sample_rows=sample_rows)
+        size = len(corr_matrix)
 
-        corr_matrix = df.corr()
-        sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', center=0, ax=ax)
+        if size <= ANNOTATED_CORRELATION_COLUMNS:
+            fig, ax = plt.subplots(figsize=(8, 5))
+            sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', center=0, ax=ax)
+        else:
+            order = cluster_order(corr_matrix)
+            corr_matrix = corr_matrix.loc[order, order]
+            side = min(6 + size * 0.08, 16)
+            fig, ax = plt.subplots(figsize=(side, side * 0.85))
+            image = ax.imshow(corr_matrix.to_numpy(), cmap='coolwarm', vmin=-1, vmax=1, interpolation='nearest')
+            fig.colorbar(image, ax=ax, shrink=0.8)
+            if size <= LABELLED_CORRELATION_COLUMNS:
+                ticks = np.arange(size)
+                fontsize = max(4, 10 - size // 15)
+                ax.set_xticks(ticks)
+                ax.set_xticklabels(order, rotation=90, fontsize=fontsize)
+                ax.set_yticks(ticks)
+                ax.set_yticklabels(order, fontsize=fontsize)
+            else:
+                ax.set_xticks([])
+                ax.set_yticks([])
+                ax.set_xlabel(f"{size} columns, clustered")
         ax.set_title("Correlation Matrix")
 
         ret = None
         if save:
-            ret = save_img(ax.get_title(), fig)
+            ret = save_img(ax.get_title(), fig, directory=directory, settings=settings)
         elif fig_ax:
-            ret = save_img(ax.get_title(), (fig, ax))
+            ret = save_img(ax.get_title(), fig, (fig, ax), directory=directory)
         else:
             plt.show()
             plt.close(fig)
@@ -263,7 +618,7 @@ class DataVisualization:
         plt.close(fig)
         return ret
 
-    def plot_numerical_columns(self, df, save=False, fig_ax=False
+    def plot_numerical_columns(self, df, save=False, fig_ax=False, pool=None, pre_aggregate=True, cache=None
                                ):
         """
         Generate and save various visualizations for numerical columns.
@@ -272,20 +627,150 @@ class DataVisualization:
         df (pd.DataFrame): Input DataFrame.
         save (bool): Whether to save the plots as images.
         fig_ax: Optional axis to save for further customization.
+        pool (RenderingPool or None): Process pool used to render the saved plots in parallel.
+        pre_aggregate (bool): Draw from compact per-column summaries (binned counts, gridded KDE, box statistics)
+                              instead of handing seaborn the raw column, so drawing cost does not depend on row count.
+        cache (ArtifactCache or None): Cache to reuse previously rendered plots of unchanged columns from.
+
+        Returns:
+        list: List of image paths (or in-memory images) if saved, else an empty list.
+        """
+        columns = self.numerical_columns
+        if not (save and cache is not None):
+            imgs_dir, x = self._plot_numerical(df, columns, save, fig_ax, pool, pre_aggregate)
+            imgs_dir.append(x)
+            return imgs_dir
+
+        kinds = ('box_plot', 'density_plot', 'histogram')
+        params = self._cache_params()
+        keys = {column: [cache.make_key(kind, fingerprint(df[column]), pre_aggregate=pre_aggregate, **params)
+                         for kind in kinds]
+                for column in columns}
+        cached = {column: [cache.get_image(key) for key in keys[column]] for column in columns}
+        missing = [column for column in columns if None in cached[column]]
+        correlation_key = cache.make_key('correlation_matrix', fingerprint(df[columns]), **params)
+        correlation = cache.get_image(correlation_key)
+
+        imgs_dir, x = self._plot_numerical(df, missing, save, fig_ax, pool, pre_aggregate,
+                                           correlation=correlation is None)
+        for position, column in enumerate(missing):
+            rendered = imgs_dir[len(kinds) * position:len(kinds) * (position + 1)]
+            cached[column] = [cache.put_image(key, path) for key, path in zip(keys[column], rendered)]
+        if correlation is None:
+            correlation = cache.put_image(correlation_key, x)
+        return [path for column in columns for path in cached[column]] + [correlation]
+
+    def _plot_numerical(self, df, columns, save, fig_ax, pool, pre_aggregate, correlation=True):
+        """
+        Plot the given numerical columns and, optionally, the correlation matrix of all numerical columns.
 
         Returns:
-        list: List of image paths if saved, else an empty list.
+        tuple: List of plot results (three per column) and the correlation matrix result.
         """
+        directory = self._save_directory(save)
+        settings = self.image_settings
+
+        def plot_correlation():
+            if not correlation:
+                return None
+            return self.plot_correlation_matrix(df, self.numerical_columns, save, fig_ax, directory, settings)
+
+        if save and pool is not None:
+            # The correlation matrix needs every column, so it is drawn here while the workers render
+            return pool.render_numerical(df, columns, directory, pre_aggregate=pre_aggregate,
+                                         while_waiting=plot_correlation, settings=settings)
 
         imgs_dir = []
-        for column in self.numerical_columns:
-            x = self.plot_boxplot(df, column, save, fig_ax)
-            y = self.plot_density(df, column, save, fig_ax)
-            z = self.plot_skewness_kurtosis(df, column, save, fig_ax)
+        for column in columns:
+            summary = summarize_numerical_column(df[column]) if pre_aggregate else None
+            if summary is not None:
+                x = self.plot_boxplot_from_summary(summary, column, save, fig_ax, directory, settings)
+                y = self.plot_density_from_summary(summary, column, save, fig_ax, directory, settings)
+                z = self.plot_skewness_kurtosis_from_summary(summary, column, save, fig_ax, directory, settings)
+            else:
+                x = self.plot_boxplot(df, column, save, fig_ax, directory, settings)
+                y = self.plot_density(df, column, save, fig_ax, directory, settings)
+                z = self.plot_skewness_kurtosis(df, column, save, fig_ax, directory, settings)
             if save:
                 imgs_dir.append(x)
                 imgs_dir.append(y)
                 imgs_dir.append(z)
-        x = self.plot_correlation_matrix(df, self.numerical_columns, save, fig_ax)
-        imgs_dir.append(x)
+        return imgs_dir, plot_correlation()
+
+    @_with_pyplot_lock
+    @traced('plot.facet_pages', 'plot')
+    def plot_facet_pages(self, df, save=False, plots_per_page=DEFAULT_PLOTS_PER_PAGE, ncols=DEFAULT_FACET_COLUMNS,
+                         cache=None, profiles=None):
+        """
+        Draw every column as small multiples, several columns per figure, plus the correlation matrix.
+
+        One figure per plot kind is created and its artists are updated page after page, instead of creating,
+        laying out and encoding a figure per column and plot. Suited to wide DataFrames.
+
+        Parameters:
+        df (pd.DataFrame): Input DataFrame.
+        save (bool): Whether to save the pages as images. If False, every page is shown.
+        plots_per_page (int): Number of columns drawn on one page.
+        ncols (int): Number of plots per row of a page.
+        cache (ArtifactCache or None): Cache to reuse previously rendered pages of unchanged columns from.
+        profiles (dict or None): Precomputed CategoryProfile per categorical column. If None, columns are
+                                 profiled as their pages are drawn.
+
+        Returns:
+        list: Image paths (or in-memory images) of the count, box plot, density and histogram pages and the
+              correlation matrix if saved, else an empty list.
+        """
+        directory = self._save_directory(save)
+        settings = self.image_settings
+        params = self._cache_params()
+        summaries = {}
+
+        def numerical_summary(column):
+            if column not in summaries:
+                summaries[column] = summarize_numerical_column(df[column])
+            return summaries[column]
+
+        def top_counts(column):
+            profile = profile_column(df[column]) if profiles is None else profiles[column]
+            return profile.top.head(10)
+
+        imgs_dir = []
+        for kind, columns, data in (('count', self.categorical_columns, top_counts),
+                                    ('box', self.numerical_columns, numerical_summary),
+                                    ('density', self.numerical_columns, numerical_summary),
+                                    ('histogram', self.numerical_columns, numerical_summary)):
+            pages = [columns[start:start + plots_per_page] for start in range(0, len(columns), plots_per_page)]
+            page = None
+            for number, page_columns in enumerate(pages, start=1):
+                key = None
+                if save and cache is not None:
+                    key = cache.make_key(f'facet_{kind}', fingerprint(df[page_columns]), plots_per_page=plots_per_page,
+                                         ncols=ncols, **params)
+                    cached = cache.get_image(key)
+                    if cached is not None:
+                        imgs_dir.append(cached)
+                        continue
+                if page is None:
+                    page = FacetPage(kind, plots_per_page, ncols)
+                fig = page.draw([(column, data(column)) for column in page_columns])
+                fig.suptitle(f"{kind.capitalize()} plots ({number}/{len(pages)})")
+                if save:
+                    x = save_img(f"{kind} page {number}", fig, directory=directory, settings=settings)
+                    imgs_dir.append(x if key is None else cache.put_image(key, x))
+                else:
+                    plt.show()
+            if page is not None:
+                page.close()
+
+        if not self.numerical_columns:
+            return imgs_dir
+        correlation_key = None
+        if save and cache is not None:
+            correlation_key = cache.make_key('correlation_matrix', fingerprint(df[self.numerical_columns]), **params)
+            correlation = cache.get_image(correlation_key)
+            if correlation is not None:
+                return imgs_dir + [correlation]
+        x = self.plot_correlation_matrix(df, self.numerical_columns, save, False, directory, settings)
+        if save:
+            imgs_dir.append(x if correlation_key is None else cache.put_image(correlation_key, x))
         return imgs_dir
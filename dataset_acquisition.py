@@ -0,0 +1,459 @@
+import hashlib
+import io
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
+import zipfile
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_DESTINATION_DIRECTORY = "./Data"
+MANIFEST_FILE_NAME = ".acquisition_manifest.json"
+PARTIAL_DIRECTORY_NAME = ".partial"
+DOWNLOAD_BLOCK_SIZE = 1024 ** 2
+DEFAULT_MAX_WORKERS = 4
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz')
+
+# A file offered by a source: its name, size in bytes and version (ETag, modification time...) when known, and
+# the expected SHA-256 digest when the source publishes one
+RemoteFile = namedtuple('RemoteFile', ['name', 'size', 'version', 'sha256'])
+
+
+class ChecksumError(Exception):
+    """
+    Raised when a downloaded file does not have the expected size or SHA-256 digest.
+    """
+
+
+class DatasetSource:
+    """
+    Interface of a place datasets are fetched from.
+
+    Subclasses list their files and open them for reading from a byte offset, which is all acquire_datasets
+    needs to download concurrently, resume partial downloads and skip unchanged files. Sources that cannot
+    stream (e.g. a client library that only writes whole files) override download instead.
+    """
+
+    name = 'source'
+
+    def list_files(self):
+        """
+        List the files of the dataset.
+
+        Returns:
+        list of RemoteFile: Files to acquire.
+        """
+        raise NotImplementedError
+
+    def open(self, remote_file, offset=0):
+        """
+        Open a file for reading from a byte offset.
+
+        Parameters:
+        remote_file (RemoteFile): File to open.
+        offset (int): Number of bytes already downloaded.
+
+        Returns:
+        tuple: Binary file object and the offset it actually starts at (0 if the source cannot resume).
+        """
+        raise NotImplementedError
+
+    def download(self, remote_file, partial_path, block_size=DOWNLOAD_BLOCK_SIZE):
+        """
+        Download a file to partial_path, appending to the bytes already there.
+
+        Parameters:
+        remote_file (RemoteFile): File to download.
+        partial_path (str): Path of the partial download.
+        block_size (int): Bytes copied at a time.
+        """
+        offset = os.path.getsize(partial_path) if os.path.exists(partial_path) else 0
+        if remote_file.size is not None and offset > remote_file.size:
+            offset = 0
+        # Left complete by a run interrupted while verifying or extracting it
+        if remote_file.size is not None and 0 < offset == remote_file.size:
+            return
+        stream, offset = self.open(remote_file, offset)
+        with stream, open(partial_path, 'r+b' if offset else 'wb') as partial_file:
+            partial_file.seek(offset)
+            partial_file.truncate()
+            shutil.copyfileobj(stream, partial_file, block_size)
+
+
+class LocalDirectorySource(DatasetSource):
+    """
+    Dataset files in a local or mounted directory, e.g. a shared drive or a test fixture.
+    """
+
+    def __init__(self, directory, name=None, checksums=None, pattern=None):
+        """
+        Initialize the source.
+
+        Parameters:
+        directory (str): Directory holding the files.
+        name (str or None): Source name in the manifest. If None, the directory name is used.
+        checksums (dict or None): Expected SHA-256 digest per file name.
+        pattern (str or None): Only acquire files whose name contains this string.
+        """
+        self.directory = directory
+        self.name = name or os.path.basename(os.path.normpath(directory))
+        self.checksums = checksums or {}
+        self.pattern = pattern
+
+    def list_files(self):
+        files = []
+        for entry in sorted(os.scandir(self.directory), key=lambda entry: entry.name):
+            if not entry.is_file() or (self.pattern is not None and self.pattern not in entry.name):
+                continue
+            stat = entry.stat()
+            files.append(RemoteFile(entry.name, stat.st_size, f"{stat.st_size}-{stat.st_mtime_ns}",
+                                    self.checksums.get(entry.name)))
+        return files
+
+    def open(self, remote_file, offset=0):
+        stream = open(os.path.join(self.directory, remote_file.name), 'rb')
+        stream.seek(offset)
+        return stream, offset
+
+
+class HttpSource(DatasetSource):
+    """
+    Dataset files at HTTP(S) URLs. Partial downloads resume with Range requests when the server supports them.
+    """
+
+    def __init__(self, urls, name='http', checksums=None, timeout=60):
+        """
+        Initialize the source.
+
+        Parameters:
+        urls (list of str): File URLs. The file name is the last path component.
+        name (str): Source name in the manifest.
+        checksums (dict or None): Expected SHA-256 digest per file name.
+        timeout (float): Socket timeout in seconds.
+        """
+        self.urls = {os.path.basename(url.split('?')[0]): url for url in urls}
+        self.name = name
+        self.checksums = checksums or {}
+        self.timeout = timeout
+
+    def list_files(self):
+        from urllib.request import Request, urlopen
+
+        files = []
+        for file_name, url in self.urls.items():
+            with urlopen(Request(url, method='HEAD'), timeout=self.timeout) as response:
+                size = response.headers.get('Content-Length')
+                version = response.headers.get('ETag') or response.headers.get('Last-Modified')
+            files.append(RemoteFile(file_name, int(size) if size is not None else None, version,
+                                    self.checksums.get(file_name)))
+        return files
+
+    def open(self, remote_file, offset=0):
+        from urllib.error import HTTPError
+        from urllib.request import Request, urlopen
+
+        request = Request(self.urls[remote_file.name])
+        if offset:
+            request.add_header('Range', f'bytes={offset}-')
+        try:
+            response = urlopen(request, timeout=self.timeout)
+        except HTTPError as e:
+            if e.code != 416 or not offset:
+                raise
+            # Range not satisfiable: the partial download is already complete if it has the full length
+            # ('Content-Range: bytes */<length>'), otherwise it is downloaded again from the start
+            total = (e.headers.get('Content-Range') or '').rpartition('/')[2]
+            e.close()
+            if total == str(offset):
+                return io.BytesIO(), offset
+            return self.open(remote_file, 0)
+        # Servers without range support answer 200 with the whole file
+        return response, offset if response.status == 206 else 0
+
+
+class KaggleSource(DatasetSource):
+    """
+    A Kaggle dataset, fetched as one zip archive with the Kaggle API (requires the kaggle package and
+    credentials).
+    """
+
+    def __init__(self, dataset_name):
+        """
+        Initialize the source.
+
+        Parameters:
+        dataset_name (str): Kaggle dataset, e.g. 'parulpandey/us-international-air-traffic-data'.
+        """
+        self.dataset_name = dataset_name
+        self.name = dataset_name
+
+    def list_files(self):
+        # Imported here because the Kaggle client authenticates as soon as it is imported
+        import kaggle
+
+        metadata = kaggle.api.dataset_list_files(self.dataset_name)
+        version = ",".join(sorted(f"{item.name}:{getattr(item, 'totalBytes', '')}" for item in metadata.files))
+        return [RemoteFile(f"{self.dataset_name.split('/')[-1]}.zip", None, version or None, None)]
+
+    def download(self, remote_file, partial_path, block_size=DOWNLOAD_BLOCK_SIZE):
+        import kaggle
+
+        # The Kaggle client writes whole archives, so the download starts over instead of resuming
+        with tempfile.TemporaryDirectory(dir=os.path.dirname(partial_path)) as directory:
+            kaggle.api.dataset_download_files(self.dataset_name, path=directory, unzip=False, quiet=True)
+            archive = [file for file in os.listdir(directory) if file.endswith('.zip')][0]
+            os.replace(os.path.join(directory, archive), partial_path)
+
+
+def file_sha256(file_path, block_size=DOWNLOAD_BLOCK_SIZE):
+    """
+    SHA-256 digest of a file.
+
+    Parameters:
+    file_path (str): Path of the file.
+    block_size (int): Bytes hashed at a time.
+
+    Returns:
+    str: Hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _safe_member_path(directory, member_name):
+    """
+    Destination of an archive member, refusing names that would escape the directory.
+    """
+    path = os.path.realpath(os.path.join(directory, member_name))
+    if os.path.commonpath([path, os.path.realpath(directory)]) != os.path.realpath(directory):
+        raise ValueError(f"Archive member '{member_name}' points outside the destination directory.")
+    return path
+
+
+def extract_archive(archive_path, directory, block_size=DOWNLOAD_BLOCK_SIZE):
+    """
+    Extract a zip or tar archive member by member, streaming each member straight to its destination.
+
+    Parameters:
+    archive_path (str): Path of the archive.
+    directory (str): Destination directory.
+    block_size (int): Bytes copied at a time.
+
+    Returns:
+    list of str: Paths of the extracted files.
+    """
+    extracted = []
+
+    def write_member(member_name, source):
+        path = _safe_member_path(directory, member_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with source, open(path, 'wb') as destination:
+            shutil.copyfileobj(source, destination, block_size)
+        extracted.append(path)
+
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as archive:
+            for member in archive.infolist():
+                if not member.is_dir():
+                    write_member(member.filename, archive.open(member))
+    else:
+        # Stream mode reads compressed tar archives front to back in a single pass
+        with tarfile.open(archive_path, 'r|*') as archive:
+            for member in archive:
+                if member.isfile():
+                    write_member(member.name, archive.extractfile(member))
+    return extracted
+
+
+def is_archive(file_name):
+    return file_name.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+class AcquisitionManifest:
+    """
+    Record of the files already acquired into a directory, so unchanged files are neither fetched nor
+    unpacked again. Safe to update from several download threads.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path) as manifest_file:
+                self.entries = json.load(manifest_file)
+
+    @staticmethod
+    def key(source, remote_file):
+        return f"{source.name}/{remote_file.name}"
+
+    def is_current(self, source, remote_file, directory):
+        """
+        Whether a file was acquired at the same version and its outputs are still intact.
+
+        Parameters:
+        source (DatasetSource): Source of the file.
+        remote_file (RemoteFile): File as currently listed by the source.
+        directory (str): Destination directory.
+
+        Returns:
+        bool: True if the file does not need to be acquired again.
+        """
+        with self._lock:
+            entry = self.entries.get(self.key(source, remote_file))
+        if entry is None or entry['version'] is None or entry['version'] != remote_file.version:
+            return False
+        if remote_file.sha256 is not None and entry['sha256'] != remote_file.sha256:
+            return False
+        return all(os.path.isfile(os.path.join(directory, path)) and os.path.getsize(os.path.join(directory, path))
+                   == size for path, size in entry['outputs'].items())
+
+    def source_outputs(self, source_name, directory):
+        """
+        Output files of every file acquired from a source, without contacting the source.
+
+        Parameters:
+        source_name (str): Source name.
+        directory (str): Destination directory.
+
+        Returns:
+        list of str or None: Output paths, or None if nothing was acquired or an output is missing or changed.
+        """
+        with self._lock:
+            entries = [entry for key, entry in self.entries.items() if key.startswith(f"{source_name}/")]
+        outputs = {path: size for entry in entries for path, size in entry['outputs'].items()}
+        if not entries or not all(os.path.isfile(os.path.join(directory, path)) and
+                                  os.path.getsize(os.path.join(directory, path)) == size
+                                  for path, size in outputs.items()):
+            return None
+        return [os.path.join(directory, path) for path in outputs]
+
+    def outputs(self, source, remote_file, directory):
+        with self._lock:
+            entry = self.entries[self.key(source, remote_file)]
+        return [os.path.join(directory, path) for path in entry['outputs']]
+
+    def record(self, source, remote_file, sha256, outputs, directory):
+        """
+        Record an acquired file and its output files, and save the manifest atomically.
+        """
+        entry = {'version': remote_file.version, 'size': remote_file.size, 'sha256': sha256,
+                 'outputs': {os.path.relpath(path, directory): os.path.getsize(path) for path in outputs}}
+        with self._lock:
+            self.entries[self.key(source, remote_file)] = entry
+            temporary_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporary_path, 'w') as manifest_file:
+                json.dump(self.entries, manifest_file, indent=2, sort_keys=True)
+            os.replace(temporary_path, self.path)
+
+
+def acquire_file(source, remote_file, directory, manifest, extract=True):
+    """
+    Acquire one file: skip it if unchanged, otherwise download (resuming a partial download), verify and
+    extract it.
+
+    Parameters:
+    source (DatasetSource): Source of the file.
+    remote_file (RemoteFile): File to acquire.
+    directory (str): Destination directory.
+    manifest (AcquisitionManifest): Manifest of the destination directory.
+    extract (bool): Extract archives instead of keeping them.
+
+    Returns:
+    tuple: List of output file paths and whether the file was fetched (False if it was unchanged).
+    """
+    if manifest.is_current(source, remote_file, directory):
+        return manifest.outputs(source, remote_file, directory), False
+
+    partial_directory = os.path.join(directory, PARTIAL_DIRECTORY_NAME)
+    os.makedirs(partial_directory, exist_ok=True)
+    partial_name = hashlib.sha256(manifest.key(source, remote_file).encode()).hexdigest()[:16]
+    partial_path = os.path.join(partial_directory, f"{partial_name}.part")
+    # A partial download is only resumed if it belongs to the same version of the file
+    version_path = f"{partial_path}.version"
+    previous_version = None
+    if os.path.exists(version_path):
+        with open(version_path) as version_file:
+            previous_version = version_file.read()
+    if (remote_file.version is None or previous_version != remote_file.version) and os.path.exists(partial_path):
+        os.remove(partial_path)
+    with open(version_path, 'w') as version_file:
+        version_file.write(str(remote_file.version))
+
+    source.download(remote_file, partial_path)
+
+    size = os.path.getsize(partial_path)
+    sha256 = file_sha256(partial_path)
+    if (remote_file.size is not None and size != remote_file.size) or \
+            (remote_file.sha256 is not None and sha256 != remote_file.sha256.lower()):
+        os.remove(partial_path)
+        raise ChecksumError(f"'{remote_file.name}' from {source.name} is {size} bytes with SHA-256 {sha256}, "
+                            f"expected {remote_file.size} bytes with SHA-256 {remote_file.sha256}.")
+
+    if extract and is_archive(remote_file.name):
+        outputs = extract_archive(partial_path, directory)
+        os.remove(partial_path)
+    else:
+        output = os.path.join(directory, remote_file.name)
+        os.replace(partial_path, output)
+        outputs = [output]
+    os.remove(version_path)
+    manifest.record(source, remote_file, sha256, outputs, directory)
+    return outputs, True
+
+
+def acquire_datasets(sources, destination_directory=DEFAULT_DESTINATION_DIRECTORY, max_workers=DEFAULT_MAX_WORKERS,
+                     extract=True):
+    """
+    Download the files of several datasets concurrently into a directory.
+
+    Unchanged files recorded in the directory's manifest are skipped, interrupted downloads resume where they
+    stopped, sizes and published checksums are verified, and archives are extracted in process as soon as
+    their download completes.
+
+    Parameters:
+    sources (list of DatasetSource): Datasets to acquire.
+    destination_directory (str): Directory for the dataset files and the manifest.
+    max_workers (int): Maximum number of concurrent downloads.
+    extract (bool): Extract archives instead of keeping them.
+
+    Returns:
+    list of dict: One result per file with 'source', 'file', 'status' ('fetched', 'unchanged' or 'failed'),
+                  'outputs' and 'error'.
+    """
+    os.makedirs(destination_directory, exist_ok=True)
+    manifest = AcquisitionManifest(os.path.join(destination_directory, MANIFEST_FILE_NAME))
+
+    results = []
+    tasks = []
+    for source in sources:
+        try:
+            tasks.extend((source, remote_file) for remote_file in source.list_files())
+        except Exception as e:
+            print(f"Error occurred while listing the files of {source.name}.")
+            print(f"Error message: {str(e)}")
+            results.append({'source': source.name, 'file': None, 'status': 'failed', 'outputs': [],
+                            'error': str(e)})
+
+    def acquire(task):
+        source, remote_file = task
+        result = {'source': source.name, 'file': remote_file.name, 'outputs': [], 'error': None}
+        try:
+            result['outputs'], fetched = acquire_file(source, remote_file, destination_directory, manifest, extract)
+            result['status'] = 'fetched' if fetched else 'unchanged'
+        except Exception as e:
+            print(f"Error occurred while acquiring {remote_file.name} from {source.name}.")
+            print(f"Error message: {str(e)}")
+            result.update(status='failed', error=str(e))
+        return result
+
+    if tasks:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks)))) as executor:
+            results.extend(executor.map(acquire, tasks))
+    return results
@@ -0,0 +1,168 @@
+from itertools import zip_longest
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.patches import Polygon, Rectangle
+
+FACET_KINDS = ('count', 'box', 'density', 'histogram')
+DEFAULT_PLOTS_PER_PAGE = 9
+DEFAULT_FACET_COLUMNS = 3
+CELL_SIZE = (4, 3)
+
+
+class FacetPage:
+    """
+    A reused figure that draws one kind of plot for many columns as small multiples.
+
+    The figure, its axes and every artist (bars, lines, patches) are created once. Drawing a page
+    only updates the artists' data, limits and titles, so the per-figure setup and layout cost is paid
+    once per kind instead of once per column.
+    """
+
+    def __init__(self, kind, plots_per_page=DEFAULT_PLOTS_PER_PAGE, ncols=DEFAULT_FACET_COLUMNS, bins=10, top_n=10):
+        """
+        Create the figure and the artists of every cell.
+
+        Parameters:
+        kind (str): 'count', 'box', 'density' or 'histogram'.
+        plots_per_page (int): Number of cells on a page.
+        ncols (int): Number of cells per row.
+        bins (int): Number of histogram bars per cell.
+        top_n (int): Number of count plot bars per cell.
+        """
+        if kind not in FACET_KINDS:
+            raise ValueError(f"Unknown facet kind '{kind}'. Use one of {list(FACET_KINDS)}.")
+        self.kind = kind
+        self.bins = bins
+        self.top_n = top_n
+        ncols = min(ncols, plots_per_page)
+        nrows = -(-plots_per_page // ncols)
+        self.fig, axes = plt.subplots(nrows, ncols, figsize=(ncols * CELL_SIZE[0], nrows * CELL_SIZE[1]),
+                                      squeeze=False)
+        self.fig.subplots_adjust(left=0.07, right=0.98, bottom=0.1, top=0.9, hspace=0.9, wspace=0.3)
+        self.axes = axes.ravel()[:plots_per_page]
+        for ax in axes.ravel()[plots_per_page:]:
+            ax.set_visible(False)
+        self.cells = [getattr(self, f'_create_{kind}')(ax) for ax in self.axes]
+
+    def _create_histogram(self, ax):
+        bars = ax.bar(np.arange(self.bins), np.zeros(self.bins), width=1, align='edge', alpha=0.75,
+                      edgecolor='white')
+        line, = ax.plot([], [])
+        return {'bars': bars, 'line': line}
+
+    def _create_density(self, ax):
+        area = Polygon(np.zeros((3, 2)), closed=True, alpha=0.25)
+        ax.add_patch(area)
+        line, = ax.plot([], [])
+        return {'area': area, 'line': line}
+
+    def _create_box(self, ax):
+        box = Rectangle((-0.2, 0), 0.4, 0, facecolor='C0', edgecolor='black', alpha=0.75)
+        ax.add_patch(box)
+        artists = {'box': box}
+        for name, style in (('median', {'color': 'black'}), ('whiskers', {'color': 'black'}),
+                            ('caps', {'color': 'black'}),
+                            ('fliers', {'marker': 'o', 'linestyle': 'none', 'markerfacecolor': 'none',
+                                        'color': 'grey', 'markersize': 4})):
+            artists[name], = ax.plot([], [], **style)
+        ax.set_xlim(-0.5, 0.5)
+        ax.set_xticks([])
+        return artists
+
+    def _create_count(self, ax):
+        bars = ax.bar(np.arange(self.top_n), np.zeros(self.top_n))
+        ax.set_xlim(-0.5, self.top_n - 0.5)
+        return {'bars': bars}
+
+    def _update_histogram(self, ax, cell, column, summary):
+        counts, edges = summary['histogram']
+        widths = np.diff(edges)
+        for bar, left, width, height in zip(cell['bars'], edges[:-1], widths, counts):
+            bar.set_x(left)
+            bar.set_width(width)
+            bar.set_height(height)
+        top = counts.max()
+        grid, density = summary['kde']
+        if grid is None:
+            cell['line'].set_data([], [])
+            ax.set_xlim(edges[0] - 0.5, edges[-1] + 0.5)
+        else:
+            scaled = density * summary['count'] * widths[0]
+            cell['line'].set_data(grid, scaled)
+            top = max(top, scaled.max())
+            ax.set_xlim(grid[0], grid[-1])
+        ax.set_ylim(0, top * 1.05 or 1)
+        ax.set_title(f"{column}\nSkewness: {summary['skewness']:.2f}, Kurtosis: {summary['kurtosis']:.2f}",
+                     fontsize=9)
+
+    def _update_density(self, ax, cell, column, summary):
+        grid, density = summary['kde']
+        if grid is None:
+            cell['line'].set_data([], [])
+            cell['area'].set_xy(np.zeros((3, 2)))
+            value = summary['box']['med']
+            ax.set_xlim(value - 0.5, value + 0.5)
+            ax.set_ylim(0, 1)
+            ax.set_title(f"{column} (no spread)", fontsize=9)
+            return
+        cell['line'].set_data(grid, density)
+        cell['area'].set_xy(np.column_stack([np.concatenate([grid, grid[::-1]]),
+                                             np.concatenate([density, np.zeros(len(density))])]))
+        ax.set_xlim(grid[0], grid[-1])
+        ax.set_ylim(0, density.max() * 1.05 or 1)
+        ax.set_title(f"Density of {column}", fontsize=9)
+
+    def _update_box(self, ax, cell, column, summary):
+        stats = summary['box']
+        cell['box'].set_y(stats['q1'])
+        cell['box'].set_height(stats['q3'] - stats['q1'])
+        cell['median'].set_data([-0.2, 0.2], [stats['med'], stats['med']])
+        cell['whiskers'].set_data([0, 0, np.nan, 0, 0], [stats['whislo'], stats['q1'], np.nan, stats['q3'],
+                                                         stats['whishi']])
+        cell['caps'].set_data([-0.1, 0.1, np.nan, -0.1, 0.1], [stats['whislo'], stats['whislo'], np.nan,
+                                                               stats['whishi'], stats['whishi']])
+        fliers = stats['fliers']
+        cell['fliers'].set_data(np.zeros(len(fliers)), fliers)
+        low = min(stats['whislo'], fliers.min()) if len(fliers) else stats['whislo']
+        high = max(stats['whishi'], fliers.max()) if len(fliers) else stats['whishi']
+        margin = (high - low) * 0.05 or 1
+        ax.set_ylim(low - margin, high + margin)
+        ax.set_title(f"Box Plot of {column}", fontsize=9)
+
+    def _update_count(self, ax, cell, column, counts):
+        heights = np.zeros(self.top_n)
+        heights[:len(counts)] = counts.to_numpy()
+        for bar, height in zip(cell['bars'], heights):
+            bar.set_height(height)
+        ax.set_xticks(np.arange(len(counts)))
+        ax.set_xticklabels([str(label)[:15] for label in counts.index], rotation=45, ha='right', fontsize=7)
+        ax.set_ylim(0, heights.max() * 1.05 or 1)
+        ax.set_title(f"Count Plot of {column} (Top {self.top_n})", fontsize=9)
+
+    def draw(self, items):
+        """
+        Draw a page of cells.
+
+        Parameters:
+        items (list of tuple): Up to plots_per_page (column, data) pairs. For numerical kinds data is the
+                               summarize_numerical_column summary, for 'count' the top value counts. Cells
+                               whose data is None are left blank.
+
+        Returns:
+        matplotlib.figure.Figure: The page figure.
+        """
+        update = getattr(self, f'_update_{self.kind}')
+        for ax, cell, item in zip_longest(self.axes, self.cells, items[:len(self.axes)]):
+            if item is None or item[1] is None:
+                ax.set_visible(False)
+                continue
+            ax.set_visible(True)
+            update(ax, cell, *item)
+        return self.fig
+
+    def close(self):
+        """
+        Release the figure.
+        """
+        plt.close(self.fig)
@@ -0,0 +1,221 @@
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from statistics_engine import NumericMoments
+
+# Code given to missing values and to categories not seen while fitting
+UNKNOWN_CODE = -1
+
+
+def _sorted_classes(values):
+    """
+    Sort category values like LabelEncoder, falling back to their string order for mixed types.
+    """
+    try:
+        return pd.Index(sorted(values), dtype=object)
+    except TypeError:
+        return pd.Index(sorted(values, key=str), dtype=object)
+
+
+def _present_values(series):
+    """
+    Distinct non-null values of a column, without materializing the values of categorical dtypes.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        used = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories)) > 0
+        return series.cat.categories[used]
+    return pd.factorize(series)[1]
+
+
+def _encode_column(series, classes):
+    """
+    Map a column to the integer codes of the fitted classes. The column is factorized (or its category codes
+    are used) and only its distinct values are looked up in the classes. Missing and unseen values get
+    UNKNOWN_CODE.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, uniques = series.cat.codes.to_numpy(), series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series)
+    mapping = np.append(classes.get_indexer(uniques), UNKNOWN_CODE).astype(np.int32)
+    # Missing values have code -1, which picks the UNKNOWN_CODE appended last
+    return mapping[codes]
+
+
+class EncodeScaleTransformer:
+    """
+    Persistent standard scaling of numerical columns and integer encoding of categorical columns.
+
+    Fitted once (or chunk by chunk with partial_fit), saved, and reused on new batches, so scoring data gets
+    the same scaling and the same category codes as the training data. Numerical columns are scaled to zero
+    mean and unit variance like sklearn's StandardScaler; categories are coded by their sorted position
+    like LabelEncoder.
+    """
+
+    def __init__(self, numerical_columns, categorical_columns, n_jobs=1):
+        """
+        Initialize an unfitted transformer.
+
+        Parameters:
+        numerical_columns (list): Columns to scale.
+        categorical_columns (list): Columns to encode.
+        n_jobs (int): Number of threads encoding categorical columns. -1 uses all CPUs.
+        """
+        self.numerical_columns = list(numerical_columns)
+        self.categorical_columns = list(categorical_columns)
+        self.n_jobs = n_jobs
+        self._moments = NumericMoments(len(self.numerical_columns))
+        self._seen = {column: set() for column in self.categorical_columns}
+        self._classes = None
+
+    def partial_fit(self, df):
+        """
+        Update the scaling statistics and the known categories with a batch of rows.
+
+        Parameters:
+        df (pd.DataFrame): Rows to fit on, e.g. one chunk of a large file.
+
+        Returns:
+        EncodeScaleTransformer: The updated transformer.
+        """
+        values = df[self.numerical_columns].to_numpy(dtype=float, na_value=np.nan)
+        self._moments.merge(NumericMoments.from_array(values))
+        for column in self.categorical_columns:
+            self._seen[column].update(_present_values(df[column]))
+        self._classes = None
+        return self
+
+    def fit(self, df):
+        """
+        Fit the transformer on a DataFrame, discarding any previous fit.
+
+        Parameters:
+        df (pd.DataFrame): Training data.
+
+        Returns:
+        EncodeScaleTransformer: The fitted transformer.
+        """
+        self._moments = NumericMoments(len(self.numerical_columns))
+        self._seen = {column: set() for column in self.categorical_columns}
+        return self.partial_fit(df)
+
+    @property
+    def mean_(self):
+        """
+        Mean of every numerical column.
+        """
+        return pd.Series(self._moments.mean, index=self.numerical_columns)
+
+    @property
+    def scale_(self):
+        """
+        Population standard deviation of every numerical column, 1 for constant columns as in StandardScaler.
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scale = np.sqrt(np.where(self._moments.n > 0, self._moments.m2 / self._moments.n, 0.0))
+        return pd.Series(np.where(scale > 0, scale, 1.0), index=self.numerical_columns)
+
+    @property
+    def classes_(self):
+        """
+        Sorted known categories of every categorical column; a category's code is its position.
+        """
+        if self._classes is None:
+            self._classes = {column: _sorted_classes(values) for column, values in self._seen.items()}
+        return self._classes
+
+    def transform(self, df, inplace=False):
+        """
+        Scale and encode a batch of rows with the fitted state.
+
+        Parameters:
+        df (pd.DataFrame): Rows to transform, with the fitted columns.
+        inplace (bool): Replace the columns of df instead of returning a new DataFrame.
+
+        Returns:
+        pd.DataFrame: The transformed rows (df itself if inplace). Categorical columns hold int32 codes, with
+                      UNKNOWN_CODE for missing values and categories not seen while fitting.
+        """
+        result = df if inplace else df.copy(deep=False)
+        if self.numerical_columns:
+            values = df[self.numerical_columns].to_numpy(dtype=float, na_value=np.nan)
+            values -= self._moments.mean
+            values /= self.scale_.to_numpy()
+            for position, column in enumerate(self.numerical_columns):
+                result[column] = values[:, position]
+
+        classes = self.classes_
+        n_jobs = os.cpu_count() if self.n_jobs < 0 else self.n_jobs
+        if n_jobs > 1 and len(self.categorical_columns) > 1:
+            with ThreadPoolExecutor(max_workers=min(n_jobs, len(self.categorical_columns))) as executor:
+                codes = list(executor.map(lambda column: _encode_column(df[column], classes[column]),
+                                          self.categorical_columns))
+        else:
+            codes = [_encode_column(df[column], classes[column]) for column in self.categorical_columns]
+        for column, column_codes in zip(self.categorical_columns, codes):
+            result[column] = column_codes
+        return result
+
+    def fit_transform(self, df, inplace=False):
+        """
+        Fit the transformer on a DataFrame and transform it.
+
+        Parameters:
+        df (pd.DataFrame): Training data.
+        inplace (bool): Replace the columns of df instead of returning a new DataFrame.
+
+        Returns:
+        pd.DataFrame: The transformed rows.
+        """
+        return self.fit(df).transform(df, inplace=inplace)
+
+    def inverse_transform_codes(self, column, codes):
+        """
+        Map integer codes of a categorical column back to its categories.
+
+        Parameters:
+        column (str): Categorical column name.
+        codes (array-like): Codes produced by transform.
+
+        Returns:
+        np.ndarray: Category values, None for UNKNOWN_CODE.
+        """
+        codes = np.asarray(codes)
+        known = codes >= 0
+        values = np.full(len(codes), None, dtype=object)
+        values[known] = self.classes_[column].to_numpy()[codes[known]]
+        return values
+
+    def save(self, path):
+        """
+        Save the fitted transformer atomically.
+
+        Parameters:
+        path (str): File path.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as transformer_file:
+            pickle.dump(self, transformer_file)
+        os.replace(temporary_path, path)
+
+    @staticmethod
+    def load(path):
+        """
+        Load a transformer saved with save().
+
+        Parameters:
+        path (str): File path.
+
+        Returns:
+        EncodeScaleTransformer: The fitted transformer.
+        """
+        with open(path, "rb") as transformer_file:
+            return pickle.load(transformer_file)
@@ -3,12 +3,19 @@ import re
 
 import pandas as pd
 
+from instrumentation import traced
+
+# dtype selectors covering downcast, nullable and pyarrow-backed dtypes (see memory_optimizer.py)
+NUMERICAL_DTYPES = ['number']
+CATEGORICAL_DTYPES = ['object', 'category', 'string']
+DATETIME_DTYPES = ['datetime', 'datetimetz']
+
 
 def create_directory(path):
-    if not os.path.exists(path):
+    try:
         os.makedirs(path)
         print(f"Directory '{path}' created.")
-    else:
+    except FileExistsError:
         print(f"Directory '{path}' already exists.")
 
 
@@ -18,11 +25,13 @@ class DataPreprocessor:
     """
 
     def __init__(self, df, info=True):
+        self.datetime_formats = {}
         self._preprocess_data(df)
         if info:
             self._print_column_info()
         create_directory("Report")
 
+    @traced('type_inference')
     def _preprocess_data(self, df):
         """
         Preprocess data to identify numerical, categorical, and datetime columns.
@@ -30,11 +39,27 @@ class DataPreprocessor:
         Parameters:
         df (pd.DataFrame): Input DataFrame.
         """
-        convert_object_columns_to_datetime(df)
-        convert_date_columns_to_datetime(df)
-        self.numerical_columns = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
-        self.categorical_columns = df.select_dtypes(include=['object', 'category']).columns.tolist()
-        self.datetime_columns = df.select_dtypes(include=['datetime64']).columns.tolist()
+        report = convert_object_columns_to_datetime(df)
+        self.datetime_formats = {column: inference['format'] for column, inference in report.items()
+                                 if inference['converted']}
+        for column in convert_date_columns_to_datetime(df):
+            self.datetime_formats.setdefault(column, None)
+        self.numerical_columns = df.select_dtypes(include=NUMERICAL_DTYPES).columns.tolist()
+        self.categorical_columns = df.select_dtypes(include=CATEGORICAL_DTYPES).columns.tolist()
+        self.datetime_columns = df.select_dtypes(include=DATETIME_DTYPES).columns.tolist()
+
+    def convert(self, df):
+        """
+        Apply the conversions made to the DataFrame the preprocessor was built from to another chunk of the
+        same data, so every chunk of a file gets the same column types.
+
+        Parameters:
+        df (pd.DataFrame): Chunk to convert in place.
+
+        Returns:
+        pd.DataFrame: The converted chunk.
+        """
+        return apply_column_types(df, self.datetime_formats, self.numerical_columns)
 
     def _print_column_info(self):
         """
@@ -45,45 +70,126 @@ class DataPreprocessor:
         print("Datetime Columns:", self.datetime_columns)
 
 
-def convert_object_columns_to_datetime(df):
+# (regex, strftime format) pairs tried in order, most specific first. Formats with {first}/{second}
+# are day/month ambiguous and resolved per column.
+DATE_FORMATS = [
+    (r'\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}\.\d+', '%Y-%m-%d{sep}%H:%M:%S.%f'),
+    (r'\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}', '%Y-%m-%d{sep}%H:%M:%S'),
+    (r'\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}', '%Y-%m-%d{sep}%H:%M'),
+    (r'\d{4}-\d{2}-\d{2}', '%Y-%m-%d'),
+    (r'\d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2}', '%Y/%m/%d %H:%M:%S'),
+    (r'\d{4}/\d{2}/\d{2}', '%Y/%m/%d'),
+    (r'\d{2}/\d{2}/\d{4} \d{2}:\d{2}:\d{2}', '{first}/{second}/%Y %H:%M:%S'),
+    (r'\d{2}/\d{2}/\d{4}', '{first}/{second}/%Y'),
+    (r'\d{2}-\d{2}-\d{4}', '{first}-{second}-%Y'),
+]
+
+
+def _stratified_sample(series, size=1000, random_state=0):
+    """
+    Sample a Series from its head, its tail and random rows in between.
+
+    Parameters:
+    series (pd.Series): Input Series.
+    size (int): Maximum sample size, split evenly between head, tail and random rows.
+    random_state (int): Seed for the random rows.
+
+    Returns:
+    pd.Series: Sampled values without nulls.
+    """
+    series = series.dropna()
+    if len(series) <= size:
+        return series
+    part = size // 3
+    middle = series.iloc[part:len(series) - part]
+    random_rows = middle.sample(n=min(size - 2 * part, len(middle)), random_state=random_state)
+    return pd.concat([series.iloc[:part], random_rows, series.iloc[-part:]])
+
+
+def _resolve_format(template, sample, separator):
+    """
+    Fill in the separator and the day/month order of a DATE_FORMATS template from sampled values.
+    """
+    date_format = template.replace('{sep}', separator)
+    if '{first}' not in date_format:
+        return date_format
+    fields = sample.str.extract(r'^(\d{2})\D(\d{2})').astype(int)
+    day_first = (fields[0] > 12).any() and not (fields[1] > 12).any()
+    return date_format.format(first='%d' if day_first else '%m', second='%m' if day_first else '%d')
+
+
+def infer_datetime_format(series, sample_size=1000, random_state=0):
+    """
+    Infer the datetime format of a string column from a stratified sample using vectorized matching.
+
+    Parameters:
+    series (pd.Series): Object column.
+    sample_size (int): Number of non-null values to sample.
+    random_state (int): Seed for the random part of the sample.
+
+    Returns:
+    dict: 'format' (str or None), 'confidence' (fraction of sampled values matching the format) and 'sample_size'.
+    """
+    sample = _stratified_sample(series, sample_size, random_state).astype(object)
+    strings = sample[sample.map(type) == str].str.strip()
+    if len(sample) == 0 or len(strings) == 0:
+        return {'format': None, 'confidence': 0.0, 'sample_size': len(sample)}
+
+    best_format, best_matches = None, 0
+    for pattern, template in DATE_FORMATS:
+        matched = strings[strings.str.fullmatch(pattern)]
+        if len(matched) > best_matches:
+            separator = 'T' if matched.str.contains('T', regex=False).any() else ' '
+            best_format, best_matches = _resolve_format(template, matched, separator), len(matched)
+            if best_matches == len(sample):
+                break
+    return {'format': best_format, 'confidence': best_matches / len(sample), 'sample_size': len(sample)}
+
+
+def convert_object_columns_to_datetime(df, min_confidence=1.0, sample_size=1000, random_state=0):
     """
-    Convert object columns with date-like strings to datetime.
+    Convert object, string and categorical columns with date-like strings to datetime.
+
+    Each such column's format is inferred from a stratified sample and the column is converted with
+    that explicit format, so pandas does not re-infer it element by element.
 
     Parameters:
     df (pd.DataFrame): Input DataFrame.
+    min_confidence (float): Minimum fraction of sampled non-null values that must match the format.
+    sample_size (int): Number of non-null values sampled per column.
+    random_state (int): Seed for the random part of the samples.
 
     Returns:
-    dict: Dictionary of unmatched cells in columns.
+    dict: Inference report per column with at least one date-like value: 'format', 'confidence',
+          'sample_size' and whether the column was 'converted'.
     """
-    date_patterns = [
-        re.compile(r'\d{4}-\d{2}-\d{2}'),
-        re.compile(r'\d{4}/\d{2}/\d{2}'),
-        re.compile(r'\d{2}/\d{2}/\d{4}'),
-        re.compile(r'\d{2}-\d{2}-\d{4}')
-    ]
-    unmatched = {}
+    report = {}
 
     for column in df.columns:
-        if df[column].dtype == 'object':
-            unmatched_cells_column = []
-            match_all = True
-            semi_match = False
-            for index, value in df[column].iloc[:1000].items():
-                if pd.isna(value) or not any(pattern.match(value) for pattern in date_patterns):
-                    match_all = False
-                    unmatched_cells_column.append(index)
-                else:
-                    semi_match = True
-
-            if match_all:
-                try:
-                    df[column] = pd.to_datetime(df[column])
-                except (ValueError, TypeError):
-                    pass
-            if semi_match and not match_all:
-                unmatched[column] = unmatched_cells_column
-
-    return unmatched
+        series = df[column]
+        is_categorical = isinstance(series.dtype, pd.CategoricalDtype)
+        if not (is_categorical or pd.api.types.is_string_dtype(series.dtype)):
+            continue
+
+        # Categorical columns are inferred and converted through their (few) distinct categories
+        values = series.cat.categories.to_series() if is_categorical else series
+        inference = infer_datetime_format(values, sample_size, random_state)
+        if inference['format'] is None:
+            continue
+        inference['converted'] = False
+        if inference['confidence'] >= min_confidence:
+            try:
+                converted = pd.to_datetime(values, format=inference['format'], cache=True)
+                if is_categorical:
+                    converted = pd.Series(pd.DatetimeIndex(converted).take(series.cat.codes.to_numpy(), allow_fill=True,
+                                                                           fill_value=pd.NaT), index=df.index)
+                df[column] = converted
+                inference['converted'] = True
+            except (ValueError, TypeError):
+                pass
+        report[column] = inference
+
+    return report
 
 
 def convert_date_columns_to_datetime(df):
@@ -92,15 +198,45 @@ def convert_date_columns_to_datetime(df):
 
     Parameters:
     df (pd.DataFrame): Input DataFrame.
+
+    Returns:
+    list: Converted columns.
     """
     date_keywords = ['year', 'month', 'day']
+    converted = []
 
     for column in df.columns:
         if any(keyword in column.lower() for keyword in date_keywords):
             try:
                 df[column] = pd.to_datetime(df[column], errors='coerce')
+                converted.append(column)
             except (ValueError, TypeError):
                 pass
+    return converted
+
+
+def apply_column_types(df, datetime_formats, numerical_columns=()):
+    """
+    Convert a chunk to column types detected on another chunk of the same data.
+
+    Values that do not fit the detected type become null, so a stray value in a later chunk cannot change
+    the dtype of a column.
+
+    Parameters:
+    df (pd.DataFrame): Chunk to convert in place.
+    datetime_formats (dict): Datetime columns with the format they were parsed with (None to infer it).
+    numerical_columns (list): Columns that must be numerical.
+
+    Returns:
+    pd.DataFrame: The converted chunk.
+    """
+    for column, date_format in datetime_formats.items():
+        if column in df.columns and not pd.api.types.is_datetime64_any_dtype(df[column].dtype):
+            df[column] = pd.to_datetime(df[column], format=date_format, errors='coerce', cache=True)
+    for column in numerical_columns:
+        if column in df.columns and not pd.api.types.is_numeric_dtype(df[column].dtype):
+            df[column] = pd.to_numeric(df[column], errors='coerce')
+    return df
 
 
 def binary_cols(df):
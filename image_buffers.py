@@ -0,0 +1,108 @@
+import hashlib
+import importlib.util
+import io
+
+# Formats a report can embed: raster images, and SVG converted to vector drawings with svglib
+IMAGE_FORMATS = ('png', 'jpeg', 'svg')
+VECTOR_FORMATS = ('svg',)
+
+
+class ImageSettings:
+    """
+    How chart figures are encoded for reports.
+
+    Attributes:
+    format (str): 'png', 'jpeg', or the vector format 'svg'. Vector images suit small plots with few drawn
+                  elements; they need the optional svglib package to be embedded in a report.
+    dpi (int): Raster resolution in dots per inch.
+    quality (int): JPEG quality between 1 and 95.
+    in_memory (bool): Keep encoded images in memory instead of writing them to the output directory.
+    """
+
+    def __init__(self, format='png', dpi=100, quality=85, in_memory=True):
+        if format == 'jpg':
+            format = 'jpeg'
+        if format not in IMAGE_FORMATS:
+            raise ValueError(f"Unknown image format '{format}'. Use one of {list(IMAGE_FORMATS)}.")
+        if format in VECTOR_FORMATS and importlib.util.find_spec('svglib') is None:
+            raise ImportError(f"Embedding {format} images in reports requires the optional svglib package "
+                              "(pip install svglib). Use 'png' or 'jpeg' instead.")
+        self.format = format
+        self.dpi = dpi
+        self.quality = quality
+        self.in_memory = in_memory
+
+    @property
+    def extension(self):
+        return 'jpg' if self.format == 'jpeg' else self.format
+
+    def cache_params(self):
+        """
+        Settings that change the encoded image, for ArtifactCache keys.
+
+        Returns:
+        dict: Format, resolution and quality.
+        """
+        return {'format': self.format, 'dpi': self.dpi, 'quality': self.quality if self.format == 'jpeg' else None}
+
+
+class ImageBuffer:
+    """
+    An encoded chart image held in memory.
+
+    Attributes:
+    data (bytes): Encoded image.
+    format (str): Image format, see ImageSettings.
+    title (str): Plot title.
+    """
+
+    def __init__(self, data, format, title=None):
+        self.data = data
+        self.format = format
+        self.title = title
+
+    @property
+    def digest(self):
+        """
+        Content hash, identical for identical images.
+        """
+        return hashlib.sha1(self.data).hexdigest()
+
+    def __len__(self):
+        return len(self.data)
+
+
+def encode_figure(fig, settings, title=None):
+    """
+    Encode a matplotlib figure into an in-memory image.
+
+    Parameters:
+    fig (matplotlib.figure.Figure): Figure to encode.
+    settings (ImageSettings): Format, resolution and quality.
+    title (str or None): Plot title stored with the image.
+
+    Returns:
+    ImageBuffer: The encoded figure.
+    """
+    buffer = io.BytesIO()
+    kwargs = {'pil_kwargs': {'quality': settings.quality, 'optimize': True}} if settings.format == 'jpeg' else {}
+    fig.savefig(buffer, format=settings.format, dpi=settings.dpi, **kwargs)
+    return ImageBuffer(buffer.getvalue(), settings.format, title)
+
+
+def read_image(image):
+    """
+    Read an image given as a path or ImageBuffer into bytes.
+
+    Parameters:
+    image (str or ImageBuffer): Image file path or in-memory image.
+
+    Returns:
+    ImageBuffer: The image in memory.
+    """
+    if isinstance(image, ImageBuffer):
+        return image
+    with open(image, "rb") as image_file:
+        data = image_file.read()
+    extension = image.rsplit('.', 1)[-1].lower()
+    return ImageBuffer(data, 'jpeg' if extension == 'jpg' else extension)
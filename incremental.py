@@ -0,0 +1,270 @@
+import hashlib
+import io
+import os
+import pickle
+
+import pandas as pd
+
+from data_downloader import extract_source_type, read_file_in_chunks, _iter_sized_chunks
+from helper import DataPreprocessor, apply_column_types, create_directory
+from statistics_engine import DataFrameStatistics
+from categorical_profiles import DEFAULT_CATEGORY_CAPACITY
+from compressed_io import compression_type
+
+DEFAULT_STATE_DIRECTORY = ".incremental_state"
+CHECKSUM_BLOCK_SIZE = 1024 ** 2
+
+
+def _hash_range(digest, file, start, end, block_size=CHECKSUM_BLOCK_SIZE):
+    """
+    Feed the bytes [start, end) of an open binary file to a hashlib digest, block by block.
+    """
+    file.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        block = file.read(min(block_size, remaining))
+        if not block:
+            break
+        digest.update(block)
+        remaining -= len(block)
+    return digest
+
+
+def prefix_checksum(file_path, length, block_size=CHECKSUM_BLOCK_SIZE):
+    """
+    SHA-256 checksum of the first `length` bytes of a file.
+
+    Every byte of the prefix is hashed, so any edit of the analysed rows is detected, not only edits near
+    its start or end.
+
+    Parameters:
+    file_path (str): Path of the file.
+    length (int): Length of the prefix in bytes.
+    block_size (int): Bytes hashed at a time.
+
+    Returns:
+    str: Hex digest.
+    """
+    with open(file_path, "rb") as file:
+        return _hash_range(hashlib.sha256(), file, 0, length, block_size).hexdigest()
+
+
+class IncrementalState:
+    """
+    Aggregate state of a previous analysis of a file, used to process only rows appended since.
+
+    Attributes:
+    file_path (str): Absolute path of the analysed file.
+    size (int): File size in bytes when it was analysed.
+    checksum (str): prefix_checksum of the analysed bytes.
+    columns (list): Column names of the file.
+    numerical_columns, categorical_columns, datetime_columns (list): Column types detected on the first run.
+    datetime_formats (dict): Formats the datetime columns were parsed with, applied to the appended rows.
+    statistics (DataFrameStatistics): Merged statistics of every analysed row.
+    """
+
+    def __init__(self, file_path, size, checksum, columns, preprocessor, statistics):
+        self.file_path = file_path
+        self.size = size
+        self.checksum = checksum
+        self.columns = columns
+        self.numerical_columns = preprocessor.numerical_columns
+        self.categorical_columns = preprocessor.categorical_columns
+        self.datetime_columns = preprocessor.datetime_columns
+        self.datetime_formats = preprocessor.datetime_formats
+        self.statistics = statistics
+
+
+def state_path_for(file_path, state_directory=DEFAULT_STATE_DIRECTORY):
+    """
+    Path of the state file of a source file.
+
+    Parameters:
+    file_path (str): Path of the source file.
+    state_directory (str): Directory holding the state files.
+
+    Returns:
+    str: State file path.
+    """
+    key = hashlib.sha256(os.path.abspath(file_path).encode()).hexdigest()[:32]
+    return os.path.join(state_directory, f"{key}.pkl")
+
+
+def load_state(state_path):
+    """
+    Load a saved IncrementalState.
+
+    Parameters:
+    state_path (str): State file path.
+
+    Returns:
+    IncrementalState or None: The state, or None if it is missing or unreadable.
+    """
+    try:
+        with open(state_path, "rb") as state_file:
+            return pickle.load(state_file)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+
+
+def save_state(state, state_path):
+    """
+    Save an IncrementalState atomically.
+
+    Parameters:
+    state (IncrementalState): State to save.
+    state_path (str): State file path.
+    """
+    create_directory(os.path.dirname(state_path) or ".")
+    temporary_path = f"{state_path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as state_file:
+        pickle.dump(state, state_file)
+    os.replace(temporary_path, state_path)
+
+
+def _detect_change(state, file_path, size):
+    """
+    Classify how a file changed since its state was saved, considering only its first `size` bytes.
+
+    Returns:
+    tuple: The change as in detect_append, and for 'appended' files the checksum of the first `size` bytes,
+           continued from the verified prefix so the file is read only once.
+    """
+    if state is None or state.file_path != os.path.abspath(file_path) or extract_source_type(file_path) != 'csv':
+        return 'changed', None
+    if size < state.size:
+        return 'changed', None
+    with open(file_path, "rb") as file:
+        digest = _hash_range(hashlib.sha256(), file, 0, state.size)
+        if digest.hexdigest() != state.checksum:
+            return 'changed', None
+        if size == state.size:
+            return 'unchanged', state.checksum
+        # Rows appended to a compressed file do not start at a byte offset of the file
+        if compression_type(file_path) is not None:
+            return 'changed', None
+        file.seek(state.size - 1)
+        # The analysed part must end on a complete row for the tail to start on a new one
+        if file.read(1) != b"\n":
+            return 'changed', None
+        return 'appended', _hash_range(digest, file, state.size, size).hexdigest()
+
+
+def detect_append(state, file_path):
+    """
+    Classify how a file changed since its state was saved.
+
+    Parameters:
+    state (IncrementalState or None): Saved state.
+    file_path (str): Path of the source file.
+
+    Returns:
+    str: 'unchanged', 'appended' (the analysed bytes are intact and rows were added after them) or 'changed'.
+    """
+    return _detect_change(state, file_path, os.path.getsize(file_path))[0]
+
+
+class _BoundedReader(io.RawIOBase):
+    """
+    Read-only view of the next `length` bytes of an open binary file.
+    """
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.file.read(min(len(buffer), self.remaining))
+        buffer[:len(data)] = data
+        self.remaining -= len(data)
+        return len(data)
+
+
+def _read_csv_range(file_path, start, end, columns=None, chunk_size=None, max_chunk_bytes=None):
+    """
+    Stream the rows of a CSV file stored between two byte offsets, as DataFrame chunks.
+
+    Rows written after `end` while the file is read are left for the next run. The header is read from the
+    file when start is 0, otherwise the rows are named after `columns`.
+    """
+    with open(file_path, "rb") as file:
+        file.seek(start)
+        names = {} if start == 0 else {'header': None, 'names': columns}
+        source = io.BufferedReader(_BoundedReader(file, end - start))
+        with pd.read_csv(source, iterator=True, **names) as reader:
+            def get_chunk(n):
+                try:
+                    return reader.get_chunk(n)
+                except StopIteration:
+                    return None
+
+            yield from _iter_sized_chunks(get_chunk, chunk_size, max_chunk_bytes)
+
+
+def update_statistics(file_path, state_directory=DEFAULT_STATE_DIRECTORY, chunk_size=None, max_chunk_bytes=None,
+                      full=False):
+    """
+    Compute the statistics of a file, reusing the state of the previous run when rows were only appended.
+
+    If the file is unchanged, the saved statistics are returned as they are. If rows were appended, only
+    the new tail is read and merged into the saved statistics. Otherwise (first run, rewritten file,
+    non-CSV source or full=True) the whole file is streamed again. The new state is saved in every case.
+
+    Parameters:
+    file_path (str): Path of the source file.
+    state_directory (str): Directory holding the state files.
+    chunk_size (int or None): Maximum number of rows per chunk.
+    max_chunk_bytes (int or None): Approximate in-memory size budget per chunk in bytes.
+    full (bool): Force a full recompute.
+
+    Returns:
+    tuple: (IncrementalState or None, mode) with mode 'unchanged', 'appended' or 'full'. The state is None
+           if the file has no rows.
+    """
+    state_path = state_path_for(file_path, state_directory)
+    state = None if full else load_state(state_path)
+    # Only the bytes present now are analysed, so rows written during the run are left for the next one
+    size = os.path.getsize(file_path)
+    change, checksum = _detect_change(state, file_path, size)
+
+    if change == 'unchanged':
+        return state, 'unchanged'
+
+    if change == 'appended':
+        tail = DataFrameStatistics(state.numerical_columns, state.categorical_columns,
+                                   state.statistics.quantile_capacity, distinct_rows=True,
+                                   category_capacity=state.statistics.category_capacity)
+        for chunk in _read_csv_range(file_path, state.size, size, state.columns, chunk_size, max_chunk_bytes):
+            # States saved before the datetime formats were recorded have no conversions to apply
+            tail.update(apply_column_types(chunk, getattr(state, 'datetime_formats', {}), state.numerical_columns))
+        state.statistics.merge(tail)
+        mode = 'appended'
+    else:
+        preprocessor = None
+        statistics = None
+        columns = None
+        if extract_source_type(file_path) == 'csv' and compression_type(file_path) is None:
+            chunks = _read_csv_range(file_path, 0, size, chunk_size=chunk_size, max_chunk_bytes=max_chunk_bytes)
+        else:
+            chunks = read_file_in_chunks(file_path, chunk_size=chunk_size, max_chunk_bytes=max_chunk_bytes)
+        for chunk in chunks:
+            if preprocessor is None:
+                columns = chunk.columns.tolist()
+                preprocessor = DataPreprocessor(chunk)
+                statistics = DataFrameStatistics(preprocessor.numerical_columns, preprocessor.categorical_columns,
+                                                 distinct_rows=True, category_capacity=DEFAULT_CATEGORY_CAPACITY)
+            else:
+                preprocessor.convert(chunk)
+            statistics.update(chunk)
+        if preprocessor is None:
+            return None, 'full'
+        state = IncrementalState(os.path.abspath(file_path), size, None, columns, preprocessor, statistics)
+        mode = 'full'
+
+    state.size = size
+    state.checksum = checksum if checksum is not None else prefix_checksum(file_path, size)
+    save_state(state, state_path)
+    return state, mode
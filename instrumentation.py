@@ -0,0 +1,344 @@
+import contextlib
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+
+# Set to a file path to record a Chrome trace (and a run summary next to it) of a CLI run
+TRACE_ENVIRONMENT_VARIABLE = 'EDA_TRACE'
+# Set to a file path to profile a CLI run with cProfile
+PROFILE_ENVIRONMENT_VARIABLE = 'EDA_PROFILE'
+
+_active_tracer = None
+
+
+def current_rss_bytes():
+    """
+    Current resident set size of this process.
+
+    Returns:
+    int or None: RSS in bytes, or None if it cannot be read on this platform.
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return None
+
+
+class Tracer:
+    """
+    Records timed spans and counters of one run and exports them as a Chrome trace and a run summary.
+
+    Spans can be nested and opened from several threads. Every span records its wall time and the RSS
+    before and after it; counters accumulate values per name and column.
+    """
+
+    def __init__(self, memory=True):
+        """
+        Initialize an empty tracer.
+
+        Parameters:
+        memory (bool): Record the RSS at the start and end of every span.
+        """
+        self.memory = memory
+        self.spans = []
+        self.counters = {}
+        self._counter_events = []
+        self._lock = threading.Lock()
+        self._origin_ns = time.perf_counter_ns()
+
+    @contextlib.contextmanager
+    def span(self, name, category='stage', column=None, **args):
+        """
+        Time a block of code.
+
+        Parameters:
+        name (str): Span name, e.g. 'load' or 'plot.boxplot'.
+        category (str): Span category, e.g. 'stage', 'statistic' or 'plot'.
+        column (str or None): Column the span works on, for per-column summaries.
+        **args: Extra JSON-serializable details shown in the trace viewer.
+        """
+        rss_before = current_rss_bytes() if self.memory else None
+        start_ns = time.perf_counter_ns()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            end_ns = time.perf_counter_ns()
+            record = {'name': name, 'category': category, 'column': column, 'args': args,
+                      'start_ns': start_ns - self._origin_ns, 'duration_ns': end_ns - start_ns,
+                      'thread': threading.get_ident(), 'rss_before': rss_before,
+                      'rss_after': current_rss_bytes() if self.memory else None, 'error': error}
+            with self._lock:
+                self.spans.append(record)
+
+    def count(self, name, value=1, column=None):
+        """
+        Add to a counter.
+
+        Parameters:
+        name (str): Counter name, e.g. 'outliers'.
+        value (int or float): Amount to add.
+        column (str or None): Column the value belongs to.
+        """
+        with self._lock:
+            key = (name, column)
+            self.counters[key] = self.counters.get(key, 0) + value
+            self._counter_events.append((time.perf_counter_ns() - self._origin_ns, name, column,
+                                         self.counters[key]))
+
+    def chrome_trace(self):
+        """
+        Export the spans and counters in the Chrome trace event format, for chrome://tracing or Perfetto.
+
+        Returns:
+        dict: {'traceEvents': [...]} with one complete event per span and one counter event per count.
+        """
+        pid = os.getpid()
+        events = []
+        with self._lock:
+            for record in self.spans:
+                args = dict(record['args'])
+                if record['column'] is not None:
+                    args['column'] = record['column']
+                for key in ('rss_before', 'rss_after', 'error'):
+                    if record[key] is not None:
+                        args[key] = record[key]
+                events.append({'name': record['name'], 'cat': record['category'], 'ph': 'X', 'pid': pid,
+                               'tid': record['thread'], 'ts': record['start_ns'] / 1000,
+                               'dur': record['duration_ns'] / 1000, 'args': args})
+            for timestamp_ns, name, column, total in self._counter_events:
+                label = name if column is None else f"{name}[{column}]"
+                events.append({'name': label, 'ph': 'C', 'pid': pid, 'tid': 0, 'ts': timestamp_ns / 1000,
+                               'args': {name: total}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def summary(self):
+        """
+        Aggregate the spans per name and per column.
+
+        Returns:
+        dict: 'stages' with the calls, total / max seconds, peak RSS in MB and errors per span name,
+              'columns' with the seconds per span name and the counters of every column, and the 'counters'
+              not tied to a column.
+        """
+        stages = {}
+        columns = {}
+        with self._lock:
+            spans = list(self.spans)
+            counters = dict(self.counters)
+        for record in spans:
+            seconds = record['duration_ns'] / 1e9
+            stage = stages.setdefault(record['name'], {'category': record['category'], 'calls': 0,
+                                                       'seconds': 0.0, 'max_seconds': 0.0, 'peak_rss_mb': None,
+                                                       'errors': 0})
+            stage['calls'] += 1
+            stage['seconds'] += seconds
+            stage['max_seconds'] = max(stage['max_seconds'], seconds)
+            stage['errors'] += record['error'] is not None
+            rss = [value for value in (record['rss_before'], record['rss_after']) if value is not None]
+            if rss:
+                peak = max(rss) / 1024 ** 2
+                stage['peak_rss_mb'] = peak if stage['peak_rss_mb'] is None else max(stage['peak_rss_mb'], peak)
+            if record['column'] is not None:
+                column = columns.setdefault(record['column'], {'seconds': {}, 'counters': {}})
+                column['seconds'][record['name']] = column['seconds'].get(record['name'], 0.0) + seconds
+
+        global_counters = {}
+        for (name, column), value in counters.items():
+            if column is None:
+                global_counters[name] = value
+            else:
+                columns.setdefault(column, {'seconds': {}, 'counters': {}})['counters'][name] = value
+        return {'stages': stages, 'columns': columns, 'counters': global_counters,
+                'slowest_columns': sorted(((column, sum(info['seconds'].values()))
+                                           for column, info in columns.items()),
+                                          key=lambda item: item[1], reverse=True)[:10]}
+
+    def save(self, trace_path=None, summary_path=None):
+        """
+        Write the Chrome trace and/or the run summary as JSON files.
+
+        Parameters:
+        trace_path (str or None): Path of the Chrome trace.
+        summary_path (str or None): Path of the run summary.
+        """
+        for path, content in ((trace_path, self.chrome_trace), (summary_path, self.summary)):
+            if path is None:
+                continue
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, 'w') as output_file:
+                json.dump(content(), output_file, indent=1, default=str)
+
+
+def get_tracer():
+    """
+    Tracer of the current run, or None when tracing is off.
+    """
+    return _active_tracer
+
+
+def start_tracing(memory=True):
+    """
+    Start recording spans and counters for the whole process.
+
+    Parameters:
+    memory (bool): Record the RSS at the start and end of every span.
+
+    Returns:
+    Tracer: The active tracer.
+    """
+    global _active_tracer
+    _active_tracer = Tracer(memory=memory)
+    return _active_tracer
+
+
+def stop_tracing(trace_path=None, summary_path=None):
+    """
+    Stop tracing and optionally write the trace and run summary.
+
+    Parameters:
+    trace_path (str or None): Path of the Chrome trace.
+    summary_path (str or None): Path of the run summary.
+
+    Returns:
+    Tracer or None: The tracer that was active.
+    """
+    global _active_tracer
+    tracer, _active_tracer = _active_tracer, None
+    if tracer is not None:
+        tracer.save(trace_path, summary_path)
+    return tracer
+
+
+def span(name, category='stage', column=None, **args):
+    """
+    Time a block of code with the active tracer; does nothing when tracing is off.
+
+    Parameters:
+    name (str): Span name.
+    category (str): Span category.
+    column (str or None): Column the span works on.
+    **args: Extra details shown in the trace viewer.
+
+    Returns:
+    context manager: The span.
+    """
+    tracer = _active_tracer
+    if tracer is None:
+        return contextlib.nullcontext()
+    return tracer.span(name, category, column, **args)
+
+
+def count(name, value=1, column=None):
+    """
+    Add to a counter of the active tracer; does nothing when tracing is off.
+
+    Parameters:
+    name (str): Counter name.
+    value (int or float): Amount to add.
+    column (str or None): Column the value belongs to.
+    """
+    tracer = _active_tracer
+    if tracer is not None:
+        tracer.count(name, value, column)
+
+
+def traced(name, category='stage'):
+    """
+    Decorator recording every call of a function as a span of the active tracer.
+
+    If the function has a 'column' parameter, its value is recorded as the column of the span.
+
+    Parameters:
+    name (str): Span name.
+    category (str): Span category.
+
+    Returns:
+    callable: The decorator.
+    """
+    def decorator(function):
+        signature = inspect.signature(function)
+        has_column = 'column' in signature.parameters
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            tracer = _active_tracer
+            if tracer is None:
+                return function(*args, **kwargs)
+            column = None
+            if has_column:
+                try:
+                    column = signature.bind(*args, **kwargs).arguments.get('column')
+                except TypeError:
+                    pass
+            with tracer.span(name, category, None if column is None else str(column)):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextlib.contextmanager
+def profiled(path):
+    """
+    Profile a block of code with cProfile and write the statistics, readable with pstats or snakeviz.
+
+    For sampling without changing code, py-spy can attach to the running process instead
+    (`py-spy record --format chrometrace`), producing a trace in the same format as Tracer.chrome_trace.
+
+    Parameters:
+    path (str): Output path of the profile statistics.
+    """
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        profiler.dump_stats(path)
+
+
+def summary_path_for(trace_path):
+    """
+    Path of the run summary written next to a trace, e.g. run.json -> run_summary.json.
+    """
+    root, extension = os.path.splitext(trace_path)
+    return f"{root}_summary{extension or '.json'}"
+
+
+@contextlib.contextmanager
+def instrument_from_environment():
+    """
+    Trace and/or profile a run as configured by the EDA_TRACE and EDA_PROFILE environment variables, so
+    production runs can be inspected without changing code. Does nothing if neither is set.
+    """
+    trace_path = os.environ.get(TRACE_ENVIRONMENT_VARIABLE)
+    profile_path = os.environ.get(PROFILE_ENVIRONMENT_VARIABLE)
+    with contextlib.ExitStack() as stack:
+        if profile_path:
+            stack.enter_context(profiled(profile_path))
+        if trace_path:
+            start_tracing()
+            stack.callback(stop_tracing, trace_path, summary_path_for(trace_path))
+        with span('run'):
+            yield get_tracer()
@@ -0,0 +1,93 @@
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+# Checked without importing pyarrow, which pandas loads on its own once a pyarrow dtype is used
+PYARROW_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
+
+def _downcast_numeric(series):
+    """
+    Downcast a numerical column to the smallest dtype that holds its values without loss.
+
+    Parameters:
+    series (pd.Series): Numerical column.
+
+    Returns:
+    pd.Series: The downcast column, or the original column if no smaller dtype is lossless.
+    """
+    if pd.api.types.is_bool_dtype(series.dtype) or pd.api.types.is_extension_array_dtype(series.dtype):
+        return series
+    if pd.api.types.is_integer_dtype(series.dtype):
+        downcast = 'unsigned' if len(series) and series.min() >= 0 else 'integer'
+        return pd.to_numeric(series, downcast=downcast)
+    if pd.api.types.is_float_dtype(series.dtype) and series.dtype != np.float32:
+        candidate = series.astype(np.float32)
+        # Only keep float32 if every value survives the round trip
+        if ((candidate.astype(series.dtype) == series) | series.isna()).all():
+            return candidate
+    return series
+
+
+def _convert_strings(series, categorical_threshold, use_pyarrow_strings):
+    """
+    Convert a string column to category if it has few distinct values, else to a pyarrow-backed string dtype.
+
+    Parameters:
+    series (pd.Series): Object column.
+    categorical_threshold (float): Maximum ratio of distinct values to rows for a category conversion.
+    use_pyarrow_strings (bool): Whether to use 'string[pyarrow]' for the other string columns.
+
+    Returns:
+    pd.Series: The converted column, or the original column if it does not hold only strings.
+    """
+    non_null = series.dropna()
+    if len(non_null) == 0:
+        return series
+    if non_null.nunique() / len(non_null) <= categorical_threshold:
+        return series.astype('category')
+    if use_pyarrow_strings and PYARROW_AVAILABLE and pd.api.types.infer_dtype(non_null, skipna=True) == 'string':
+        return series.astype('string[pyarrow]')
+    return series
+
+
+def optimize_dataframe_memory(df, categorical_threshold=0.5, use_pyarrow_strings=True):
+    """
+    Reduce the memory footprint of a DataFrame in place.
+
+    Integer columns are downcast to the smallest (unsigned) integer dtype, float columns to float32
+    when that is lossless, low-cardinality string columns are converted to category and the remaining
+    string columns to a pyarrow-backed string dtype when pyarrow is installed.
+
+    Parameters:
+    df (pd.DataFrame): Input DataFrame, modified in place.
+    categorical_threshold (float): Maximum ratio of distinct values to rows for a category conversion.
+    use_pyarrow_strings (bool): Whether to use 'string[pyarrow]' for high-cardinality string columns.
+
+    Returns:
+    dict: Per converted column, the dtype and memory usage in bytes before and after, and the bytes saved.
+    """
+    report = {}
+
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            optimized = _downcast_numeric(series)
+        elif series.dtype == 'object':
+            optimized = _convert_strings(series, categorical_threshold, use_pyarrow_strings)
+        else:
+            continue
+
+        if optimized.dtype == series.dtype:
+            continue
+        bytes_before = series.memory_usage(index=False, deep=True)
+        bytes_after = optimized.memory_usage(index=False, deep=True)
+        if bytes_after >= bytes_before:
+            continue
+        df[column] = optimized
+        report[column] = {'dtype_before': str(series.dtype), 'dtype_after': str(optimized.dtype),
+                          'bytes_before': int(bytes_before), 'bytes_after': int(bytes_after),
+                          'bytes_saved': int(bytes_before - bytes_after)}
+
+    return report
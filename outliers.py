@@ -0,0 +1,189 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from statistics_engine import QuantileSketch, NumericMoments, _numeric_block
+
+DEFAULT_THRESHOLDS = {
+    'iqr': 1.5,  # multiples of the interquartile range beyond Q1 / Q3
+    'zscore': 3.0,  # standard deviations from the mean
+    'mad': 3.5,  # modified z-score (Iglewicz and Hoaglin)
+}
+MAD_SCALE = 0.6745
+
+
+class OutlierReport:
+    """
+    Result of an all-columns outlier detection.
+
+    Attributes:
+    method (str): Detection method used.
+    bounds (pd.DataFrame): 'lower' and 'upper' bound per column.
+    counts (pd.Series): Number of outliers per column.
+    percentages (pd.Series): Fraction of rows that are outliers per column.
+    mask (pd.DataFrame or None): Boolean outlier mask with the shape of the analysed columns.
+    """
+
+    def __init__(self, method, bounds, counts, percentages, mask=None):
+        self.method = method
+        self.bounds = bounds
+        self.counts = counts
+        self.percentages = percentages
+        self.mask = mask
+
+    def to_records(self):
+        """
+        Convert the report to the list of dictionaries used by DataAnalyzer.remove_outliers.
+
+        Returns:
+        list: One dictionary per column with 'Name', 'Percentage' and 'Number_Of_Outliers'.
+        """
+        return [{'Name': column,
+                 'Percentage': self.percentages[column],
+                 'Number_Of_Outliers': int(self.counts[column])}
+                for column in self.counts.index]
+
+
+def _sketch_quantiles(values, quantiles, quantile_capacity):
+    """
+    Approximate quantiles of every column of a 2D array with one QuantileSketch per column.
+
+    Parameters:
+    values (np.ndarray): Array of shape (rows, columns).
+    quantiles (list of float): Quantiles between 0 and 1.
+    quantile_capacity (int): Capacity of the sketches.
+
+    Returns:
+    np.ndarray: Array of shape (len(quantiles), columns).
+    """
+    result = np.empty((len(quantiles), values.shape[1]))
+    for position in range(values.shape[1]):
+        sketch = QuantileSketch(quantile_capacity).update(values[:, position])
+        result[:, position] = sketch.quantile(quantiles)
+    return result
+
+
+def _column_quantiles(values, quantiles, approximate, quantile_capacity):
+    """
+    Exact or approximate quantiles of every column of a 2D array, ignoring NaN.
+    """
+    if approximate:
+        return _sketch_quantiles(values, quantiles, quantile_capacity)
+    if values.shape[0] == 0:
+        return np.full((len(quantiles), values.shape[1]), np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN columns yield NaN bounds
+        return np.nanquantile(values, quantiles, axis=0)
+
+
+def outlier_bounds(values, method='iqr', threshold=None, approximate=False, quantile_capacity=2048):
+    """
+    Compute lower and upper outlier bounds for every column of a 2D array at once.
+
+    Parameters:
+    values (np.ndarray): Array of shape (rows, columns) with NaN for missing values.
+    method (str): 'iqr', 'zscore' or 'mad'.
+    threshold (float or None): Method threshold. If None, DEFAULT_THRESHOLDS[method] is used.
+    approximate (bool): Estimate quantiles with QuantileSketch instead of exact sorting.
+    quantile_capacity (int): Capacity of the sketches when approximate is True.
+
+    Returns:
+    tuple: Arrays of lower and upper bounds, one entry per column.
+    """
+    if method not in DEFAULT_THRESHOLDS:
+        raise ValueError(f"Unknown outlier method '{method}'. Use one of {list(DEFAULT_THRESHOLDS)}.")
+    threshold = DEFAULT_THRESHOLDS[method] if threshold is None else threshold
+
+    if method == 'iqr':
+        q1, q3 = _column_quantiles(values, [0.25, 0.75], approximate, quantile_capacity)
+        step = threshold * (q3 - q1)
+        return q1 - step, q3 + step
+
+    if method == 'zscore':
+        moments = NumericMoments.from_array(values)
+        mean = np.where(moments.n > 0, moments.mean, np.nan)
+        step = threshold * np.sqrt(moments.variance())
+        return mean - step, mean + step
+
+    median = _column_quantiles(values, [0.5], approximate, quantile_capacity)[0]
+    mad = _column_quantiles(np.abs(values - median), [0.5], approximate, quantile_capacity)[0]
+    step = threshold * mad / MAD_SCALE
+    return median - step, median + step
+
+
+def outliers_from_statistics(statistics, method='iqr', threshold=None):
+    """
+    Estimate outlier counts of every numerical column from mergeable statistics instead of the raw data.
+
+    Bounds come from the merged quantile sketches ('iqr') or moments ('zscore') and the counts from the
+    quantile sketches, so they are exact while the sketches hold every value and approximate afterwards.
+
+    Parameters:
+    statistics (DataFrameStatistics): Statistics of all rows, e.g. merged over chunks or runs.
+    method (str): 'iqr' or 'zscore'. 'mad' needs the raw data and is not supported.
+    threshold (float or None): Method threshold. If None, DEFAULT_THRESHOLDS[method] is used.
+
+    Returns:
+    OutlierReport: Bounds, counts and percentages for every numerical column, without a mask.
+    """
+    if method not in ('iqr', 'zscore'):
+        raise ValueError(f"Outliers can only be estimated from statistics with 'iqr' or 'zscore', not '{method}'.")
+    threshold = DEFAULT_THRESHOLDS[method] if threshold is None else threshold
+    columns = statistics.numerical_columns
+
+    if method == 'iqr':
+        quartiles = np.array([np.atleast_1d(statistics.sketches[column].quantile([0.25, 0.75]))
+                              for column in columns]).reshape(len(columns), 2)
+        step = threshold * (quartiles[:, 1] - quartiles[:, 0])
+        lower, upper = quartiles[:, 0] - step, quartiles[:, 1] + step
+    else:
+        moments = statistics.moments
+        mean = np.where(moments.n > 0, moments.mean, np.nan)
+        step = threshold * np.sqrt(moments.variance())
+        lower, upper = mean - step, mean + step
+
+    counts = np.array([round(statistics.sketches[column].count_outside(low, high))
+                       for column, low, high in zip(columns, lower, upper)], dtype=int)
+    rows = statistics.rows
+    return OutlierReport(
+        method=method,
+        bounds=pd.DataFrame({'lower': lower, 'upper': upper}, index=columns),
+        counts=pd.Series(counts, index=columns),
+        percentages=pd.Series(counts / rows if rows else np.zeros(len(columns)), index=columns),
+    )
+
+
+def detect_outliers_frame(df, columns=None, method='iqr', threshold=None, return_mask=False, approximate=False,
+                          quantile_capacity=2048):
+    """
+    Detect outliers in all numerical columns of a DataFrame with one vectorized pass.
+
+    Parameters:
+    df (pd.DataFrame): Input DataFrame.
+    columns (list or None): Columns to analyse. If None, all numerical columns are used.
+    method (str): 'iqr', 'zscore' or 'mad'.
+    threshold (float or None): Method threshold. If None, DEFAULT_THRESHOLDS[method] is used.
+    return_mask (bool): Whether to include the boolean outlier mask in the report.
+    approximate (bool): Estimate quantiles with QuantileSketch instead of exact sorting, for data too large to sort.
+    quantile_capacity (int): Capacity of the sketches when approximate is True.
+
+    Returns:
+    OutlierReport: Bounds, counts, percentages and optionally the mask for every column.
+    """
+    columns = df.select_dtypes(include='number').columns.tolist() if columns is None else list(columns)
+    values = _numeric_block(df, columns)
+    lower, upper = outlier_bounds(values, method, threshold, approximate, quantile_capacity)
+
+    with np.errstate(invalid='ignore'):
+        mask = (values < lower) | (values > upper)
+    counts = mask.sum(axis=0)
+    rows = len(df)
+
+    return OutlierReport(
+        method=method,
+        bounds=pd.DataFrame({'lower': lower, 'upper': upper}, index=columns),
+        counts=pd.Series(counts, index=columns),
+        percentages=pd.Series(counts / rows if rows else np.zeros(len(columns)), index=columns),
+        mask=pd.DataFrame(mask, index=df.index, columns=columns) if return_mask else None,
+    )
@@ -0,0 +1,227 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pandas as pd
+
+
+class SharedColumnBlock:
+    """
+    Copy a set of equally long columns into one shared memory block.
+
+    Columns are stored column-major so every column is one contiguous slice of the block, and worker
+    processes attach to it by name instead of receiving a pickled DataFrame.
+    """
+
+    def __init__(self, arrays, dtype):
+        """
+        Allocate the block and copy the arrays into it.
+
+        Parameters:
+        arrays (list of np.ndarray): One-dimensional arrays of the same length.
+        dtype (str or np.dtype): dtype of the block.
+        """
+        self.dtype = np.dtype(dtype)
+        self.shape = (len(arrays), len(arrays[0]) if arrays else 0)
+        nbytes = max(int(np.prod(self.shape)) * self.dtype.itemsize, 1)
+        self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        block = np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf)
+        for position, array in enumerate(arrays):
+            block[position] = array
+        del block
+
+    def spec(self, position):
+        """
+        Describe one column of the block so a worker can attach to it.
+
+        Parameters:
+        position (int): Position of the column in the block.
+
+        Returns:
+        tuple: (shared memory name, block shape, dtype string, column position).
+        """
+        return self.shm.name, self.shape, self.dtype.str, position
+
+    def release(self):
+        """
+        Close and free the shared memory block.
+        """
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _read_shared_column(spec):
+    """
+    Copy one column out of a shared memory block described by SharedColumnBlock.spec.
+
+    Parameters:
+    spec (tuple): Column description.
+
+    Returns:
+    np.ndarray: The column values.
+    """
+    name, shape, dtype, position = spec
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        return np.ndarray(shape, dtype=dtype, buffer=shm.buf)[position].copy()
+    finally:
+        shm.close()
+
+
+def _init_worker():
+    """
+    Set up a rendering worker with headless matplotlib.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _render_numerical(spec, column, directory, pre_aggregate=True, settings=None):
+    """
+    Render the box plot, density plot and histogram of one numerical column in a worker.
+
+    Returns:
+    list: Image paths (or in-memory images) in the order box plot, density plot, histogram.
+    """
+    from data_visualization import DataVisualization, summarize_numerical_column
+
+    df = pd.DataFrame({column: _read_shared_column(spec)})
+    summary = summarize_numerical_column(df[column]) if pre_aggregate else None
+    if summary is not None:
+        return [DataVisualization.plot_boxplot_from_summary(summary, column, True, False, directory, settings),
+                DataVisualization.plot_density_from_summary(summary, column, True, False, directory, settings),
+                DataVisualization.plot_skewness_kurtosis_from_summary(summary, column, True, False, directory,
+                                                                      settings)]
+    return [DataVisualization.plot_boxplot(df, column, True, False, directory, settings),
+            DataVisualization.plot_density(df, column, True, False, directory, settings),
+            DataVisualization.plot_skewness_kurtosis(df, column, True, False, directory, settings)]
+
+
+def _render_categorical(profile, column, directory, settings=None):
+    """
+    Render the count plot of one categorical column in a worker from its precomputed profile.
+
+    Returns:
+    str or ImageBuffer: Image path, or the in-memory image.
+    """
+    from data_visualization import DataVisualization
+
+    return DataVisualization.plot_categorical_count_from_profile(profile, column, True, False, directory, settings)
+
+
+class RenderingPool:
+    """
+    Process pool that renders chart images for many columns in parallel.
+
+    Each worker receives only the column it draws, through shared memory. Results are returned in the
+    order of the requested columns, regardless of which worker finishes first. The output directory is
+    passed with every task, so one pool can serve many datasets and analysis sessions.
+    """
+
+    def __init__(self, n_jobs=-1):
+        """
+        Initialize the RenderingPool.
+
+        Parameters:
+        n_jobs (int or None): Number of worker processes. -1 uses all CPUs, None uses one.
+        """
+        if n_jobs is None:
+            n_jobs = 1
+        elif n_jobs < 0:
+            n_jobs = max(os.cpu_count() + 1 + n_jobs, 1)
+        self.n_jobs = n_jobs
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # Workers must share the parent's resource tracker, or the shared memory blocks they attach to
+                # are reported as leaked by a tracker of their own
+                resource_tracker.ensure_running()
+                self._executor = ProcessPoolExecutor(max_workers=self.n_jobs, initializer=_init_worker)
+            return self._executor
+
+    def shutdown(self):
+        """
+        Stop the worker processes.
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def render_numerical(self, df, columns, directory, while_waiting=None, pre_aggregate=True, settings=None):
+        """
+        Render box plots, density plots and histograms for numerical columns in parallel.
+
+        Parameters:
+        df (pd.DataFrame): Input DataFrame.
+        columns (list): Numerical column names.
+        directory (str or None): Directory to save the images to, None when they are kept in memory.
+        while_waiting (callable or None): Work to run in the parent process while the workers render.
+        pre_aggregate (bool): Draw from compact per-column summaries instead of the raw column.
+        settings (ImageSettings or None): Image encoding. In-memory images are sent back to the parent.
+
+        Returns:
+        tuple: List of images (three per column, in column order) and the result of while_waiting.
+        """
+        arrays = [pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+                  for column in columns]
+        return self._render(_render_numerical, arrays, 'float64', columns, [()] * len(columns), while_waiting,
+                            directory=directory, pre_aggregate=pre_aggregate, settings=settings)
+
+    def render_categorical(self, df, columns, directory, while_waiting=None, settings=None, profiles=None):
+        """
+        Render count plots for categorical columns in parallel.
+
+        The columns are counted in the parent process and workers receive only their column's top values,
+        so high-cardinality columns are never copied to the workers.
+
+        Parameters:
+        df (pd.DataFrame): Input DataFrame.
+        columns (list): Categorical column names.
+        directory (str or None): Directory to save the images to, None when they are kept in memory.
+        while_waiting (callable or None): Work to run in the parent process while the workers render.
+        settings (ImageSettings or None): Image encoding. In-memory images are sent back to the parent.
+        profiles (dict or None): Precomputed CategoryProfile per column. If None, the columns are profiled here.
+
+        Returns:
+        tuple: List of images (one per column, in column order) and the result of while_waiting.
+        """
+        from categorical_profiles import profile_columns
+
+        if not columns:
+            return [], while_waiting() if while_waiting is not None else None
+        profiles = profile_columns(df, columns) if profiles is None else profiles
+        executor = self._get_executor()
+        futures = [executor.submit(_render_categorical, profiles[column], column, directory, settings=settings)
+                   for column in columns]
+        waited = while_waiting() if while_waiting is not None else None
+        return [future.result() for future in futures], waited
+
+    def _render(self, function, arrays, dtype, columns, extra, while_waiting, **kwargs):
+        if not columns:
+            return [], while_waiting() if while_waiting is not None else None
+
+        executor = self._get_executor()
+        block = SharedColumnBlock(arrays, dtype)
+        try:
+            futures = [executor.submit(function, block.spec(position), *extra[position], column, **kwargs)
+                       for position, column in enumerate(columns)]
+            waited = while_waiting() if while_waiting is not None else None
+            paths = []
+            for future in futures:
+                result = future.result()
+                paths.extend(result if isinstance(result, list) else [result])
+        finally:
+            block.release()
+        return paths, waited
@@ -1,20 +1,156 @@
+import io
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
 from reportlab.lib.pagesizes import letter
+from reportlab.lib.utils import ImageReader
 from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Frame, PageTemplate, Flowable
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.platypus import PageBreak
 
+from image_buffers import VECTOR_FORMATS, read_image
+from instrumentation import count, traced
+
+# Long tables are laid out as several tables of this many rows, each repeating the header
+DEFAULT_TABLE_CHUNK_ROWS = 40
+# BaseDocTemplate methods driving the layout loop of SimpleDocTemplate.build, used by StreamingDocument
+STREAMING_METHODS = ('_calc', '_startBuild', 'clean_hanging', 'handle_flowable', '_endBuild')
+
+TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+])
+
+
+class SharedImage(Flowable):
+    """
+    Image flowable drawing a shared ImageReader, so repeated images are decoded and embedded once.
+    """
+
+    def __init__(self, reader, width, height):
+        super().__init__()
+        self.reader = reader
+        self.width = width
+        self.height = height
+
+    def wrap(self, available_width, available_height):
+        return self.width, self.height
+
+    def draw(self):
+        self.canv.drawImage(self.reader, 0, 0, self.width, self.height)
+
+
+class StreamingDocument:
+    """
+    PDF document that lays out flowables as soon as they are written.
+
+    SimpleDocTemplate.build needs the whole story up front. This class drives the same layout loop one
+    batch of flowables at a time, so finished pages are handed to the canvas and the flowables (tables,
+    images) can be freed while the rest of the report is still being produced.
+    """
+
+    def __init__(self, output_file, pagesize=letter):
+        """
+        Initialize the StreamingDocument. The file is written by close().
+
+        Parameters:
+        output_file (str): The name of the output PDF file.
+        pagesize (tuple): Page size, e.g. reportlab.lib.pagesizes.letter or A4.
+        """
+        self._template = SimpleDocTemplate(output_file, pagesize=pagesize)
+        self._started = False
+        # The layout loop uses internal methods of BaseDocTemplate (present in reportlab 3.6 to 5.0). Without
+        # them the flowables are kept and laid out at once by close(), as SimpleDocTemplate.build does.
+        self.streaming = all(hasattr(self._template, method) for method in STREAMING_METHODS)
+        self._story = []
+
+    def _start(self):
+        doc = self._template
+        doc._calc()
+        frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height, id='normal')
+        doc.addPageTemplates([PageTemplate(id='First', frames=frame, pagesize=doc.pagesize),
+                              PageTemplate(id='Later', frames=frame, pagesize=doc.pagesize)])
+        doc._startBuild()
+        doc.canv._doctemplate = doc
+        self._started = True
+
+    def write(self, flowables):
+        """
+        Lay out flowables onto the pages of the document.
+
+        Parameters:
+        flowables (list): Flowables to lay out, in order.
+        """
+        if not self.streaming:
+            self._story.extend(flowables)
+            return
+        if not self._started:
+            self._start()
+        doc = self._template
+        flowables = list(flowables)
+        while flowables:
+            doc.clean_hanging()
+            doc.handle_flowable(flowables)
+
+    def close(self):
+        """
+        Finish the last page and save the PDF file.
+        """
+        if not self.streaming:
+            self._template.build(self._story)
+            return
+        if not self._started:
+            self._start()
+        doc = self._template
+        del doc.canv._doctemplate
+        doc._endBuild()
+
 
 class ReportGenerator:
-    def __init__(self, output_file):
+    def __init__(self, output_file, pagesize=letter, stream=True, table_chunk_rows=DEFAULT_TABLE_CHUNK_ROWS):
         """
         Initialize the ReportGenerator instance.
 
         Parameters:
         output_file (str): The name of the output PDF file.
+        pagesize (tuple): Page size, e.g. reportlab.lib.pagesizes.letter or A4.
+        stream (bool): Lay out every element as soon as it is added instead of keeping the whole story in
+                       memory until generate_pdf.
+        table_chunk_rows (int): Maximum number of rows per laid-out table. Longer tables are split into
+                                several tables that each repeat the header row.
         """
         self.output_file = output_file
+        self.pagesize = pagesize
+        self.table_chunk_rows = table_chunk_rows
         self.data = []
+        self._styles = getSampleStyleSheet()
+        self._images = {}
+        self._frame_width = SimpleDocTemplate(output_file, pagesize=pagesize).width
+        self._document = StreamingDocument(output_file, pagesize) if stream else None
+
+    @traced('pdf.layout', 'pdf')
+    def _append(self, flowables):
+        if self._document is None:
+            self.data.extend(flowables)
+        else:
+            self._document.write(flowables)
+
+    def add_title(self, text):
+        """
+        Add a title paragraph to the report.
+
+        Parameters:
+        text (str): The title text.
+        """
+        self._append([Paragraph(text, style=self._styles["Title"])])
 
     def add_description(self, text):
         """
@@ -23,8 +159,8 @@ class ReportGenerator:
         Parameters:
         text (str): The description text to add.
         """
-        self.data.append(Paragraph(text, getSampleStyleSheet()["Normal"]))
-        self.data.append(Table([("",)]))  # Add an empty table as a separator
+        self._append([Paragraph(text, self._styles["Normal"]),
+                      Table([("",)])])  # Add an empty table as a separator
 
     def add_table(self, headers, rows):
         """
@@ -34,19 +170,72 @@ class ReportGenerator:
         headers (list): List of header strings for the table.
         rows (list of lists): List of row data for the table.
         """
-        table_data = [headers] + rows
-        table = Table(table_data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ]))
-        self.data.append(table)
-        self.data.append(Table([("----------",)]))  # Add an empty table as a separator
+        rows = list(rows)
+        chunk_rows = max(self.table_chunk_rows, 1)
+        tables = []
+        for start in range(0, max(len(rows), 1), chunk_rows):
+            table = Table([headers] + rows[start:start + chunk_rows], repeatRows=1)
+            table.setStyle(TABLE_STYLE)
+            tables.append(table)
+        self._append(tables + [Table([("----------",)])])  # Add an empty table as a separator
+
+    def add_image(self, image, width=None, height=None):
+        """
+        Add an image to the report.
+
+        Identical images are embedded in the PDF only once. Without an explicit size, images are scaled
+        down to the page width, keeping their aspect ratio.
+
+        Parameters:
+        image (str or ImageBuffer): Path of the image file, or an in-memory image.
+        width (float or None): Width in points. If None, derived from the height or the page width.
+        height (float or None): Height in points. If None, derived from the width.
+        """
+        image = read_image(image)
+        count('report_images')
+        if image.format in VECTOR_FORMATS:
+            self._append([self._vector_flowable(image, width)])
+            return
+
+        reader = self._images.get(image.digest)
+        if reader is None:
+            reader = self._images[image.digest] = ImageReader(io.BytesIO(image.data))
+        pixel_width, pixel_height = reader.getSize()
+        if width is None and height is None:
+            width = min(pixel_width, self._frame_width)
+        if height is None:
+            height = pixel_height * width / pixel_width
+        elif width is None:
+            width = pixel_width * height / pixel_height
+        self._append([SharedImage(reader, width, height)])
+
+    def _vector_flowable(self, image, width=None):
+        """
+        Convert an SVG image to a vector drawing scaled to the page width. Requires the optional svglib package.
+        """
+        from svglib.svglib import svg2rlg
+
+        drawing = svg2rlg(io.BytesIO(image.data))
+        scale = min(width or self._frame_width, self._frame_width) / drawing.width
+        if scale < 1:
+            drawing.scale(scale, scale)
+            drawing.width, drawing.height = drawing.width * scale, drawing.height * scale
+        return drawing
+
+    def add_operations(self, operations):
+        """
+        Add report elements described as plain tuples, e.g. ones produced in another process.
+
+        Parameters:
+        operations (list of tuple): ('title', text), ('description', text), ('table', headers, rows),
+                                    ('image', path) or ('page_break',).
+        """
+        handlers = {'title': self.add_title, 'description': self.add_description, 'table': self.add_table,
+                    'image': self.add_image, 'page_break': self.add_page_break}
+        for kind, *arguments in operations:
+            handlers[kind](*arguments)
 
+    @traced('pdf.build', 'pdf')
     def generate_pdf(self):
         """
         Generate the PDF report using the collected data.
@@ -54,8 +243,11 @@ class ReportGenerator:
         Returns:
         None
         """
-        doc = SimpleDocTemplate(self.output_file, pagesize=letter)
-        doc.build(self.data)
+        if self._document is None:
+            doc = SimpleDocTemplate(self.output_file, pagesize=self.pagesize)
+            doc.build(self.data)
+        else:
+            self._document.close()
 
     def add_page_break(self):
         """
@@ -64,4 +256,82 @@ class ReportGenerator:
         Returns:
         None
         """
-        self.data.append(PageBreak())
\ No newline at end of file
+        self._append([PageBreak()])
+
+
+def render_section(output_file, operations, pagesize=letter):
+    """
+    Render one report section to its own PDF file.
+
+    Parameters:
+    output_file (str): The name of the section PDF file.
+    operations (list of tuple): Section elements, see ReportGenerator.add_operations.
+    pagesize (tuple): Page size.
+
+    Returns:
+    str: The section PDF file name.
+    """
+    report = ReportGenerator(output_file, pagesize)
+    report.add_operations(operations)
+    report.generate_pdf()
+    return output_file
+
+
+def merge_pdfs(input_files, output_file):
+    """
+    Concatenate PDF files into one document. Requires the optional pypdf package.
+
+    Parameters:
+    input_files (list of str): PDF files, in order.
+    output_file (str): The name of the merged PDF file.
+    """
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for input_file in input_files:
+        writer.append(input_file)
+    with open(output_file, "wb") as merged_file:
+        writer.write(merged_file)
+    writer.close()
+
+
+def build_report_parallel(output_file, sections, n_jobs=-1, pagesize=letter):
+    """
+    Render report sections in parallel processes and assemble them into one PDF.
+
+    Every section starts on a new page. If pypdf is not installed, the sections are rendered one
+    after another into a single streaming document instead.
+
+    Parameters:
+    output_file (str): The name of the output PDF file.
+    sections (list of list of tuple): Elements of every section, see ReportGenerator.add_operations.
+    n_jobs (int): Number of worker processes. -1 uses all CPUs.
+    pagesize (tuple): Page size.
+
+    Returns:
+    str: The output PDF file name.
+    """
+    try:
+        import pypdf  # noqa: F401
+    except ImportError:
+        pypdf = None
+    n_jobs = max(os.cpu_count() + 1 + n_jobs, 1) if n_jobs < 0 else n_jobs
+
+    if pypdf is None or n_jobs == 1 or len(sections) < 2:
+        report = ReportGenerator(output_file, pagesize)
+        for position, operations in enumerate(sections):
+            if position:
+                report.add_page_break()
+            report.add_operations(operations)
+        report.generate_pdf()
+        return output_file
+
+    directory = tempfile.mkdtemp(prefix="report_sections_")
+    try:
+        section_files = [os.path.join(directory, f"section_{position}.pdf") for position in range(len(sections))]
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(sections))) as executor:
+            list(executor.map(render_section, section_files, sections, repeat(pagesize)))
+        merge_pdfs(section_files, output_file)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return output_file
@@ -1,45 +1,121 @@
 import os
 import shutil
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Image
-from reportlab.lib.styles import getSampleStyleSheet
-from data_analyzer import DataAnalyzer
-from data_visualization import DataVisualization
-from report_generator import ReportGenerator
+from data_downloader import read_file_in_chunks, sample_chunks
+from helper import DataPreprocessor
+from statistics_engine import DataFrameStatistics
+from artifact_cache import fingerprint
+from columnar_io import write_dataframe
+from incremental import DEFAULT_STATE_DIRECTORY, update_statistics
+from outliers import outliers_from_statistics
+from categorical_profiles import DEFAULT_CATEGORY_CAPACITY
+from instrumentation import traced
+
+# Above this many columns, the visualization report draws several columns per figure
+FACET_COLUMN_THRESHOLD = 20
+
+# reportlab, matplotlib, seaborn and scikit-learn are imported inside the report functions that use them,
+# so importing this module (and starting the CLI) stays fast
 
 
 # Generate a PDF with exploratory data analysis visualizations
-def run_example_pdf_visu(df=None, name=None):
-    data_visualization = DataVisualization(df)
+@traced('report.visualizations')
+def run_example_pdf_visu(df=None, name=None, n_jobs=-1, cache=None, pool=None, session=None, image_settings=None,
+                         facets=None, parallel_pdf=False):
+    from reportlab.lib.pagesizes import A4
+    from analysis_session import AnalysisSession
+    from rendering_pool import RenderingPool
+    from report_generator import ReportGenerator, build_report_parallel
+
+    own_session = session is None
+    session = AnalysisSession(df, name, image_settings=image_settings) if own_session else session
+    data_visualization = session.visualization
+    if facets is None:
+        facets = len(df.columns) > FACET_COLUMN_THRESHOLD
+    # Faceted pages are drawn by reusing one figure per plot kind in this process, so no pool is needed
+    own_pool = pool is None and n_jobs != 1 and not facets
+    pool = RenderingPool(n_jobs) if own_pool else pool
 
     # Define the PDF filename
     pdf_filename = f"Report/eda_report_graphs_{name}.pdf" if name is not None else "eda_report_graphs.pdf"
-    doc = SimpleDocTemplate(pdf_filename, pagesize=A4)
-    elements = []
+    if parallel_pdf:
+        # The categorical and numerical plots are laid out as separate sections in parallel processes
+        report = None
+        sections = [[('title', "Exploratory Data Analysis Results")]]
+    else:
+        # Pages are laid out as the images are added, so the whole story is never held in memory
+        report = ReportGenerator(pdf_filename, pagesize=A4)
+        # Add a title to the PDF
+        report.add_title("Exploratory Data Analysis Results")
 
-    # Add a title to the PDF
-    title_style = getSampleStyleSheet()["Title"]
-    title = Paragraph("Exploratory Data Analysis Results", style=title_style)
-    elements.append(title)
+    def add_images(imgs):
+        for i in imgs:
+            if report is None:
+                sections[-1].append(('image', i))
+            else:
+                report.add_image(i)
 
-    # Generate and add categorical column plots to the PDF
-    imgs = data_visualization.plot_categorical_columns(df, save=True)
-    for i in imgs:
-        elements.append(Image(i))
+    if facets:
+        # Several columns per image, one figure reused per plot kind
+        add_images(data_visualization.plot_facet_pages(df, save=True, cache=cache,
+                                                       profiles=session.category_profiles))
+    else:
+        # Generate and add categorical column plots to the PDF
+        try:
+            add_images(data_visualization.plot_categorical_columns(df, save=True, pool=pool, cache=cache,
+                                                                   profiles=session.category_profiles))
 
-    # Generate and add numerical column plots to the PDF
-    imgs = data_visualization.plot_numerical_columns(df, True)
-    for i in imgs:
-        elements.append(Image(i))
+            # Generate and add numerical column plots to the PDF
+            if report is None:
+                sections.append([])
+            add_images(data_visualization.plot_numerical_columns(df, True, pool=pool, cache=cache))
+        finally:
+            if own_pool:
+                pool.shutdown()
 
     # Build the PDF
-    doc.build(elements)
+    if report is None:
+        build_report_parallel(pdf_filename, [section for section in sections if section], n_jobs, pagesize=A4)
+    else:
+        report.generate_pdf()
+    if own_session:
+        session.close()
     print("PDF generated successfully.")
 
 
+# Add per-column statistics, categorical cardinality and top value count tables to a report
+def add_statistics_tables(report, statistics, profiles=None):
+    # Statistics for Numerical Columns
+    describe = statistics.describe(percentiles=[0.25, 0.5, 0.75])
+    for num_col in statistics.numerical_columns:
+        report.add_description(f"Statistics for {num_col}:")
+        stats_table_data = [["Statistic", "Value"]]
+        for stat, value in describe[num_col].items():
+            stats_table_data.append([stat, f"{value:.2f}"])
+        report.add_table(stats_table_data[0], stats_table_data[1:])
+
+    # Cardinality of Categorical Columns, with distinct counts estimated when streamed
+    profiles = statistics.category_profiles(10) if profiles is None else profiles
+    if profiles:
+        report.add_description("Categorical Cardinality:")
+        report.add_table(["Column Name", "Distinct Values", "High Cardinality"],
+                         [(column, f"{'' if profile.exact else '~'}{profile.distinct}",
+                           "Yes" if profile.high_cardinality else "No") for column, profile in profiles.items()])
+
+    # Top 10 Value Counts for Categorical Columns
+    for cat_col, profile in profiles.items():
+        estimated = "" if profile.exact else " (estimated)"
+        report.add_description(f"Top 10 Value Counts for {cat_col}{estimated}:")
+        value_counts_table_data = [[category, count] for category, count in profile.top.head(10).items()]
+        report.add_table(["Category", "Count"], value_counts_table_data)
+
+
 # Generate a summary PDF report
-def run_example_pdf_summary(df=None, name=None):
-    analyzer = DataAnalyzer(df)
+@traced('report.summary')
+def run_example_pdf_summary(df=None, name=None, cache=None, scaled_format='parquet', session=None):
+    from data_analyzer import DataAnalyzer
+    from report_generator import ReportGenerator
+
+    analyzer = DataAnalyzer(df) if session is None else session.analyzer
 
     pdf_filename = f"Report/eda_report_summary_{name}.pdf" if name is not None else "eda_report_summary.pdf"
 
@@ -58,14 +134,35 @@ def run_example_pdf_summary(df=None, name=None):
         ("Datetime Columns", datetime_columns)
     ])
 
+    # Every statistic below is drawn from a single pass over the DataFrame, or from the cache if unchanged
+    cache_key = None
+    cached = None
+    if cache is not None:
+        cache_key = cache.make_key('summary_statistics', fingerprint(df),
+                                   numerical_columns=analyzer.numerical_columns,
+                                   categorical_columns=analyzer.categorical_columns, top_correlations=10,
+                                   category_profiles=True)
+        cached = cache.get_object(cache_key)
+    if cached is None:
+        # A session profiles its categorical columns once for both the count plots and these tables
+        profiles = None if session is None else session.category_profiles
+        statistics = analyzer.compute_statistics(df, value_counts=profiles is None)
+        profiles = statistics.category_profiles(10) if profiles is None else profiles
+        duplicate_percentage, null_percentage = analyzer.duplicates_nulls_percentage(df, statistics)
+        outliers_info = analyzer.remove_outliers(df)
+        correlations = analyzer.strongest_correlations(df, 10)
+        if cache is not None:
+            cache.put_object(cache_key, (statistics, duplicate_percentage, null_percentage, outliers_info,
+                                         correlations, profiles))
+    else:
+        statistics, duplicate_percentage, null_percentage, outliers_info, correlations, profiles = cached
+
     # Duplicate Percentage
     report.add_description("Duplicate Percentage:")
-    duplicate_percentage, _ = analyzer.duplicates_nulls_percentage(df)
     report.add_table(["Metric", "Percentage"], [("Duplicate Percentage", f"{duplicate_percentage}%")])
 
     # Null Percentage
     report.add_description("Null Percentage:")
-    _, null_percentage = analyzer.duplicates_nulls_percentage(df)
     null_table_data = [["Column Name", "Percentage"]]
     for column_name, percentage in null_percentage.items():
         null_table_data.append([column_name, f"{percentage:.2f}%"])
@@ -73,37 +170,141 @@ def run_example_pdf_summary(df=None, name=None):
 
     # Outliers
     report.add_description("Outliers:")
-    outliers_info = analyzer.remove_outliers(df)
     report.add_table(["Column Name", "Percentage of Outliers", "Number of Outliers"],
                      [(info['Name'], f"{info['Percentage'] * 100:.2f}%", info['Number_Of_Outliers']) for info in
                       outliers_info])
 
-    # Statistics for Numerical Columns
-    for num_col in analyzer.numerical_columns:
-        report.add_description(f"Statistics for {num_col}:")
-        column_stats = df[num_col].describe(percentiles=[0.25, 0.5, 0.75])
-        stats_table_data = [["Statistic", "Value"]]
-        for stat, value in column_stats.items():
-            stats_table_data.append([stat, f"{value:.2f}"])
-        report.add_table(stats_table_data[0], stats_table_data[1:])
+    # Strongest Correlations
+    if correlations is not None and len(correlations):
+        report.add_description("Strongest Correlations:")
+        report.add_table(list(correlations.columns), [(first, second, f"{value:.3f}")
+                                                      for first, second, value in correlations.itertuples(index=False)])
 
-    # Top 10 Value Counts for Categorical Columns
-    for cat_col in analyzer.categorical_columns:
-        report.add_description(f"Top 10 Value Counts for {cat_col}:")
-        value_counts = df[cat_col].value_counts().reset_index()
-        value_counts.columns = ["Category", "Count"]
-        top_10_value_counts = value_counts.head(10)
-        value_counts_table_data = top_10_value_counts.values.tolist()
-        report.add_table(["Category", "Count"], value_counts_table_data)
+    add_statistics_tables(report, statistics, profiles)
 
     # Generate the PDF
     report.generate_pdf()
-    analyzer.encode_scale_features(df)
-    df.to_csv(f"{name}_scaled.csv", index=False)
+    transformer = analyzer.encode_scale_features(df)
+    write_dataframe(df, f"{name}_scaled.{scaled_format}", scaled_format)
+    # The fitted scaling and category codes, to transform scoring data consistently
+    if transformer is not None:
+        transformer.save(f"{name}_transformer.pkl")
+
+    print("PDF summary report generated successfully.")
+
+
+# Generate a PDF with visualizations from a bounded random sample of a large file
+def run_chunked_pdf_visu(file_path, name=None, sample_rows=100_000, chunk_size=None, max_chunk_bytes=None,
+                         random_state=0, n_jobs=-1):
+    chunks = read_file_in_chunks(file_path, chunk_size=chunk_size, max_chunk_bytes=max_chunk_bytes)
+    df = sample_chunks(chunks, sample_rows, random_state=random_state)
+    if df is None:
+        print("No rows found in the file. Nothing to plot.")
+        return
+    run_example_pdf_visu(df, name, n_jobs=n_jobs)
+
+
+# Generate a summary PDF report by streaming a large file chunk by chunk
+@traced('report.streamed_summary')
+def run_chunked_pdf_summary(file_path, name=None, chunk_size=None, max_chunk_bytes=None):
+    pdf_filename = f"Report/eda_report_summary_{name}.pdf" if name is not None else "eda_report_summary.pdf"
+
+    preprocessor = None
+    statistics = None
 
+    for chunk in read_file_in_chunks(file_path, chunk_size=chunk_size, max_chunk_bytes=max_chunk_bytes):
+        if preprocessor is None:
+            preprocessor = DataPreprocessor(chunk)
+            statistics = DataFrameStatistics(preprocessor.numerical_columns, preprocessor.categorical_columns,
+                                             distinct_rows=True, category_capacity=DEFAULT_CATEGORY_CAPACITY)
+        else:
+            # Later chunks get the column types detected on the first one
+            preprocessor.convert(chunk)
+        statistics.update(chunk)
+
+    if preprocessor is None:
+        print("No rows found in the file. Nothing to summarize.")
+        return
+
+    write_streamed_summary(pdf_filename, preprocessor, statistics, outliers_from_statistics(statistics).to_records())
+
+
+# Generate a summary PDF report of a SQLite table with the statistics computed inside the database
+@traced('report.sql_summary')
+def run_sql_pdf_summary(database, table=None, name=None, filters=None, percentiles=None, duplicates=True):
+    from sql_source import TYPE_SAMPLE_ROWS, SqlSource
+
+    pdf_filename = f"Report/eda_report_summary_{name}.pdf" if name is not None else "eda_report_summary.pdf"
+
+    source = SqlSource(database)
+    table = source.default_table(table)
+    # Column types are inferred from the first rows only, the statistics are aggregated over the whole table
+    column_types = DataPreprocessor(source.read(table, limit=TYPE_SAMPLE_ROWS))
+    statistics = source.aggregate_statistics(table, column_types.numerical_columns, column_types.categorical_columns,
+                                             filters=filters, percentiles=percentiles, duplicates=duplicates)
+    if not statistics.rows:
+        print("No rows found in the table. Nothing to summarize.")
+        return
+    outliers_info = source.outliers(table, statistics, filters=filters).to_records()
+
+    write_streamed_summary(pdf_filename, column_types, statistics, outliers_info)
+
+
+# Write a summary PDF report from mergeable statistics, without the raw data
+def write_streamed_summary(pdf_filename, column_types, statistics, outliers_info=None):
+    from report_generator import ReportGenerator
+
+    report = ReportGenerator(pdf_filename)
+
+    # Column Types
+    report.add_description("Column Types:")
+    report.add_table(["Type", "Column Names"], [
+        ("Numerical Columns", ", ".join(column_types.numerical_columns)),
+        ("Categorical Columns", ", ".join(column_types.categorical_columns)),
+        ("Datetime Columns", ", ".join(column_types.datetime_columns))
+    ])
+
+    # Duplicate Percentage, estimated from a HyperLogLog sketch of the row hashes
+    report.add_description("Approximate Duplicate Percentage:")
+    report.add_table(["Metric", "Percentage"],
+                     [("Duplicate Percentage", f"{statistics.approximate_duplicate_percentage()}%")])
+
+    # Null Percentage
+    report.add_description("Null Percentage:")
+    report.add_table(["Column Name", "Percentage"],
+                     [[column_name, f"{percentage:.2f}%"] for column_name, percentage in
+                      statistics.null_percentage().items()])
+
+    # Outliers
+    if outliers_info is not None:
+        report.add_description("Outliers:")
+        report.add_table(["Column Name", "Percentage of Outliers", "Number of Outliers"],
+                         [(info['Name'], f"{info['Percentage'] * 100:.2f}%", info['Number_Of_Outliers'])
+                          for info in outliers_info])
+
+    add_statistics_tables(report, statistics)
+
+    report.generate_pdf()
     print("PDF summary report generated successfully.")
 
 
+# Generate a summary PDF report, processing only the rows appended to the file since the previous run
+@traced('report.incremental_summary')
+def run_incremental_pdf_summary(file_path, name=None, state_directory=DEFAULT_STATE_DIRECTORY, chunk_size=None,
+                                max_chunk_bytes=None, full=False):
+    pdf_filename = f"Report/eda_report_summary_{name}.pdf" if name is not None else "eda_report_summary.pdf"
+
+    state, mode = update_statistics(file_path, state_directory, chunk_size=chunk_size,
+                                    max_chunk_bytes=max_chunk_bytes, full=full)
+    if state is None:
+        print("No rows found in the file. Nothing to summarize.")
+        return
+    print(f"Statistics {'reused' if mode == 'unchanged' else 'updated'} ({mode}): {state.statistics.rows} rows.")
+
+    outliers_info = outliers_from_statistics(state.statistics).to_records()
+    write_streamed_summary(pdf_filename, state, state.statistics, outliers_info)
+
+
 # Remove directories starting with a specific prefix
 def remove_directories(starting_with="directory"):
     current_directory = os.getcwd()
@@ -0,0 +1,551 @@
+import contextlib
+import os
+import queue
+import sqlite3
+import threading
+from urllib.request import pathname2url
+
+import numpy as np
+import pandas as pd
+
+from categorical_profiles import DEFAULT_TOP_K, CategoryProfile
+from outliers import DEFAULT_THRESHOLDS, OutlierReport
+
+DEFAULT_POOL_SIZE = 4
+# Rows fetched from the database per round trip
+DEFAULT_ARRAYSIZE = 10_000
+# Rows read to infer the column types of a table
+TYPE_SAMPLE_ROWS = 1_000
+# Resolution of the Bernoulli row sampling done in SQL
+SAMPLE_RESOLUTION = 1_000_000
+
+_SQL_OPERATORS = {'==': '=', '=': '=', '!=': '!=', '<': '<', '<=': '<=', '>': '>', '>=': '>='}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def quote_identifier(name):
+    """
+    Quote a table or column name for SQL.
+
+    Parameters:
+    name (str): Identifier.
+
+    Returns:
+    str: Double-quoted identifier with embedded quotes escaped.
+    """
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def filters_to_sql(filters):
+    """
+    Convert (column, operator, value) filters to a SQL condition with parameters.
+
+    Parameters:
+    filters (list of tuple or None): Filters that must all hold, with the operators of
+                                     columnar_io.filters_to_expression: ==, !=, <, <=, >, >=, 'in' and 'not in'.
+
+    Returns:
+    tuple: SQL condition (or None without filters) and the list of parameters.
+    """
+    conditions = []
+    params = []
+    for column, op, value in filters or []:
+        field = quote_identifier(column)
+        if op in ('in', 'not in'):
+            values = list(value)
+            placeholders = ", ".join("?" * len(values)) or "NULL"
+            conditions.append(f"{field} {op.upper()} ({placeholders})")
+            params.extend(values)
+        elif op in _SQL_OPERATORS:
+            conditions.append(f"{field} {_SQL_OPERATORS[op]} ?")
+            params.append(value)
+        else:
+            raise ValueError(f"Unsupported filter operator '{op}'.")
+    return (" AND ".join(conditions) if conditions else None), params
+
+
+class ConnectionPool:
+    """
+    Bounded pool of SQLite connections to one database, shared by the threads reading from it.
+
+    Connections are opened on demand up to max_size and reused afterwards; a thread asking for a connection
+    while all of them are in use waits for one to be returned.
+    """
+
+    def __init__(self, database, max_size=DEFAULT_POOL_SIZE, read_only=True):
+        """
+        Initialize an empty pool.
+
+        Parameters:
+        database (str): Path of the SQLite database file.
+        max_size (int): Maximum number of open connections.
+        read_only (bool): Open the database read-only, so analysis can never modify it.
+        """
+        self.database = database
+        self.max_size = max_size
+        self.read_only = read_only
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self.read_only:
+            uri = f"file:{pathname2url(os.path.abspath(self.database))}?mode=ro"
+            return sqlite3.connect(uri, uri=True, check_same_thread=False)
+        return sqlite3.connect(self.database, check_same_thread=False)
+
+    @contextlib.contextmanager
+    def connection(self):
+        """
+        Borrow a connection for the duration of a with block.
+
+        Yields:
+        sqlite3.Connection: A connection used by no other thread until it is returned.
+        """
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._opened < self.max_size
+                if create:
+                    self._opened += 1
+            if create:
+                try:
+                    connection = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            else:
+                connection = self._idle.get()
+        try:
+            yield connection
+        finally:
+            self._idle.put(connection)
+
+    def close(self):
+        """
+        Close the idle connections.
+        """
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            connection.close()
+            with self._lock:
+                self._opened -= 1
+
+
+def get_pool(database, max_size=DEFAULT_POOL_SIZE):
+    """
+    Shared connection pool of a database, created on first use, so repeated reads reuse connections.
+
+    Parameters:
+    database (str): Path of the SQLite database file.
+    max_size (int): Maximum number of open connections of a new pool.
+
+    Returns:
+    ConnectionPool: The pool of the database.
+    """
+    key = os.path.abspath(database)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(database, max_size)
+        return pool
+
+
+def close_pools():
+    """
+    Close every shared connection pool.
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+class SqlStatistics:
+    """
+    Column statistics aggregated inside the database, in the interface of DataFrameStatistics used by the
+    summary report (null_percentage, describe, category_profiles and the duplicate percentage).
+    """
+
+    def __init__(self, rows, numerical_columns, categorical_columns, null_counts, numerical, profiles,
+                 quantiles=None, distinct_rows=None):
+        self.rows = rows
+        self.numerical_columns = list(numerical_columns)
+        self.categorical_columns = list(categorical_columns)
+        self.null_counts = null_counts
+        self.numerical = numerical
+        self.profiles = profiles
+        self.quantiles = quantiles or {}
+        self.distinct_rows = distinct_rows
+
+    def null_percentage(self):
+        """
+        Percentage of null values per column, rounded to 2 decimals.
+
+        Returns:
+        pd.Series: Null percentage indexed by column name.
+        """
+        if not self.rows:
+            return self.null_counts * 0.0
+        return (self.null_counts / self.rows * 100).round(2)
+
+    def approximate_duplicate_percentage(self):
+        """
+        Percentage of rows repeating another row, counted exactly by the database.
+
+        Returns:
+        float or None: Duplicate percentage rounded to 2 decimals, or None if duplicates were not counted.
+        """
+        if self.distinct_rows is None:
+            return None
+        if not self.rows:
+            return 0.0
+        return round((self.rows - self.distinct_rows) / self.rows * 100, 2)
+
+    def describe(self, percentiles=None):
+        """
+        Summary statistics of the numerical columns in the layout of pandas.DataFrame.describe.
+
+        Parameters:
+        percentiles (sequence of float or None): Percentiles to include; only those computed by the database
+                                                 are available.
+
+        Returns:
+        pd.DataFrame: Statistics indexed by name with one column per numerical column.
+        """
+        rows = {name: self.numerical[name] for name in ('count', 'mean', 'std', 'min')}
+        for percentile in percentiles or []:
+            if percentile in self.quantiles:
+                rows[f"{percentile * 100:g}%"] = self.quantiles[percentile]
+        rows['max'] = self.numerical['max']
+        return pd.DataFrame(rows, index=self.numerical_columns).T
+
+    def category_profiles(self, k=DEFAULT_TOP_K):
+        """
+        Top values and cardinality of every categorical column.
+
+        Parameters:
+        k (int): Number of most frequent values per column.
+
+        Returns:
+        dict: CategoryProfile per categorical column name.
+        """
+        return {column: CategoryProfile(profile.column, profile.count, profile.distinct, profile.top.head(k))
+                for column, profile in self.profiles.items()}
+
+
+class SqlSource:
+    """
+    Tables of a SQLite database read with column selection, filters and sampling pushed down into SQL.
+    """
+
+    def __init__(self, database, pool=None, arraysize=DEFAULT_ARRAYSIZE):
+        """
+        Initialize the source.
+
+        Parameters:
+        database (str): Path of the SQLite database file.
+        pool (ConnectionPool or None): Connections to use. If None, the shared pool of the database is used.
+        arraysize (int): Rows fetched per round trip.
+        """
+        self.database = database
+        self.pool = get_pool(database) if pool is None else pool
+        self.arraysize = arraysize
+
+    def _fetch(self, sql, params=()):
+        with self.pool.connection() as connection:
+            return connection.execute(sql, params).fetchall()
+
+    def tables(self):
+        """
+        List the tables and views of the database.
+
+        Returns:
+        list of str: Table names, in alphabetical order.
+        """
+        return [name for name, in self._fetch("SELECT name FROM sqlite_master WHERE type IN ('table', 'view') "
+                                              "AND name NOT LIKE 'sqlite_%' ORDER BY name")]
+
+    def default_table(self, table=None):
+        """
+        Resolve the table to read: the given one, or the first table of the database.
+
+        Parameters:
+        table (str or None): Table name.
+
+        Returns:
+        str: Table name.
+        """
+        if table is not None:
+            return table
+        tables = self.tables()
+        if not tables:
+            raise ValueError(f"The database '{self.database}' has no tables.")
+        return tables[0]
+
+    def columns(self, table):
+        """
+        List the columns of a table.
+
+        Parameters:
+        table (str): Table name.
+
+        Returns:
+        list of str: Column names, in table order.
+        """
+        return [row[1] for row in self._fetch(f"PRAGMA table_info({quote_identifier(table)})")]
+
+    def row_count(self, table, filters=None):
+        """
+        Count the rows of a table matching the filters.
+
+        Parameters:
+        table (str): Table name.
+        filters (list of tuple or None): Row filters, see filters_to_sql.
+
+        Returns:
+        int: Number of rows.
+        """
+        condition, params = filters_to_sql(filters)
+        where = f" WHERE {condition}" if condition else ""
+        return self._fetch(f"SELECT COUNT(*) FROM {quote_identifier(table)}{where}", params)[0][0]
+
+    def select(self, table, columns=None, filters=None, sample_rows=None, limit=None):
+        """
+        Build the query reading a table.
+
+        Sampling keeps every row with probability sample_rows / rows using SQLite's random(), in one scan
+        without sorting, so about sample_rows rows are returned.
+
+        Parameters:
+        table (str): Table name.
+        columns (list or None): Columns to read. If None, all columns are read.
+        filters (list of tuple or None): Row filters, see filters_to_sql.
+        sample_rows (int or None): Approximate number of rows to sample. If None, all matching rows are read.
+        limit (int or None): Maximum number of rows.
+
+        Returns:
+        tuple: SQL query and its parameters.
+        """
+        fields = "*" if columns is None else ", ".join(quote_identifier(column) for column in columns)
+        condition, params = filters_to_sql(filters)
+        conditions = [] if condition is None else [condition]
+        if sample_rows is not None:
+            rows = self.row_count(table, filters)
+            if rows > sample_rows:
+                conditions.append("(abs(random()) % ?) < ?")
+                params += [SAMPLE_RESOLUTION, int(round(sample_rows / rows * SAMPLE_RESOLUTION))]
+        sql = f"SELECT {fields} FROM {quote_identifier(table)}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return sql, params
+
+    def read(self, table=None, columns=None, filters=None, sample_rows=None, limit=None):
+        """
+        Read a table into a DataFrame with the selection pushed down into SQL.
+
+        Parameters:
+        table (str or None): Table name. If None, the first table is read.
+        columns (list or None): Columns to read. If None, all columns are read.
+        filters (list of tuple or None): Row filters, see filters_to_sql.
+        sample_rows (int or None): Approximate number of rows to sample.
+        limit (int or None): Maximum number of rows.
+
+        Returns:
+        pd.DataFrame: The selected rows.
+        """
+        sql, params = self.select(self.default_table(table), columns, filters, sample_rows, limit)
+        chunks = list(self.query_chunks(sql, params, chunk_size=self.arraysize))
+        if not chunks:
+            with self.pool.connection() as connection:
+                names = [description[0] for description in connection.execute(sql, params).description]
+            return pd.DataFrame(columns=names)
+        return pd.concat(chunks, ignore_index=True)
+
+    def query_chunks(self, sql, params=(), chunk_size=None, max_chunk_bytes=None):
+        """
+        Run a query and stream its result as bounded-size DataFrame chunks.
+
+        Parameters:
+        sql (str): Query.
+        params (sequence): Query parameters.
+        chunk_size (int or None): Maximum number of rows per chunk.
+        max_chunk_bytes (int or None): Approximate in-memory size budget per chunk in bytes.
+
+        Yields:
+        pandas.DataFrame: The next rows of the result.
+        """
+        from data_downloader import _iter_sized_chunks
+
+        with self.pool.connection() as connection:
+            cursor = connection.cursor()
+            cursor.arraysize = self.arraysize
+            try:
+                cursor.execute(sql, params)
+                names = [description[0] for description in cursor.description]
+
+                def get_chunk(n):
+                    records = cursor.fetchmany(n)
+                    if not records:
+                        return None
+                    return pd.DataFrame.from_records(records, columns=names)
+
+                yield from _iter_sized_chunks(get_chunk, chunk_size, max_chunk_bytes)
+            finally:
+                cursor.close()
+
+    def read_chunks(self, table=None, columns=None, filters=None, chunk_size=None, max_chunk_bytes=None):
+        """
+        Stream a table as bounded-size DataFrame chunks with the selection pushed down into SQL.
+
+        Parameters:
+        table (str or None): Table name. If None, the first table is read.
+        columns (list or None): Columns to read. If None, all columns are read.
+        filters (list of tuple or None): Row filters, see filters_to_sql.
+        chunk_size (int or None): Maximum number of rows per chunk.
+        max_chunk_bytes (int or None): Approximate in-memory size budget per chunk in bytes.
+
+        Yields:
+        pandas.DataFrame: The next chunk of the table.
+        """
+        sql, params = self.select(self.default_table(table), columns, filters)
+        yield from self.query_chunks(sql, params, chunk_size, max_chunk_bytes)
+
+    def aggregate_statistics(self, table, numerical_columns, categorical_columns, filters=None, top_k=DEFAULT_TOP_K,
+                             percentiles=None, duplicates=True):
+        """
+        Compute column statistics inside the database, without reading the rows into pandas.
+
+        Counts, null counts, distinct counts, minimum, maximum and mean come from one aggregate scan, the
+        standard deviation from a second scan around the means, and the top values of every categorical
+        column from a GROUP BY. Percentiles and duplicate rows need sorting, which is costly on large tables
+        without indexes.
+
+        Parameters:
+        table (str): Table name.
+        numerical_columns (list): Numerical columns.
+        categorical_columns (list): Categorical columns.
+        filters (list of tuple or None): Row filters, see filters_to_sql.
+        top_k (int): Number of most frequent values per categorical column.
+        percentiles (sequence of float or None): Exact percentiles to compute per numerical column.
+        duplicates (bool): Count duplicate rows.
+
+        Returns:
+        SqlStatistics: Statistics of the table.
+        """
+        source = quote_identifier(table)
+        condition, params = filters_to_sql(filters)
+        where = f" WHERE {condition}" if condition else ""
+        columns = self.columns(table)
+        numerical = [quote_identifier(column) for column in numerical_columns]
+
+        aggregates = ["COUNT(*)"] + [f"COUNT({quote_identifier(column)})" for column in columns]
+        aggregates += [f"{function}({field})" for field in numerical for function in ('MIN', 'MAX', 'AVG')]
+        aggregates += [f"COUNT(DISTINCT {quote_identifier(column)})" for column in categorical_columns]
+        values = self._fetch(f"SELECT {', '.join(aggregates)} FROM {source}{where}", params)[0]
+        rows, values = values[0], values[1:]
+        counts, values = np.array(values[:len(columns)], dtype=float), values[len(columns):]
+        extremes = np.array(values[:3 * len(numerical)], dtype=float).reshape(len(numerical), 3)
+        distinct = values[3 * len(numerical):]
+
+        null_counts = pd.Series(rows - counts, index=columns).astype('int64')
+        non_null = np.array([counts[columns.index(column)] for column in numerical_columns], dtype=float)
+        means = extremes[:, 2]
+        std = np.full(len(numerical), np.nan)
+        if numerical:
+            squares = [f"SUM(({field} - ?) * ({field} - ?))" for field in numerical]
+            square_params = [float(mean) if not np.isnan(mean) else 0.0 for mean in means for _ in range(2)]
+            sums = np.array(self._fetch(f"SELECT {', '.join(squares)} FROM {source}{where}",
+                                        square_params + params)[0], dtype=float)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                std = np.where(non_null > 1, np.sqrt(sums / (non_null - 1)), np.nan)
+        statistics = {'count': non_null, 'mean': means, 'std': std, 'min': extremes[:, 0], 'max': extremes[:, 1]}
+
+        quantiles = {percentile: [] for percentile in percentiles or []}
+        if percentiles:
+            for field, count in zip(numerical, non_null):
+                for percentile, value in zip(percentiles, self._quantiles(source, field, where, params, count,
+                                                                          percentiles)):
+                    quantiles[percentile].append(value)
+
+        profiles = {}
+        for column, distinct_count in zip(categorical_columns, distinct):
+            field = quote_identifier(column)
+            not_null = f"{field} IS NOT NULL" if condition is None else f"({condition}) AND {field} IS NOT NULL"
+            top = self._fetch(f"SELECT {field}, COUNT(*) FROM {source} WHERE {not_null} GROUP BY {field} "
+                              f"ORDER BY COUNT(*) DESC LIMIT ?", params + [top_k])
+            top_counts = pd.Series([count for _, count in top], index=pd.Index([value for value, _ in top],
+                                                                               name=column), dtype='int64')
+            profiles[column] = CategoryProfile(column, counts[columns.index(column)], distinct_count, top_counts)
+
+        distinct_rows = None
+        if duplicates:
+            distinct_rows = self._fetch(f"SELECT COUNT(*) FROM (SELECT DISTINCT * FROM {source}{where})", params)[0][0]
+        return SqlStatistics(rows, numerical_columns, categorical_columns, null_counts, statistics, profiles,
+                             quantiles, distinct_rows)
+
+    def _quantiles(self, source, field, where, params, count, percentiles):
+        """
+        Exact percentiles of a column with linear interpolation, as in pandas, from a single sort of the column.
+        """
+        if not count:
+            return [np.nan] * len(percentiles)
+        positions = [(count - 1) * percentile for percentile in percentiles]
+        ranks = sorted({int(np.floor(position)) + offset for position in positions for offset in (1, 2)})
+        not_null = f"{where} AND {field} IS NOT NULL" if where else f" WHERE {field} IS NOT NULL"
+        values = dict(self._fetch(f"SELECT rank, value FROM (SELECT ROW_NUMBER() OVER (ORDER BY {field}) AS rank, "
+                                  f"{field} AS value FROM {source}{not_null}) "
+                                  f"WHERE rank IN ({', '.join('?' * len(ranks))})", params + ranks))
+        result = []
+        for position in positions:
+            lower = int(np.floor(position))
+            low = values[lower + 1]
+            high = values.get(lower + 2, low)
+            result.append(float(low + (high - low) * (position - lower)))
+        return result
+
+    def outliers(self, table, statistics, threshold=None, filters=None):
+        """
+        Count z-score outliers of every numerical column inside the database.
+
+        Parameters:
+        table (str): Table name.
+        statistics (SqlStatistics): Statistics of the table, for the means and standard deviations.
+        threshold (float or None): Number of standard deviations. If None, the 'zscore' default is used.
+        filters (list of tuple or None): Row filters, see filters_to_sql.
+
+        Returns:
+        OutlierReport: Bounds, counts and percentages for every numerical column, without a mask.
+        """
+        threshold = DEFAULT_THRESHOLDS['zscore'] if threshold is None else threshold
+        columns = statistics.numerical_columns
+        step = threshold * statistics.numerical['std']
+        lower, upper = statistics.numerical['mean'] - step, statistics.numerical['mean'] + step
+        counts = np.zeros(len(columns), dtype=int)
+        valid = ~(np.isnan(lower) | np.isnan(upper))
+        if valid.any():
+            condition, params = filters_to_sql(filters)
+            where = f" WHERE {condition}" if condition else ""
+            fields = [quote_identifier(column) for column, keep in zip(columns, valid) if keep]
+            bounds = [float(bound) for low, high in zip(lower[valid], upper[valid]) for bound in (low, high)]
+            outside = [f"COUNT(CASE WHEN {field} < ? OR {field} > ? THEN 1 END)" for field in fields]
+            counts[valid] = self._fetch(f"SELECT {', '.join(outside)} FROM {quote_identifier(table)}{where}",
+                                        bounds + params)[0]
+        rows = statistics.rows
+        return OutlierReport(
+            method='zscore',
+            bounds=pd.DataFrame({'lower': lower, 'upper': upper}, index=columns),
+            counts=pd.Series(counts, index=columns),
+            percentages=pd.Series(counts / rows if rows else np.zeros(len(columns)), index=columns),
+        )
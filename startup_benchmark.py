@@ -0,0 +1,129 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Modules imported by each startup scenario, the heavy packages they must not pull in and their time budget
+SCENARIOS = {
+    'cli': {
+        'imports': ['cli_functions'],
+        'forbidden': ['kaggle', 'matplotlib', 'seaborn', 'sklearn', 'reportlab', 'datasist'],
+        'budget_ms': 1500,
+    },
+    'summary': {
+        'imports': ['cli_functions', 'data_analyzer', 'report_generator'],
+        'forbidden': ['kaggle', 'matplotlib', 'seaborn', 'sklearn', 'datasist'],
+        'budget_ms': 2000,
+    },
+}
+
+
+def parse_importtime(output):
+    """
+    Parse the output of `python -X importtime`.
+
+    Parameters:
+    output (str): stderr of the interpreter.
+
+    Returns:
+    tuple: Total import time in milliseconds (sum of the top-level imports) and the list of
+           (module, self_us, cumulative_us) entries.
+    """
+    entries = []
+    total_us = 0
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        # Nested imports are indented below the import that triggered them
+        if not module[1:].startswith(' '):
+            total_us += int(cumulative_us)
+        entries.append((module.strip(), int(self_us), int(cumulative_us)))
+    return total_us / 1000, entries
+
+
+def measure_startup(imports, repeat=5, python=sys.executable):
+    """
+    Import modules in fresh interpreters and measure the import time.
+
+    Parameters:
+    imports (list of str): Modules to import.
+    repeat (int): Number of fresh interpreters to start. The median time is reported.
+    python (str): Interpreter to run.
+
+    Returns:
+    dict: 'median_ms', 'runs_ms', the 'slowest' top-level packages of the last run by cumulative time, and
+          the set of 'modules' that were imported.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [directory,
+                                                                          os.environ.get('PYTHONPATH')])))
+    command = [python, '-X', 'importtime', '-c', '; '.join(f'import {module}' for module in imports)]
+
+    runs_ms = []
+    entries = []
+    for _ in range(repeat):
+        completed = subprocess.run(command, cwd=directory, env=environment, capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise RuntimeError(f"Importing {imports} failed:\n{completed.stderr[-2000:]}")
+        total_ms, entries = parse_importtime(completed.stderr)
+        runs_ms.append(total_ms)
+
+    packages = {}
+    for module, _, cumulative_us in entries:
+        package = module.split('.')[0]
+        packages[package] = max(packages.get(package, 0), cumulative_us)
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:10]
+    return {'median_ms': statistics.median(runs_ms), 'runs_ms': runs_ms,
+            'slowest': [(package, cumulative_us / 1000) for package, cumulative_us in slowest],
+            'modules': {module for module, _, _ in entries}}
+
+
+def check_scenario(name, repeat=5, budget_ms=None):
+    """
+    Measure a startup scenario and check it against its import budget and forbidden packages.
+
+    Parameters:
+    name (str): Scenario name, a key of SCENARIOS.
+    repeat (int): Number of fresh interpreters to start.
+    budget_ms (float or None): Time budget, overriding the scenario's default.
+
+    Returns:
+    dict: Measurement with the 'budget_ms', the 'forbidden' packages that were imported and whether it 'passed'.
+    """
+    scenario = SCENARIOS[name]
+    result = measure_startup(scenario['imports'], repeat)
+    budget_ms = scenario['budget_ms'] if budget_ms is None else budget_ms
+    imported = {module.split('.')[0] for module in result.pop('modules')}
+    forbidden = sorted(imported.intersection(scenario['forbidden']))
+    result.update({'scenario': name, 'budget_ms': budget_ms, 'forbidden': forbidden,
+                   'passed': result['median_ms'] <= budget_ms and not forbidden})
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure CLI cold-start import time against a budget.")
+    parser.add_argument("--scenario", nargs="+", choices=sorted(SCENARIOS), default=sorted(SCENARIOS))
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per scenario.")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Override the budget of every scenario.")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    args = parser.parse_args(argv)
+
+    results = [check_scenario(name, args.repeat, args.budget_ms) for name in args.scenario]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            status = "OK" if result['passed'] else "FAIL"
+            print(f"{status} {result['scenario']}: {result['median_ms']:.0f} ms "
+                  f"(budget {result['budget_ms']:.0f} ms)")
+            print("  slowest: " + ", ".join(f"{package} {ms:.0f} ms" for package, ms in result['slowest'][:5]))
+            if result['forbidden']:
+                print(f"  heavy packages imported at startup: {', '.join(result['forbidden'])}")
+    return 0 if all(result['passed'] for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
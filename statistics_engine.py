@@ -0,0 +1,525 @@
+import numpy as np
+import pandas as pd
+
+from row_fingerprints import DEFAULT_HLL_PRECISION, HyperLogLog, row_hashes
+from categorical_profiles import CategoryProfile, StreamingCategoryProfile, DEFAULT_TOP_K
+
+DEFAULT_PERCENTILES = (0.25, 0.5, 0.75)
+# Share of the values of a sorted block kept by one QuantileSketch batch reduction round
+COMPACTION_FACTOR = 8
+
+
+def _numeric_block(df, columns):
+    """
+    Return the given columns of a DataFrame as a 2D float array with NaN for missing values.
+
+    Parameters:
+    df (pd.DataFrame): Input DataFrame.
+    columns (list): Numerical column names.
+
+    Returns:
+    np.ndarray: Array of shape (rows, len(columns)).
+    """
+    block = df[columns]
+    if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in block.dtypes):
+        block = block.apply(pd.to_numeric, errors='coerce')
+    return block.to_numpy(dtype=float, na_value=np.nan)
+
+
+class QuantileSketch:
+    """
+    Mergeable approximate quantile sketch for a single column.
+
+    The sketch keeps at most `capacity` weighted values. While fewer values than that have been seen,
+    quantiles are exact; afterwards the values are compacted to evenly spaced points of the weighted
+    distribution, which bounds memory while keeping the rank error around 1 / capacity. Large batches are
+    reduced block by block before they are merged, so they are never sorted whole.
+    """
+
+    def __init__(self, capacity=2048):
+        """
+        Initialize an empty QuantileSketch.
+
+        Parameters:
+        capacity (int or None): Maximum number of values kept by the sketch. If None, every value is kept
+                                and quantiles are exact.
+        """
+        self.capacity = capacity
+        self.values = np.empty(0)
+        self.weights = np.empty(0)
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def update(self, values):
+        """
+        Add a batch of values to the sketch. NaN values are ignored.
+
+        Parameters:
+        values (array-like): Values to add.
+
+        Returns:
+        QuantileSketch: The updated sketch.
+        """
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        values, weights = self._reduce_batch(values)
+        self.values = np.concatenate([self.values, values])
+        self.weights = np.concatenate([self.weights, weights])
+        self._compact()
+        return self
+
+    def _reduce_batch(self, values):
+        """
+        Shrink a large batch before it is merged, so no update sorts more than a few times `capacity` values.
+
+        The batch is cut into blocks of COMPACTION_FACTOR * capacity values, every block is sorted on its own
+        and only every COMPACTION_FACTOR-th value is kept, with that weight. This repeats on the kept values
+        until fewer than one block remain, costing O(n log capacity) instead of sorting all n values, with a
+        rank error of about 1 / (2 * capacity) per round.
+        """
+        if self.capacity is None:
+            return values, np.ones(len(values))
+        block = COMPACTION_FACTOR * self.capacity
+        kept_values, kept_weights = [], []
+        weight = 1.0
+        while len(values) >= block:
+            full = len(values) // block * block
+            # The values past the last full block are kept whole, at the weight of this round
+            kept_values.append(values[full:])
+            kept_weights.append(np.full(len(values) - full, weight))
+            blocks = np.sort(values[:full].reshape(-1, block), axis=1)
+            values = blocks[:, COMPACTION_FACTOR // 2::COMPACTION_FACTOR].ravel()
+            weight *= COMPACTION_FACTOR
+        kept_values.append(values)
+        kept_weights.append(np.full(len(values), weight))
+        return np.concatenate(kept_values), np.concatenate(kept_weights)
+
+    def merge(self, other):
+        """
+        Merge another sketch into this one.
+
+        Parameters:
+        other (QuantileSketch): Sketch to merge.
+
+        Returns:
+        QuantileSketch: The updated sketch.
+        """
+        self.values = np.concatenate([self.values, other.values])
+        self.weights = np.concatenate([self.weights, other.weights])
+        self._compact()
+        return self
+
+    def _compact(self):
+        """
+        Reduce the sketch to `capacity` values placed at evenly spaced ranks of the weighted distribution.
+        """
+        if self.capacity is None or len(self.values) <= self.capacity:
+            return
+        order = np.argsort(self.values, kind='stable')
+        values, weights = self.values[order], self.weights[order]
+        cumulative = np.cumsum(weights)
+        total = cumulative[-1]
+        targets = (np.arange(self.capacity) + 0.5) * total / self.capacity
+        positions = np.minimum(np.searchsorted(cumulative, targets), len(values) - 1)
+        self.values = values[positions]
+        self.weights = np.full(self.capacity, total / self.capacity)
+
+    def quantile(self, q):
+        """
+        Estimate one or more quantiles.
+
+        Parameters:
+        q (float or array-like): Quantile(s) between 0 and 1.
+
+        Returns:
+        float or np.ndarray: Estimated quantile value(s), NaN if the sketch is empty.
+        """
+        if len(self.values) == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        if np.all(self.weights == 1):
+            return np.quantile(self.values, q)
+        order = np.argsort(self.values, kind='stable')
+        values, weights = self.values[order], self.weights[order]
+        cumulative = np.cumsum(weights)
+        positions = (cumulative - weights / 2) / cumulative[-1]
+        return np.interp(q, positions, values)
+
+    def count_outside(self, lower, upper):
+        """
+        Estimate the number of values below a lower or above an upper bound.
+
+        Parameters:
+        lower (float): Lower bound.
+        upper (float): Upper bound.
+
+        Returns:
+        float: Estimated count, exact while the sketch holds every value.
+        """
+        outside = (self.values < lower) | (self.values > upper)
+        return float(self.weights[outside].sum())
+
+
+class NumericMoments:
+    """
+    Mergeable count, mean, central moments, minimum and maximum for a block of numerical columns.
+
+    All statistics are held as arrays with one entry per column so updates are vectorized across columns.
+    Partial states from different chunks or processes are combined with the pairwise update formulas
+    of Chan et al. / Pebay.
+    """
+
+    def __init__(self, n_columns):
+        """
+        Initialize empty moments for a number of columns.
+
+        Parameters:
+        n_columns (int): Number of columns.
+        """
+        self.n = np.zeros(n_columns)
+        self.mean = np.zeros(n_columns)
+        self.m2 = np.zeros(n_columns)
+        self.m3 = np.zeros(n_columns)
+        self.m4 = np.zeros(n_columns)
+        self.min = np.full(n_columns, np.inf)
+        self.max = np.full(n_columns, -np.inf)
+
+    @classmethod
+    def from_array(cls, values):
+        """
+        Compute moments of a 2D array in one pass over its rows.
+
+        Parameters:
+        values (np.ndarray): Array of shape (rows, columns) with NaN for missing values.
+
+        Returns:
+        NumericMoments: Moments of every column.
+        """
+        moments = cls(values.shape[1])
+        valid = ~np.isnan(values)
+        moments.n = valid.sum(axis=0).astype(float)
+        if values.shape[0] == 0:
+            return moments
+        has_values = moments.n > 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            moments.mean = np.where(has_values, np.nansum(values, axis=0) / moments.n, 0.0)
+            deviations = np.where(valid, values - moments.mean, 0.0)
+            squared = deviations ** 2
+            moments.m2 = squared.sum(axis=0)
+            moments.m3 = (squared * deviations).sum(axis=0)
+            moments.m4 = (squared ** 2).sum(axis=0)
+        moments.min = np.where(has_values, np.min(np.where(valid, values, np.inf), axis=0), np.inf)
+        moments.max = np.where(has_values, np.max(np.where(valid, values, -np.inf), axis=0), -np.inf)
+        return moments
+
+    def merge(self, other):
+        """
+        Merge the moments of another block with the same columns into this one.
+
+        Parameters:
+        other (NumericMoments): Moments to merge.
+
+        Returns:
+        NumericMoments: The updated moments.
+        """
+        n_a, n_b = self.n, other.n
+        n = n_a + n_b
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = np.where(n > 0, other.mean - self.mean, 0.0)
+            delta_n = np.where(n > 0, delta / n, 0.0)
+            mean = np.where(n > 0, self.mean + delta_n * n_b, 0.0)
+            m2 = self.m2 + other.m2 + delta * delta_n * n_a * n_b
+            m3 = (self.m3 + other.m3 + delta * delta_n ** 2 * n_a * n_b * (n_a - n_b)
+                  + 3 * delta_n * (n_a * other.m2 - n_b * self.m2))
+            m4 = (self.m4 + other.m4
+                  + delta * delta_n ** 3 * n_a * n_b * (n_a ** 2 - n_a * n_b + n_b ** 2)
+                  + 6 * delta_n ** 2 * (n_a ** 2 * other.m2 + n_b ** 2 * self.m2)
+                  + 4 * delta_n * (n_a * other.m3 - n_b * self.m3))
+        self.n, self.mean, self.m2, self.m3, self.m4 = n, mean, m2, m3, m4
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+        return self
+
+    def variance(self):
+        """Sample variance (ddof=1) of every column."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.n > 1, self.m2 / (self.n - 1), np.nan)
+
+    def skewness(self):
+        """Bias-corrected sample skewness of every column, matching pandas.Series.skew."""
+        n = self.n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            g1 = np.sqrt(n) * self.m3 / self.m2 ** 1.5
+            skew = np.sqrt(n * (n - 1)) / (n - 2) * g1
+        skew = np.where(self.m2 == 0, 0.0, skew)
+        return np.where(n > 2, skew, np.nan)
+
+    def kurtosis(self):
+        """Bias-corrected excess kurtosis of every column, matching pandas.Series.kurtosis."""
+        n = self.n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            g2 = n * self.m4 / self.m2 ** 2 - 3
+            kurt = (n - 1) / ((n - 2) * (n - 3)) * ((n + 1) * g2 + 6)
+        kurt = np.where(self.m2 == 0, 0.0, kurt)
+        return np.where(n > 3, kurt, np.nan)
+
+
+class DataFrameStatistics:
+    """
+    Single-pass, mergeable statistics accumulator for a DataFrame.
+
+    One update computes row and null counts for every column, moments and quantile sketches for
+    numerical columns, and value counts for categorical columns. States built from separate chunks or
+    worker processes can be combined with `merge`, so the same object serves in-memory and streamed data.
+    """
+
+    # States pickled before category sketches existed keep exact value counts
+    category_capacity = None
+    category_sketches = None
+
+    def __init__(self, numerical_columns=None, categorical_columns=None, quantile_capacity=2048,
+                 distinct_rows=False, category_capacity=None):
+        """
+        Initialize an empty DataFrameStatistics accumulator.
+
+        Parameters:
+        numerical_columns (list or None): Numerical columns. If None, detected from the first update.
+        categorical_columns (list or None): Categorical columns. If None, detected from the first update.
+        quantile_capacity (int or None): Capacity of each column's QuantileSketch, None for exact quantiles.
+        distinct_rows (bool): Also estimate the number of distinct rows with a HyperLogLog sketch of the
+                              row hashes, for duplicate percentages of streamed data.
+        category_capacity (int or None): Count categorical values with bounded-memory heavy-hitter sketches
+                                         keeping this many candidates, instead of exact value counts of every
+                                         distinct value. Suited to streamed high-cardinality columns.
+        """
+        self.numerical_columns = None if numerical_columns is None else list(numerical_columns)
+        self.categorical_columns = None if categorical_columns is None else list(categorical_columns)
+        self.quantile_capacity = quantile_capacity
+        self.row_sketch = HyperLogLog(DEFAULT_HLL_PRECISION) if distinct_rows else None
+        self.category_capacity = category_capacity
+        self.rows = 0
+        self.null_counts = None
+        self.moments = None
+        self.sketches = None
+        self.value_counts = None
+
+    @classmethod
+    def from_dataframe(cls, df, numerical_columns=None, categorical_columns=None, quantile_capacity=2048,
+                       distinct_rows=False):
+        """
+        Compute the statistics of a whole DataFrame.
+
+        Parameters:
+        df (pd.DataFrame): Input DataFrame.
+        numerical_columns (list or None): Numerical columns. If None, detected from dtypes.
+        categorical_columns (list or None): Categorical columns. If None, detected from dtypes.
+        quantile_capacity (int or None): Capacity of each column's QuantileSketch, None for exact quantiles.
+        distinct_rows (bool): Also estimate the number of distinct rows.
+
+        Returns:
+        DataFrameStatistics: The computed statistics.
+        """
+        return cls(numerical_columns, categorical_columns, quantile_capacity, distinct_rows).update(df)
+
+    def _initialize(self, df):
+        if self.numerical_columns is None:
+            self.numerical_columns = df.select_dtypes(include='number').columns.tolist()
+        if self.categorical_columns is None:
+            self.categorical_columns = df.select_dtypes(include=['object', 'category', 'string']).columns.tolist()
+        self.null_counts = pd.Series(0, index=df.columns, dtype='int64')
+        self.moments = NumericMoments(len(self.numerical_columns))
+        self.sketches = {column: QuantileSketch(self.quantile_capacity) for column in self.numerical_columns}
+        self._initialize_categories()
+
+    def _initialize_categories(self):
+        if self.category_capacity is None:
+            self.value_counts = {column: pd.Series(dtype='int64') for column in self.categorical_columns}
+        else:
+            self.value_counts = {}
+            self.category_sketches = {column: StreamingCategoryProfile(self.category_capacity)
+                                      for column in self.categorical_columns}
+
+    def update(self, df):
+        """
+        Add a DataFrame (or a chunk of one) to the statistics.
+
+        Parameters:
+        df (pd.DataFrame): Rows to add.
+
+        Returns:
+        DataFrameStatistics: The updated statistics.
+        """
+        if self.null_counts is None:
+            self._initialize(df)
+        self.rows += len(df)
+        self.null_counts = self.null_counts.add(df.isnull().sum(), fill_value=0).astype('int64')
+
+        values = _numeric_block(df, self.numerical_columns)
+        self.moments.merge(NumericMoments.from_array(values))
+        for position, column in enumerate(self.numerical_columns):
+            self.sketches[column].update(values[:, position])
+
+        for column in self.categorical_columns:
+            if self.category_sketches is not None:
+                self.category_sketches[column].update(df[column])
+                continue
+            counts = df[column].value_counts()
+            counts = counts[counts > 0]  # categorical dtypes also count unused categories
+            self.value_counts[column] = self.value_counts[column].add(counts, fill_value=0).astype('int64')
+
+        if self.row_sketch is not None:
+            self.row_sketch.update(row_hashes(df))
+        return self
+
+    def merge(self, other):
+        """
+        Merge statistics computed over other rows with the same columns into this one.
+
+        Parameters:
+        other (DataFrameStatistics): Statistics to merge.
+
+        Returns:
+        DataFrameStatistics: The updated statistics.
+        """
+        if other.null_counts is None:
+            return self
+        if self.null_counts is None:
+            self.numerical_columns = list(other.numerical_columns)
+            self.categorical_columns = list(other.categorical_columns)
+            self.null_counts = pd.Series(0, index=other.null_counts.index, dtype='int64')
+            self.moments = NumericMoments(len(self.numerical_columns))
+            self.sketches = {column: QuantileSketch(self.quantile_capacity) for column in self.numerical_columns}
+            self.category_capacity = other.category_capacity
+            self._initialize_categories()
+        self.rows += other.rows
+        self.null_counts = self.null_counts.add(other.null_counts, fill_value=0).astype('int64')
+        self.moments.merge(other.moments)
+        for column in self.numerical_columns:
+            self.sketches[column].merge(other.sketches[column])
+        if (self.category_sketches is None) != (other.category_sketches is None):
+            raise ValueError("Cannot merge statistics with exact value counts and category sketches.")
+        for column in self.categorical_columns:
+            if self.category_sketches is not None:
+                self.category_sketches[column].merge(other.category_sketches[column])
+                continue
+            self.value_counts[column] = self.value_counts[column].add(
+                other.value_counts[column], fill_value=0).astype('int64')
+        if self.row_sketch is not None and other.row_sketch is not None:
+            self.row_sketch.merge(other.row_sketch)
+        else:
+            self.row_sketch = None
+        return self
+
+    def null_percentage(self):
+        """
+        Percentage of null values per column, rounded to 2 decimals.
+
+        Returns:
+        pd.Series: Null percentage indexed by column name.
+        """
+        if not self.rows:
+            return self.null_counts * 0.0
+        return (self.null_counts / self.rows * 100).round(2)
+
+    def approximate_duplicate_percentage(self):
+        """
+        Estimated percentage of rows repeating an earlier row, from the distinct row sketch.
+
+        Returns:
+        float or None: Duplicate percentage rounded to 2 decimals, or None if distinct rows are not tracked.
+        """
+        if self.row_sketch is None:
+            return None
+        if not self.rows:
+            return 0.0
+        distinct = min(self.row_sketch.count(), self.rows)
+        return round((self.rows - distinct) / self.rows * 100, 2)
+
+    def describe(self, percentiles=DEFAULT_PERCENTILES):
+        """
+        Summary statistics of the numerical columns in the layout of pandas.DataFrame.describe.
+
+        Parameters:
+        percentiles (sequence of float): Percentiles to include, between 0 and 1.
+
+        Returns:
+        pd.DataFrame: Statistics indexed by name (count, mean, std, min, percentiles, max) with one column
+                      per numerical column.
+        """
+        moments = self.moments
+        rows = {
+            'count': moments.n,
+            'mean': np.where(moments.n > 0, moments.mean, np.nan),
+            'std': np.sqrt(moments.variance()),
+            'min': np.where(moments.n > 0, moments.min, np.nan),
+        }
+        quantiles = np.array([np.atleast_1d(self.sketches[column].quantile(percentiles))
+                              for column in self.numerical_columns]).reshape(len(self.numerical_columns), -1)
+        for position, percentile in enumerate(percentiles):
+            rows[f"{percentile * 100:g}%"] = quantiles[:, position]
+        rows['max'] = np.where(moments.n > 0, moments.max, np.nan)
+        return pd.DataFrame(rows, index=self.numerical_columns).T
+
+    def shape_statistics(self):
+        """
+        Skewness and excess kurtosis of the numerical columns.
+
+        Returns:
+        pd.DataFrame: Columns 'skewness' and 'kurtosis' indexed by column name.
+        """
+        return pd.DataFrame({'skewness': self.moments.skewness(), 'kurtosis': self.moments.kurtosis()},
+                            index=self.numerical_columns)
+
+    def top_values(self, column, n=10):
+        """
+        Most frequent values of a categorical column.
+
+        Parameters:
+        column (str): Categorical column name.
+        n (int or None): Number of values to return. If None, return all of them (or all heavy-hitter
+                         candidates when counting with category sketches).
+
+        Returns:
+        pd.Series: Counts indexed by value, in descending order. Estimated when counting with category sketches.
+        """
+        if self.category_sketches is not None:
+            return self.category_sketches[column].profile(column, self.category_capacity if n is None else n).top
+        counts = self.value_counts[column].sort_values(ascending=False, kind='stable')
+        return counts if n is None else counts.head(n)
+
+    def category_profiles(self, k=DEFAULT_TOP_K):
+        """
+        Top values and cardinality of every categorical column.
+
+        Parameters:
+        k (int): Number of most frequent values per column.
+
+        Returns:
+        dict: CategoryProfile per categorical column name.
+        """
+        if self.category_sketches is not None:
+            return {column: sketch.profile(column, k) for column, sketch in self.category_sketches.items()}
+        profiles = {}
+        for column in self.categorical_columns:
+            counts = self.value_counts[column]
+            profiles[column] = CategoryProfile(column, counts.sum(), len(counts), self.top_values(column, k))
+        return profiles
+
+    def to_dict(self):
+        """
+        Summary dictionary in the layout of pandas.DataFrame.describe(include='all').to_dict().
+
+        Returns:
+        dict: Statistics keyed by column name.
+        """
+        summary = self.describe().to_dict()
+        for column, profile in self.category_profiles(1).items():
+            top = profile.top
+            summary[column] = {
+                'count': self.rows - self.null_counts[column],
+                'unique': profile.distinct,
+                'top': top.index[0] if len(top) else np.nan,
+                'freq': top.iloc[0] if len(top) else np.nan,
+            }
+        return summary
@@ -0,0 +1,63 @@
+import os
+
+import pandas as pd
+
+from artifact_cache import ArtifactCache, fingerprint
+from image_buffers import ImageBuffer
+
+
+def test_objects_round_trip_and_evict_least_recently_used(tmp_path):
+    cache = ArtifactCache(str(tmp_path), max_entries=2)
+    keys = [cache.make_key('table', str(i)) for i in range(3)]
+    cache.put_object(keys[0], {'value': 0})
+    cache.put_object(keys[1], {'value': 1})
+    assert cache.get_object(keys[0]) == {'value': 0}
+    cache.put_object(keys[2], {'value': 2})
+    assert cache.get_object(keys[1]) is None
+    assert cache.get_object(keys[0]) == {'value': 0}
+    assert cache.stats()['entries'] == 2
+    cache.close()
+
+
+def test_stored_image_is_never_evicted(tmp_path):
+    cache = ArtifactCache(str(tmp_path), max_bytes=600)
+    first = cache.put_image(cache.make_key('plot', 'a'), ImageBuffer(b'x' * 400, 'png'))
+    second = cache.put_image(cache.make_key('plot', 'b'), ImageBuffer(b'y' * 400, 'png'))
+    assert os.path.exists(second) and not os.path.exists(first)
+    cache.close()
+
+
+def test_image_larger_than_cache_is_returned_uncached(tmp_path):
+    cache = ArtifactCache(str(tmp_path), max_bytes=100)
+    image = ImageBuffer(b'x' * 500, 'png')
+    key = cache.make_key('plot', 'a')
+    assert cache.put_image(key, image) is image
+    assert cache.get_image(key) is None
+    cache.close()
+
+
+def test_index_is_shared_between_instances(tmp_path):
+    first, second = ArtifactCache(str(tmp_path)), ArtifactCache(str(tmp_path))
+    key = first.make_key('table', 'shared')
+    first.put_object(key, [1, 2])
+    assert second.get_object(key) == [1, 2]
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+    first.close()
+    second.close()
+
+
+def test_corrupt_object_is_a_miss(tmp_path):
+    cache = ArtifactCache(str(tmp_path))
+    key = cache.make_key('table', 'corrupt')
+    cache.put_object(key, list(range(100)))
+    with open(os.path.join(tmp_path, key + '.pkl'), 'wb') as object_file:
+        object_file.write(b'\x80\x04truncated')
+    assert cache.get_object(key) is None
+    cache.close()
+
+
+def test_fingerprint_changes_with_content_and_dtype():
+    series = pd.Series([1, 2, 3], name='a')
+    assert fingerprint(series) == fingerprint(series.copy())
+    assert fingerprint(series) != fingerprint(series.astype(float))
+    assert fingerprint(series) != fingerprint(pd.Series([1, 2, 4], name='a'))
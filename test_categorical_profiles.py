@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from categorical_profiles import StreamingCategoryProfile, profile_column, value_hashes
+
+
+def zipf_column(rows=200_000, seed=0):
+    values = np.random.default_rng(seed).zipf(1.3, rows) % 50_000
+    return pd.Series([f'v{value}' for value in values], name='city')
+
+
+def test_exact_profile_matches_value_counts():
+    series = zipf_column(20_000).where(lambda s: s != 'v7')
+    profile = profile_column(series, k=10)
+    expected = series.value_counts()
+    assert profile.count == series.notna().sum()
+    assert profile.distinct == len(expected)
+    assert profile.top.to_dict() == expected.head(10).to_dict()
+
+
+def test_streaming_top_k_matches_exact_counts():
+    series = zipf_column()
+    first, second = StreamingCategoryProfile(capacity=100), StreamingCategoryProfile(capacity=100)
+    for position, chunk in enumerate(np.array_split(series, 20)):
+        (first if position % 2 else second).update(chunk)
+    profile = first.merge(second).profile('city', k=10)
+    expected = series.value_counts()
+
+    assert profile.count == len(series) and not profile.exact
+    assert set(profile.top.index) == set(expected.head(10).index)
+    # Count-Min estimates never undercount and overcount by a small fraction of the rows
+    errors = profile.top - expected[profile.top.index]
+    assert (errors >= 0).all() and (errors <= 0.01 * len(series)).all()
+    assert abs(profile.distinct - len(expected)) / len(expected) < 0.03
+
+
+def test_value_hashes_do_not_depend_on_dtype():
+    assert (value_hashes(pd.Series([1, 2, 3])) == value_hashes(['1', '2', '3'])).all()
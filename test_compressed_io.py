@@ -0,0 +1,66 @@
+import bz2
+import gzip
+import lzma
+import zipfile
+
+import pandas as pd
+import pytest
+
+from compressed_io import compression_type, inner_name, open_compressed, select_member
+from data_downloader import read_file_in_chunks, read_file_to_dataframe
+
+DATA = pd.DataFrame({'id': range(500), 'city': ['paris', 'lyon', 'nice', 'lille', 'metz'] * 100})
+CSV = DATA.to_csv(index=False).encode()
+
+
+@pytest.fixture
+def zip_path(tmp_path):
+    path = str(tmp_path / 'bundle.zip')
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('docs/readme.txt', 'not data')
+        archive.writestr('data/domestic.csv', 'id\n1\n')
+        archive.writestr('data/international.csv', CSV)
+    return path
+
+
+@pytest.mark.parametrize('extension, open_function', [('.gz', gzip.open), ('.bz2', bz2.open), ('.xz', lzma.open)])
+def test_compressed_csv_reads_like_plain_csv(tmp_path, extension, open_function):
+    path = str(tmp_path / f'data.csv{extension}')
+    with open_function(path, 'wb') as compressed_file:
+        compressed_file.write(CSV)
+    assert inner_name(path) == str(tmp_path / 'data.csv')
+    with open_compressed(path) as stream:
+        assert stream.read() == CSV
+
+    df, _ = read_file_to_dataframe(path)
+    pd.testing.assert_frame_equal(df, DATA)
+    chunks = list(read_file_in_chunks(path, chunk_size=120))
+    assert [len(chunk) for chunk in chunks] == [120, 120, 120, 120, 20]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), DATA)
+
+
+def test_zip_member_selection(zip_path):
+    assert compression_type(zip_path) == 'zip'
+    assert select_member(zip_path, is_readable=lambda name: name.endswith('.csv')) == 'data/domestic.csv'
+    assert select_member(zip_path, '*international*') == 'data/international.csv'
+    with pytest.raises(FileNotFoundError):
+        select_member(zip_path, '*.parquet')
+
+    df, name = read_file_to_dataframe(zip_path, member='*international.csv', columns=['city'],
+                                      filters=[('id', '<', 5)])
+    assert name == 'international.csv'
+    assert df['city'].tolist() == DATA['city'].head(5).tolist()
+
+
+def test_zstandard_is_optional(tmp_path):
+    path = str(tmp_path / 'data.csv.zst')
+    try:
+        import zstandard
+    except ImportError:
+        open(path, 'wb').close()
+        with pytest.raises(ImportError, match='zstandard'):
+            open_compressed(path)
+        return
+    with open(path, 'wb') as compressed_file:
+        compressed_file.write(zstandard.ZstdCompressor().compress(CSV))
+    pd.testing.assert_frame_equal(read_file_to_dataframe(path)[0], DATA)
@@ -0,0 +1,36 @@
+import pandas as pd
+import pytest
+
+from data_downloader import read_file_in_chunks, read_file_to_dataframe
+
+DATA = pd.DataFrame({'a': range(10), 'b': list('xyxyxyxyxy'), 'c': [i / 2 for i in range(10)]})
+FILTERS = [('b', '==', 'x'), ('a', '>=', 2)]
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'data.csv'
+    DATA.to_csv(path, index=False)
+    return str(path)
+
+
+def test_filter_on_unselected_column(csv_path):
+    df, _ = read_file_to_dataframe(csv_path, columns=['a'], filters=FILTERS)
+    assert df.columns.tolist() == ['a']
+    assert df['a'].tolist() == [2, 4, 6, 8]
+
+
+def test_csv_and_parquet_agree(csv_path, tmp_path):
+    pytest.importorskip('pyarrow')
+    parquet_path = str(tmp_path / 'data.parquet')
+    DATA.to_parquet(parquet_path, index=False)
+    from_csv, _ = read_file_to_dataframe(csv_path, columns=['a', 'c'], filters=FILTERS)
+    from_parquet, _ = read_file_to_dataframe(parquet_path, columns=['a', 'c'], filters=FILTERS)
+    pd.testing.assert_frame_equal(from_csv, from_parquet, check_dtype=False)
+
+
+def test_chunks_match_whole_read(csv_path):
+    whole, _ = read_file_to_dataframe(csv_path, columns=['c'], filters=FILTERS)
+    chunks = list(read_file_in_chunks(csv_path, chunk_size=3, columns=['c'], filters=FILTERS))
+    assert all(len(chunk) <= 3 for chunk in chunks)
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), whole)
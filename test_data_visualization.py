@@ -0,0 +1,17 @@
+import numpy as np
+import pandas as pd
+
+from data_visualization import kde_summary, summarize_numerical_column
+
+
+def test_kde_summary_two_values():
+    grid, density = kde_summary(np.array([0., 1.]))
+    assert len(grid) == len(density) == 512
+    # The density integrates to about 1 over a grid extending 3 bandwidths past the data
+    assert abs(np.trapz(density, grid) - 1) < 0.01
+
+
+def test_summarize_two_value_column():
+    summary = summarize_numerical_column(pd.Series([0., 1., np.nan]))
+    grid, density = summary['kde']
+    assert grid.shape == density.shape
@@ -0,0 +1,148 @@
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from dataset_acquisition import (MANIFEST_FILE_NAME, PARTIAL_DIRECTORY_NAME, HttpSource, LocalDirectorySource,
+                                 RemoteFile, acquire_datasets)
+
+PAYLOAD = bytes(range(256)) * 400
+ETAG = '"v1"'
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """
+    Serves PAYLOAD with an ETag and single 'bytes=<start>-' ranges, recording the Range header of every GET.
+    """
+
+    ranges = []
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(PAYLOAD)))
+        self.send_header('ETag', ETAG)
+        self.end_headers()
+
+    def do_GET(self):
+        requested = self.headers.get('Range')
+        self.ranges.append(requested)
+        start = int(requested[len('bytes='):-1]) if requested else 0
+        if start >= len(PAYLOAD):
+            self.send_response(416)
+            self.send_header('Content-Range', f'bytes */{len(PAYLOAD)}')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(206 if requested else 200)
+        if requested:
+            self.send_header('Content-Range', f'bytes {start}-{len(PAYLOAD) - 1}/{len(PAYLOAD)}')
+        self.send_header('Content-Length', str(len(PAYLOAD) - start))
+        self.send_header('ETag', ETAG)
+        self.end_headers()
+        self.wfile.write(PAYLOAD[start:])
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    RangeHandler.ranges = []
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), RangeHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def partial_path(destination, source_name, file_name):
+    name = hashlib.sha256(f'{source_name}/{file_name}'.encode()).hexdigest()[:16]
+    return os.path.join(destination, PARTIAL_DIRECTORY_NAME, f'{name}.part')
+
+
+def write_partial(destination, source_name, file_name, data, version):
+    path = partial_path(destination, source_name, file_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as partial_file:
+        partial_file.write(data)
+    with open(f'{path}.version', 'w') as version_file:
+        version_file.write(version)
+
+
+@pytest.fixture
+def local_source(tmp_path):
+    directory = tmp_path / 'remote'
+    directory.mkdir()
+    (directory / 'a.csv').write_text('x,y\n1,2\n')
+    (directory / 'b.csv').write_text('x,y\n3,4\n')
+    return LocalDirectorySource(str(directory), name='local')
+
+
+def test_unchanged_files_are_skipped(local_source, tmp_path):
+    destination = str(tmp_path / 'data')
+    first = acquire_datasets([local_source], destination)
+    assert sorted(result['status'] for result in first) == ['fetched', 'fetched']
+    assert os.path.exists(os.path.join(destination, MANIFEST_FILE_NAME))
+
+    second = acquire_datasets([local_source], destination)
+    assert [result['status'] for result in second] == ['unchanged', 'unchanged']
+
+    # A deleted output is acquired again
+    os.remove(os.path.join(destination, 'a.csv'))
+    third = {result['file']: result['status'] for result in acquire_datasets([local_source], destination)}
+    assert third == {'a.csv': 'fetched', 'b.csv': 'unchanged'}
+
+
+def test_checksum_mismatch_fails(local_source, tmp_path):
+    destination = str(tmp_path / 'data')
+    good = hashlib.sha256(b'x,y\n1,2\n').hexdigest()
+    local_source.checksums = {'a.csv': good, 'b.csv': '0' * 64}
+    results = {result['file']: result for result in acquire_datasets([local_source], destination)}
+    assert results['a.csv']['status'] == 'fetched'
+    assert results['b.csv']['status'] == 'failed' and 'SHA-256' in results['b.csv']['error']
+    assert not os.path.exists(os.path.join(destination, 'b.csv'))
+    assert not os.path.exists(partial_path(destination, 'local', 'b.csv'))
+
+
+def test_http_download_resumes_partial_file(server, tmp_path):
+    destination = str(tmp_path / 'data')
+    source = HttpSource([f'{server}/data.bin'], checksums={'data.bin': hashlib.sha256(PAYLOAD).hexdigest()})
+    write_partial(destination, source.name, 'data.bin', PAYLOAD[:1000], ETAG)
+
+    results = acquire_datasets([source], destination)
+    assert [result['status'] for result in results] == ['fetched']
+    assert RangeHandler.ranges == ['bytes=1000-']
+    with open(os.path.join(destination, 'data.bin'), 'rb') as data_file:
+        assert data_file.read() == PAYLOAD
+
+    assert [result['status'] for result in acquire_datasets([source], destination)] == ['unchanged']
+    assert RangeHandler.ranges == ['bytes=1000-']
+
+
+def test_partial_file_of_another_version_is_restarted(server, tmp_path):
+    destination = str(tmp_path / 'data')
+    source = HttpSource([f'{server}/data.bin'])
+    write_partial(destination, source.name, 'data.bin', b'stale' * 100, '"v0"')
+
+    assert [result['status'] for result in acquire_datasets([source], destination)] == ['fetched']
+    assert RangeHandler.ranges == [None]
+    with open(os.path.join(destination, 'data.bin'), 'rb') as data_file:
+        assert data_file.read() == PAYLOAD
+
+
+def test_complete_partial_file_is_not_downloaded_again(server, tmp_path):
+    destination = str(tmp_path / 'data')
+    source = HttpSource([f'{server}/data.bin'])
+    write_partial(destination, source.name, 'data.bin', PAYLOAD, ETAG)
+
+    assert [result['status'] for result in acquire_datasets([source], destination)] == ['fetched']
+    assert RangeHandler.ranges == []
+
+
+def test_range_not_satisfiable_at_full_length_is_complete(server):
+    source = HttpSource([f'{server}/data.bin'])
+    stream, offset = source.open(RemoteFile('data.bin', None, ETAG, None), len(PAYLOAD))
+    assert offset == len(PAYLOAD) and stream.read() == b''
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from feature_transformer import UNKNOWN_CODE, EncodeScaleTransformer
+
+preprocessing = pytest.importorskip('sklearn.preprocessing')
+
+
+def sample_frame(rows=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'x': rng.normal(5, 2, rows), 'y': rng.integers(0, 100, rows).astype(float),
+                         'constant': 1.0, 'color': rng.choice(['red', 'green', 'blue'], rows),
+                         'size': pd.Categorical(rng.choice(['S', 'M', 'L'], rows))})
+
+
+def test_matches_standard_scaler_and_label_encoder():
+    df = sample_frame()
+    numerical, categorical = ['x', 'y', 'constant'], ['color', 'size']
+    transformed = EncodeScaleTransformer(numerical, categorical, n_jobs=2).fit_transform(df)
+
+    expected = preprocessing.StandardScaler().fit_transform(df[numerical])
+    np.testing.assert_allclose(transformed[numerical].to_numpy(), expected, atol=1e-12)
+    for column in categorical:
+        encoder = preprocessing.LabelEncoder().fit(df[column].astype(str))
+        np.testing.assert_array_equal(transformed[column], encoder.transform(df[column].astype(str)))
+
+
+def test_partial_fit_matches_fit():
+    df = sample_frame()
+    chunked = EncodeScaleTransformer(['x', 'y'], ['color'])
+    for chunk in np.array_split(df, 9):
+        chunked.partial_fit(chunk)
+    whole = EncodeScaleTransformer(['x', 'y'], ['color']).fit(df)
+    np.testing.assert_allclose(chunked.mean_, whole.mean_)
+    np.testing.assert_allclose(chunked.scale_, whole.scale_)
+    assert chunked.classes_['color'].tolist() == whole.classes_['color'].tolist()
+
+
+def test_saved_transformer_codes_new_batches_consistently(tmp_path):
+    transformer = EncodeScaleTransformer(['x'], ['color']).fit(sample_frame())
+    path = str(tmp_path / 'transformer.pkl')
+    transformer.save(path)
+    loaded = EncodeScaleTransformer.load(path)
+
+    batch = pd.DataFrame({'x': [5.0, np.nan], 'color': ['purple', None]})
+    pd.testing.assert_frame_equal(loaded.transform(batch), transformer.transform(batch))
+    assert loaded.transform(batch)['color'].tolist() == [UNKNOWN_CODE, UNKNOWN_CODE]
+    codes = loaded.transform(pd.DataFrame({'x': [0.0], 'color': ['red']}))['color']
+    assert loaded.inverse_transform_codes('color', codes).tolist() == ['red']
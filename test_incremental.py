@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from incremental import detect_append, load_state, state_path_for, update_statistics
+
+STABLE_STATISTICS = ['count', 'mean', 'std', 'min', 'max']
+
+
+def sample_frame(rows, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'amount': rng.normal(100, 15, rows).round(2), 'units': rng.integers(0, 50, rows),
+                         'region': rng.choice(['north', 'south', 'east'], rows)})
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'sales.csv'
+    sample_frame(3000, 0).to_csv(path, index=False)
+    return str(path)
+
+
+def append_rows(path, df):
+    df.to_csv(path, mode='a', header=False, index=False)
+
+
+def test_append_matches_full_recompute(csv_path, tmp_path):
+    state_directory = str(tmp_path / 'state')
+    _, mode = update_statistics(csv_path, state_directory, chunk_size=500)
+    assert mode == 'full'
+
+    append_rows(csv_path, sample_frame(1200, 1))
+    appended, mode = update_statistics(csv_path, state_directory, chunk_size=500)
+    assert mode == 'appended'
+    full, mode = update_statistics(csv_path, str(tmp_path / 'fresh'), chunk_size=500)
+    assert mode == 'full'
+
+    assert appended.statistics.rows == full.statistics.rows == 4200
+    pd.testing.assert_frame_equal(appended.statistics.describe().loc[STABLE_STATISTICS],
+                                  full.statistics.describe().loc[STABLE_STATISTICS])
+    assert appended.statistics.top_values('region').to_dict() == full.statistics.top_values('region').to_dict()
+    assert appended.checksum == full.checksum
+
+
+def test_unchanged_and_rewritten_files(csv_path, tmp_path):
+    state_directory = str(tmp_path / 'state')
+    update_statistics(csv_path, state_directory)
+    state = load_state(state_path_for(csv_path, state_directory))
+    assert detect_append(state, csv_path) == 'unchanged'
+    assert update_statistics(csv_path, state_directory)[1] == 'unchanged'
+
+    # Rewriting an analysed row forces a full recompute even if rows were also appended
+    df = pd.read_csv(csv_path)
+    df.loc[0, 'units'] = 999
+    pd.concat([df, sample_frame(10, 2)]).to_csv(csv_path, index=False)
+    assert detect_append(state, csv_path) == 'changed'
+    state, mode = update_statistics(csv_path, state_directory)
+    assert mode == 'full' and state.statistics.rows == 3010
+
+
+def test_append_after_an_incomplete_row_is_recomputed(csv_path, tmp_path):
+    state_directory = str(tmp_path / 'state')
+    with open(csv_path, 'rb+') as csv_file:
+        csv_file.seek(-1, 2)
+        csv_file.truncate()
+    update_statistics(csv_path, state_directory)
+    with open(csv_path, 'a') as csv_file:
+        csv_file.write('5\n1.5,2,north\n')
+    state, mode = update_statistics(csv_path, state_directory)
+    assert mode == 'full' and state.statistics.rows == 3001
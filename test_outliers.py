@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from outliers import detect_outliers_frame, outliers_from_statistics
+from statistics_engine import DataFrameStatistics
+
+
+def sample_frame(rows=10_000):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'x': rng.normal(0, 1, rows), 'y': rng.standard_t(3, rows), 'label': 'a'})
+    df.loc[::97, 'x'] = np.nan
+    return df
+
+
+def pandas_iqr_counts(df, columns, threshold=1.5):
+    q1, q3 = df[columns].quantile(0.25), df[columns].quantile(0.75)
+    step = threshold * (q3 - q1)
+    return ((df[columns] < q1 - step) | (df[columns] > q3 + step)).sum()
+
+
+def pandas_zscore_counts(df, columns, threshold=3.0):
+    z = (df[columns] - df[columns].mean()) / df[columns].std()
+    return (z.abs() > threshold).sum()
+
+
+def test_iqr_counts_match_pandas():
+    df = sample_frame()
+    report = detect_outliers_frame(df, return_mask=True)
+    expected = pandas_iqr_counts(df, ['x', 'y'])
+    assert report.counts.to_dict() == expected.to_dict()
+    assert report.mask.sum().to_dict() == expected.to_dict()
+    records = {record['Name']: record for record in report.to_records()}
+    assert records['y']['Percentage'] == expected['y'] / len(df)
+
+
+def test_zscore_counts_match_pandas():
+    df = sample_frame()
+    report = detect_outliers_frame(df, method='zscore')
+    assert report.counts.to_dict() == pandas_zscore_counts(df, ['x', 'y']).to_dict()
+
+
+def test_counts_from_exact_statistics_match_raw_data():
+    df = sample_frame()
+    statistics = DataFrameStatistics(['x', 'y'], [], quantile_capacity=None)
+    for chunk in np.array_split(df, 7):
+        statistics.update(chunk)
+    assert outliers_from_statistics(statistics).counts.to_dict() == detect_outliers_frame(df).counts.to_dict()
+    assert (outliers_from_statistics(statistics, method='zscore').counts.to_dict() ==
+            detect_outliers_frame(df, method='zscore').counts.to_dict())
+
+
+def test_approximate_counts_are_close():
+    df = sample_frame()
+    exact = detect_outliers_frame(df).counts
+    approximate = detect_outliers_frame(df, approximate=True, quantile_capacity=256).counts
+    assert (abs(approximate - exact) <= 0.1 * exact + 5).all()
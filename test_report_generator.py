@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from report_generator import build_report_parallel
+
+pypdf = pytest.importorskip('pypdf')
+
+SECTIONS = [[('title', 'First'), ('table', ['a', 'b'], [[i, i * 2] for i in range(100)])],
+            [('description', 'Second'), ('table', ['c'], [[i] for i in range(10)])]]
+
+
+def page_texts(path):
+    return [page.extract_text() for page in pypdf.PdfReader(path).pages]
+
+
+def test_parallel_report_matches_sequential(tmp_path):
+    parallel = build_report_parallel(str(tmp_path / 'parallel.pdf'), SECTIONS, n_jobs=2)
+    sequential = build_report_parallel(str(tmp_path / 'sequential.pdf'), SECTIONS, n_jobs=1)
+    assert page_texts(parallel) == page_texts(sequential)
+    # Every section starts on a new page
+    assert page_texts(parallel)[-1].startswith('Second')
+
+
+def test_visualization_report_in_parallel(tmp_path, monkeypatch):
+    from runner import run_example_pdf_visu
+
+    monkeypatch.chdir(tmp_path)
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'x': rng.normal(size=200), 'y': rng.normal(size=200), 'kind': rng.choice(list('abc'), 200)})
+    run_example_pdf_visu(df, n_jobs=2, parallel_pdf=True)
+    texts = page_texts('eda_report_graphs.pdf')
+    assert texts[0].startswith('Exploratory Data Analysis Results')
+    assert len(texts) >= 2
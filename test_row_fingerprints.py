@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from row_fingerprints import HyperLogLog, RowFingerprintIndex, row_hashes
+
+
+def test_duplicates_match_pandas():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'a': rng.integers(0, 5, 2000), 'b': rng.choice(['x', 'y', None], 2000),
+                       'c': rng.integers(0, 3, 2000).astype(float)})
+    index = RowFingerprintIndex(df)
+    assert index.duplicate_count() == df.duplicated().sum()
+    assert (index.duplicated() == df.duplicated().to_numpy()).all()
+
+
+def test_large_integers_hash_apart():
+    df = pd.DataFrame({'id': np.array([2 ** 53, 2 ** 53 + 1], dtype=np.int64)})
+    assert RowFingerprintIndex(df).duplicate_percentage() == 0.0
+
+
+def test_hashes_do_not_depend_on_dtype():
+    as_read = pd.DataFrame({'n': [1, 2, None], 'd': ['2020-01-01', '2020-01-02', None], 'f': [0.5, 2.0, 3.0]})
+    converted = pd.DataFrame({'n': pd.array([1, 2, None], dtype='Int64'),
+                              'd': pd.to_datetime(['2020-01-01', '2020-01-02', None]),
+                              'f': [0.5, 2, 3]})
+    assert (row_hashes(as_read) == row_hashes(converted)).all()
+
+
+def test_drop_duplicates_with_repeated_index_labels():
+    df = pd.DataFrame({'value': [1, 2, 2, 3, 5, 6]}, index=[0, 1, 0, 3, 4, 5])
+    index = RowFingerprintIndex(df)
+    assert index.drop_duplicates(df) == 1
+    assert df['value'].tolist() == [1, 2, 3, 5, 6]
+    assert len(index) == len(df)
+    assert (index.hashes == row_hashes(df)).all()
+
+
+def test_hyperloglog_estimate_and_merge():
+    hashes = row_hashes(pd.DataFrame({'a': np.arange(100_000)}))
+    first, second = HyperLogLog().update(hashes[:60_000]), HyperLogLog().update(hashes[40_000:])
+    assert abs(first.merge(second).count() - 100_000) / 100_000 < 0.03
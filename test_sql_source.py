@@ -0,0 +1,76 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_downloader import read_file_in_chunks, read_file_to_dataframe
+from sql_source import SqlSource, close_pools
+
+FILTERS = [('region', 'in', ['north', 'south']), ('qty', '>=', 3)]
+PERCENTILES = [0.25, 0.5, 0.75]
+
+
+def sample_frame(rows=3000):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'amount': rng.normal(50, 10, rows).round(1), 'qty': rng.integers(0, 10, rows),
+                       'region': rng.choice(['north', 'south', 'east', 'west'], rows, p=[0.4, 0.3, 0.2, 0.1])})
+    df.loc[::37, 'amount'] = np.nan
+    df.loc[::53, 'region'] = None
+    df.loc[[10, 20]] = 1000.0, 9, 'north'
+    return pd.concat([df, df.iloc[:200]], ignore_index=True)
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / 'sales.db')
+    with sqlite3.connect(path) as connection:
+        sample_frame().to_sql('sales', connection, index=False)
+    yield path
+    close_pools()
+
+
+def filtered_frame():
+    df = sample_frame()
+    return df[df['region'].isin(['north', 'south']) & (df['qty'] >= 3)].reset_index(drop=True)
+
+
+def test_reads_push_down_columns_and_filters(database):
+    source = SqlSource(database)
+    assert source.tables() == ['sales'] and source.default_table() == 'sales'
+    expected = filtered_frame()[['amount']]
+    pd.testing.assert_frame_equal(source.read('sales', columns=['amount'], filters=FILTERS), expected)
+
+    df, _ = read_file_to_dataframe(database, columns=['amount'], filters=FILTERS)
+    pd.testing.assert_frame_equal(df, expected)
+    chunks = list(read_file_in_chunks(database, chunk_size=500, columns=['amount'], filters=FILTERS))
+    assert all(len(chunk) <= 500 for chunk in chunks)
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), expected)
+
+    sample = source.read('sales', sample_rows=500)
+    assert 350 < len(sample) < 650
+
+
+def test_aggregate_statistics_match_pandas(database):
+    source = SqlSource(database)
+    statistics = source.aggregate_statistics('sales', ['amount', 'qty'], ['region'], filters=FILTERS,
+                                             percentiles=PERCENTILES)
+    df = filtered_frame()
+
+    assert statistics.rows == len(df)
+    pd.testing.assert_frame_equal(statistics.describe(PERCENTILES), df[['amount', 'qty']].describe(PERCENTILES),
+                                  check_dtype=False)
+    assert statistics.null_percentage().to_dict() == (df.isnull().mean() * 100).round(2).to_dict()
+    profile = statistics.category_profiles(2)['region']
+    assert profile.distinct == 2 and profile.top.to_dict() == df['region'].value_counts().head(2).to_dict()
+    assert statistics.approximate_duplicate_percentage() == round(df.duplicated().mean() * 100, 2)
+
+
+def test_zscore_outliers_match_pandas(database):
+    source = SqlSource(database)
+    statistics = source.aggregate_statistics('sales', ['amount', 'qty'], ['region'], duplicates=False)
+    report = source.outliers('sales', statistics)
+    df = sample_frame()[['amount', 'qty']]
+    expected = ((df - df.mean()).abs() > 3 * df.std()).sum()
+    assert report.counts.to_dict() == expected.to_dict()
+    assert report.counts['amount'] >= 2
@@ -0,0 +1,10 @@
+import pytest
+
+from startup_benchmark import check_scenario
+
+
+@pytest.mark.parametrize('scenario', ['cli', 'summary'])
+def test_startup_within_budget(scenario):
+    result = check_scenario(scenario, repeat=3)
+    assert result['forbidden'] == []
+    assert result['passed'], f"{scenario} startup took {result['median_ms']:.0f} ms (budget {result['budget_ms']:.0f} ms)"
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from statistics_engine import DataFrameStatistics, QuantileSketch
+
+
+def sample_frame(rows=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'x': rng.normal(10, 3, rows), 'y': rng.exponential(2, rows),
+                       'kind': rng.choice(['a', 'b', 'c'], rows, p=[0.6, 0.3, 0.1])})
+    df.loc[rng.choice(rows, 100, replace=False), 'x'] = np.nan
+    df.loc[rng.choice(rows, 50, replace=False), 'kind'] = None
+    return df
+
+
+def chunked_statistics(df, chunk_rows, **kwargs):
+    statistics = DataFrameStatistics(['x', 'y'], ['kind'], **kwargs)
+    for start in range(0, len(df), chunk_rows):
+        statistics.update(df.iloc[start:start + chunk_rows])
+    return statistics
+
+
+def test_exact_chunked_statistics_match_describe():
+    df = sample_frame()
+    statistics = chunked_statistics(df, 700, quantile_capacity=None)
+    pd.testing.assert_frame_equal(statistics.describe(), df[['x', 'y']].describe())
+    assert statistics.null_percentage().to_dict() == (df.isnull().mean() * 100).round(2).to_dict()
+    summary = statistics.to_dict()
+    assert summary['kind'] == {'count': 4950, 'unique': 3, 'top': 'a', 'freq': df['kind'].value_counts().iloc[0]}
+
+
+def test_merged_states_match_single_pass():
+    df = sample_frame()
+    merged = chunked_statistics(df.iloc[:2000], 300).merge(chunked_statistics(df.iloc[2000:], 300))
+    whole = DataFrameStatistics.from_dataframe(df, ['x', 'y'], ['kind'])
+    assert merged.rows == whole.rows == len(df)
+    pd.testing.assert_frame_equal(merged.describe().loc[['count', 'mean', 'std', 'min', 'max']],
+                                  whole.describe().loc[['count', 'mean', 'std', 'min', 'max']])
+    assert merged.top_values('kind').to_dict() == df['kind'].value_counts().to_dict()
+
+
+def test_quantile_sketch_rank_error():
+    values = np.random.default_rng(1).lognormal(size=200_000)
+    sketch = QuantileSketch(capacity=512)
+    for block in np.array_split(values, 37):
+        sketch.update(block)
+    assert sketch.count == len(values)
+    sorted_values = np.sort(values)
+    for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+        rank = np.searchsorted(sorted_values, sketch.quantile(q)) / len(values)
+        assert abs(rank - q) < 0.01